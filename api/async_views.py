@@ -0,0 +1,309 @@
+"""
+Async (ASGI) read endpoints for employees and forms.
+
+Mirrors the read side of DynamicFormViewSet and EmployeeViewSet with plain
+Django async views and the async ORM, so a slow query suspends a coroutine
+instead of holding a worker thread. Served under /api/async/; writes stay on
+the DRF viewsets. Authentication accepts a JWT bearer token or a session.
+
+employee_events streams live employee changes (server-sent events, or a
+long poll) from the broker in employees.events.
+"""
+import math
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_http_methods
+from rest_framework.exceptions import ValidationError
+
+from . import conditional
+from .authentication import async_auth_required
+from .fastpath import LIST_FIELDS, LIST_VALUES, build_list_rows, format_datetime
+from .fieldsets import get_fieldset
+from .filters import (
+    filter_employees, has_row_filters, list_values, parse_facets, parse_form_id, project_data,
+    select_expanded,
+)
+from .pagination import EmployeeCursorPagination
+from .renderers import FastJSONRenderer
+from .serializers import DynamicFormSerializer, EmployeeSerializer
+from employees import changes, events, facets, projections, reports
+from employees.caching import aget_form_definition
+from employees.models import DynamicForm, Employee
+from employees.pagination import InvalidCursor
+
+_renderer = FastJSONRenderer()
+
+
+def json_response(data, status=200):
+    """Render like the DRF views (orjson when installed)"""
+    return HttpResponse(_renderer.render(data), content_type='application/json', status=status)
+
+
+def _error(message, status=400):
+    return json_response({'error': message}, status=status)
+
+
+@require_http_methods(["GET"])
+@async_auth_required
+async def employee_list(request):
+    """Async twin of GET /api/employees/"""
+    params = request.GET
+    queryset = Employee.objects.filter(is_active=True).select_related('form')
+
+    form = None
+    form_id = params.get('form_id', None)
+    if form_id:
+        form = await aget_form_definition(form_id)
+    try:
+        queryset, ordering = filter_employees(queryset, params, form)
+        facet_request = parse_facets(params, form)
+    except projections.ProjectionQueryError as e:
+        return _error(str(e))
+
+    async def build_data():
+        paginator = EmployeeCursorPagination()
+        values = list_values(ordering, LIST_VALUES)
+        page = await paginator.apaginate_queryset(queryset.values(*values), request, ordering)
+        fieldset = get_fieldset(request)
+        fields = set(LIST_FIELDS) if fieldset.fields is None else set(fieldset.fields)
+        fields -= fieldset.omit
+        data = paginator.get_paginated_data(build_list_rows(page, fields))
+        if facet_request:
+            names, limit = facet_request
+            filtered = has_row_filters(params, form)
+            data['facets'] = await facets.aget_facets(form.id, names, queryset if filtered else None, limit)
+        return data
+
+    try:
+        etag = await conditional.alist_etag(queryset, request)
+        return await conditional.aconditional_response(request, etag, build_data, json_response)
+    except ValidationError as e:
+        return json_response(e.detail, status=400)
+
+
+@require_http_methods(["GET"])
+@async_auth_required
+async def employee_detail(request, pk):
+    """Async twin of GET /api/employees/<pk>/"""
+    etag = await conditional.adetail_etag(pk, request)
+    if etag is None:
+        return json_response({'detail': 'No Employee matches the given query.'}, status=404)
+
+    fieldset = get_fieldset(request)
+    queryset = project_data(select_expanded(Employee.objects.filter(is_active=True), fieldset), fieldset)
+
+    async def build_data():
+        employee = await queryset.filter(pk=pk).afirst()
+        return EmployeeSerializer(employee, context={'request': request}).data
+
+    return await conditional.aconditional_response(request, etag, build_data, json_response)
+
+
+@require_http_methods(["GET"])
+@async_auth_required
+async def employee_statistics(request):
+    """Async twin of GET /api/employees/statistics/"""
+    params = request.GET
+    try:
+        form_id = parse_form_id(params)
+    except ValueError:
+        return _error('form_id must be an integer')
+    forms_breakdown = await reports.aform_breakdown()
+    data = {
+        'total_employees': await reports.aemployee_totals(),
+        'total_forms': len(forms_breakdown),
+        'forms_breakdown': forms_breakdown,
+    }
+
+    if params.get('by_creator') in ('1', 'true', 'True'):
+        data['creators_breakdown'] = await reports.acreator_breakdown()
+
+    period = params.get('period')
+    if period:
+        if period not in reports.PERIODS:
+            return _error(f"period must be one of: {', '.join(reports.PERIODS)}")
+        data['period_breakdown'] = await reports.aperiod_breakdown(period, form_id=form_id)
+
+    field_name = params.get('field')
+    if field_name:
+        form = await aget_form_definition(form_id) if form_id is not None else None
+        if form is None:
+            return _error('A valid form_id is required for a field histogram')
+        if field_name not in {field.get('name') for field in form.fields_config}:
+            return _error(f"Field '{field_name}' is not part of form '{form.name}'")
+        data['field_histogram'] = {
+            'form_id': form.id,
+            'field': field_name,
+            'values': await reports.afield_histogram(form.id, field_name),
+        }
+
+    return json_response(data)
+
+
+def _forms_queryset(request):
+    queryset = DynamicForm.objects.filter(is_active=True)
+    if 'created_by' in get_fieldset(request).expand:
+        queryset = queryset.select_related('created_by')
+    return queryset
+
+
+@require_http_methods(["GET"])
+@async_auth_required
+async def form_list(request):
+    """Async twin of GET /api/forms/"""
+    forms = [form async for form in _forms_queryset(request)]
+    return json_response(DynamicFormSerializer(forms, many=True, context={'request': request}).data)
+
+
+@require_http_methods(["GET"])
+@async_auth_required
+async def form_detail(request, pk):
+    """Async twin of GET /api/forms/<pk>/"""
+    form = await _forms_queryset(request).filter(pk=pk).afirst()
+    if form is None:
+        return json_response({'detail': 'No DynamicForm matches the given query.'}, status=404)
+    return json_response(DynamicFormSerializer(form, context={'request': request}).data)
+
+
+@require_http_methods(["GET"])
+@async_auth_required
+async def form_fields(request, pk):
+    """Async twin of GET /api/forms/<pk>/fields/ (honours If-None-Match/If-Modified-Since)"""
+    form = await aget_form_definition(pk)
+    if form is None:
+        return json_response({'detail': 'Form not found'}, status=404)
+    not_modified = get_conditional_response(
+        request, etag=form.etag, last_modified=int(form.updated_at.timestamp())
+    )
+    if not_modified is not None:
+        return not_modified
+    response = json_response({
+        'form_id': form.id,
+        'form_name': form.name,
+        'version': form.version_id,
+        'fields': form.fields_config
+    })
+    response['ETag'] = form.etag
+    response['Last-Modified'] = form.last_modified
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+async def _change_batches(subscription, last_id, replay, form_id, timeout):
+    """
+    Yield lists of change events after change last_id: stored entries first
+    when replaying (a page at a time), then live events as they are
+    published, or [] after timeout seconds without any. Falls back to the
+    change log whenever the subscription overflows.
+    """
+    while True:
+        if replay or subscription.overflowed:
+            subscription.reset()
+            entries, _cursor, replay = await changes.aread_changes(
+                changes.change_cursor(last_id), form_id=form_id
+            )
+            batch = [events.change_event(entry) for entry in entries]
+            if not batch:
+                continue
+        else:
+            published = await subscription.get(timeout)
+            # Events already replayed from the log are published too
+            batch = [event for event in published if event['change_id'] > last_id]
+            if published and not batch:
+                continue
+        if batch:
+            last_id = max(event['change_id'] for event in batch)
+        yield batch
+
+
+def _event_data(event):
+    return dict(event, changed_at=format_datetime(event['changed_at']))
+
+
+def _sse_message(event):
+    return (
+        f"id: {changes.change_cursor(event['change_id'])}\n"
+        f"event: {event['action']}\n"
+        f"data: {_renderer.render(_event_data(event)).decode()}\n\n"
+    )
+
+
+async def _event_stream(broker, last_id, replay, form_id, once):
+    keepalive = getattr(settings, 'EMPLOYEE_EVENT_KEEPALIVE', 15)
+    yield 'retry: 1000\n\n'
+    async with broker.subscribe(form_id) as subscription:
+        if last_id is None:
+            last_id = await changes.alatest_change_id()
+        try:
+            async for batch in _change_batches(subscription, last_id, replay, form_id, keepalive):
+                yield ''.join(_sse_message(event) for event in batch) or ': keepalive\n\n'
+                if once:
+                    return
+        except changes.ExpiredCursor:
+            yield 'event: resync\ndata: {}\n\n'
+
+
+@require_http_methods(["GET"])
+@async_auth_required
+async def employee_events(request):
+    """
+    Live employee create/update/delete events (?form_id= for one form).
+
+    With Accept: text/event-stream this is a server-sent event stream whose
+    event ids are change feed cursors, so EventSource resumes after a
+    reconnect (Last-Event-ID). Otherwise it is a long poll that answers as
+    soon as there are changes after ?since=, or with no results after
+    ?timeout= seconds. Without a cursor both start at the newest change.
+    """
+    params = request.GET
+    try:
+        form_id = parse_form_id(params)
+    except ValueError:
+        return _error('form_id must be an integer')
+
+    since = request.headers.get('Last-Event-ID') or params.get('since')
+    last_id = None
+    if since:
+        try:
+            last_id = await changes.acheck_cursor(since)
+        except InvalidCursor:
+            return _error('Invalid since cursor')
+        except changes.ExpiredCursor as e:
+            return _error(f'{e}; resync from the start', status=410)
+    broker = events.get_broker()
+
+    if 'text/event-stream' in request.headers.get('Accept', ''):
+        # Under WSGI a response is sent only once its iterator is exhausted,
+        # so end after one batch and let EventSource reconnect
+        once = not isinstance(request, ASGIRequest)
+        response = StreamingHttpResponse(
+            _event_stream(broker, last_id, bool(since), form_id, once), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    try:
+        timeout = float(params.get('timeout', 25))
+    except ValueError:
+        timeout = math.nan
+    if not math.isfinite(timeout):
+        return _error('timeout must be a number of seconds')
+    timeout = min(max(timeout, 0), getattr(settings, 'EMPLOYEE_EVENT_MAX_WAIT', 60))
+    async with broker.subscribe(form_id) as subscription:
+        if last_id is None:
+            last_id = await changes.alatest_change_id()
+        batches = _change_batches(subscription, last_id, bool(since), form_id, timeout)
+        try:
+            batch = await anext(batches)
+        finally:
+            await batches.aclose()
+    if batch:
+        last_id = max(event['change_id'] for event in batch)
+    return json_response({
+        'since': changes.change_cursor(last_id),
+        'results': [_event_data(event) for event in batch],
+    })
@@ -0,0 +1,120 @@
+"""
+JWT authentication without a user query per request.
+
+StatelessJWTAuthentication builds request.user (a TokenUser) from the
+access token claims (see api.tokens.EmployeeRefreshToken) and rejects
+revoked tokens. Views that need the full CustomUser row call
+get_full_user(), which keeps it in JWT_USER_CACHE_ALIAS for
+JWT_USER_CACHE_TTL seconds.
+
+The async helpers authenticate plain Django requests for the ASGI views in
+api/async_views.py with the same token checks, falling back to the session
+cookie via request.auser().
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import ais_revoked, is_revoked
+
+USER_CACHE_KEY = 'jwt-user:{}'
+
+
+def _user_cache():
+    alias = getattr(settings, 'JWT_USER_CACHE_ALIAS', None)
+    ttl = getattr(settings, 'JWT_USER_CACHE_TTL', 0)
+    if not alias or not ttl:
+        return None, 0
+    return caches[alias], ttl
+
+
+def get_full_user(user):
+    """The CustomUser behind request.user (cached briefly for token users)"""
+    if not isinstance(user, TokenUser):
+        return user
+    cache, ttl = _user_cache()
+    key = USER_CACHE_KEY.format(user.id)
+    full_user = cache.get(key) if cache else None
+    if full_user is None:
+        full_user = get_user_model().objects.get(**{api_settings.USER_ID_FIELD: user.id})
+        if cache:
+            cache.set(key, full_user, ttl)
+    return full_user
+
+
+def forget_user(user_id):
+    cache, _ttl = _user_cache()
+    if cache:
+        cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWTAuthentication that trusts the signed claims instead of loading the
+    user, and checks the revocation set instead of CHECK_USER_IS_ACTIVE;
+    deactivating a user revokes their tokens (api.signals).
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token):
+            raise InvalidToken(_('Token has been revoked'))
+        return validated_token
+
+
+class AsyncJWTAuthentication(StatelessJWTAuthentication):
+    """StatelessJWTAuthentication with an awaitable revocation check"""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = JWTStatelessUserAuthentication.get_validated_token(self, raw_token)
+        if await ais_revoked(validated_token):
+            raise InvalidToken(_('Token has been revoked'))
+        return self.get_user(validated_token), validated_token
+
+
+async def aauthenticate(request):
+    """Return the authenticated user of a request (JWT first, then session) or None"""
+    result = await AsyncJWTAuthentication().aauthenticate(request)
+    if result is not None:
+        return result[0]
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def _unauthorized(data):
+    response = JsonResponse(data, status=401)
+    response['WWW-Authenticate'] = AsyncJWTAuthentication().authenticate_header(None)
+    return response
+
+
+def async_auth_required(view_func):
+    """
+    Async counterpart of DRF's IsAuthenticated: sets request.user or
+    answers 401 with the same error body DRF would send.
+    """
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await aauthenticate(request)
+        except AuthenticationFailed as e:
+            return _unauthorized(e.detail if isinstance(e.detail, dict) else {'detail': e.detail})
+        if user is None:
+            return _unauthorized({'detail': 'Authentication credentials were not provided.'})
+        request.user = user
+        return await view_func(request, *args, **kwargs)
+    return wrapper
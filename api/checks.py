@@ -0,0 +1,47 @@
+"""
+Refuse to serve with a token revocation cache that loses revocations, and
+warn when list ETags come from a per-process counter.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+# Per-process or throwaway caches: a revocation made in one worker would not
+# reach the others, or could be culled while the token is still valid
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.security, deploy=False)
+def check_revocation_cache(app_configs, **kwargs):
+    alias = getattr(settings, 'JWT_REVOCATION_CACHE_ALIAS', None)
+    if not alias or settings.DEBUG:
+        return []
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend is None:
+        return [Error(f"JWT_REVOCATION_CACHE_ALIAS '{alias}' is not in CACHES", id='api.E001')]
+    if backend in LOCAL_CACHE_BACKENDS:
+        return [Error(
+            f"JWT_REVOCATION_CACHE_ALIAS '{alias}' uses {backend.rsplit('.', 1)[-1]}, which is not "
+            f"shared between workers and may drop revocations",
+            hint='Use a shared cache that does not evict entries early, or unset it to use the database.',
+            id='api.E002',
+        )]
+    return []
+
+
+@register(Tags.caches, deploy=False)
+def check_response_cache(app_configs, **kwargs):
+    alias = getattr(settings, 'EMPLOYEE_RESPONSE_CACHE_ALIAS', None)
+    if not alias or settings.DEBUG:
+        return []
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend in LOCAL_CACHE_BACKENDS:
+        return [Warning(
+            f"EMPLOYEE_RESPONSE_CACHE_ALIAS '{alias}' uses {backend.rsplit('.', 1)[-1]}, so with several "
+            f"workers each keeps its own employee write generation and can answer 304 for changed lists",
+            hint='Use a shared cache such as Redis, or run a single worker process.',
+            id='api.W001',
+        )]
+    return []
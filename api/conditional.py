@@ -0,0 +1,155 @@
+"""
+Conditional GET and short-lived response caching for the employee API.
+
+ETags are computed before any serialization happens: list ETags from the
+employee write generation (no query at all), detail ETags from a single row.
+A matching If-None-Match gets a 304. Serialized payloads are kept for
+EMPLOYEE_RESPONSE_CACHE_TTL seconds under a key that includes the ETag and
+the employee write generation.
+
+The generation lives in EMPLOYEE_RESPONSE_CACHE_ALIAS, which must be shared
+by every worker process. Without that alias list ETags fall back to an
+aggregate over the matching rows.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+from employees.caching import aemployee_generation, employee_generation
+from employees.models import Employee
+
+
+def _hash(*parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode(), usedforsecurity=False)
+    return f'"{digest.hexdigest()}"'
+
+
+def _request_key(request):
+    """
+    Scheme, host, path and query params, since paginated payloads hold
+    absolute links; DRF and plain Django requests are both accepted
+    """
+    params = getattr(request, 'query_params', None) or request.GET
+    return request.scheme, request.get_host(), request.path, sorted(params.lists())
+
+
+LIST_STATE = {
+    'latest': Max('updated_at'),
+    'latest_form': Max('form__updated_at'),
+    'count': Count('id'),
+}
+
+
+def _list_hash(state, request):
+    return _hash('list', state['latest'], state['latest_form'], state['count'], *_request_key(request))
+
+
+def _generation_hash(generation, request):
+    return _hash('list-generation', generation, *_request_key(request))
+
+
+def _detail_rows(pk):
+    return Employee.objects.filter(pk=pk, is_active=True).values_list('updated_at', 'form__updated_at')
+
+
+def list_etag(queryset, request):
+    """ETag of a list response: the employee write generation and the request"""
+    generation = employee_generation()
+    if generation is not None:
+        return _generation_hash(generation, request)
+    return _list_hash(queryset.order_by().aggregate(**LIST_STATE), request)
+
+
+async def alist_etag(queryset, request):
+    generation = await aemployee_generation()
+    if generation is not None:
+        return _generation_hash(generation, request)
+    return _list_hash(await queryset.order_by().aaggregate(**LIST_STATE), request)
+
+
+def _parse_pk(pk):
+    """pk from the URL as an int, or None (a 404) for anything else"""
+    try:
+        return int(pk)
+    except (TypeError, ValueError):
+        return None
+
+
+def detail_etag(pk, request):
+    """ETag of a detail response, or None when the employee does not exist"""
+    pk = _parse_pk(pk)
+    row = _detail_rows(pk).first() if pk is not None else None
+    if row is None:
+        return None
+    return _hash('detail', pk, row[0], row[1], *_request_key(request))
+
+
+async def adetail_etag(pk, request):
+    pk = _parse_pk(pk)
+    row = await _detail_rows(pk).afirst() if pk is not None else None
+    if row is None:
+        return None
+    return _hash('detail', pk, row[0], row[1], *_request_key(request))
+
+
+def _response_cache():
+    alias = getattr(settings, 'EMPLOYEE_RESPONSE_CACHE_ALIAS', None)
+    ttl = getattr(settings, 'EMPLOYEE_RESPONSE_CACHE_TTL', 0)
+    if not alias or not ttl:
+        return None, 0
+    return caches[alias], ttl
+
+
+def conditional_response(request, etag, build_response):
+    """
+    Return 304 if the client already has etag, else a cached or freshly
+    built response carrying the ETag header.
+    """
+    if etag is None:
+        return build_response()
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    cache, ttl = _response_cache()
+    key = f'employee-response:{employee_generation()}:{etag}' if cache else None
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        response = Response(cached)
+    else:
+        response = build_response()
+        if cache and response.status_code == 200:
+            cache.set(key, response.data, ttl)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+async def aconditional_response(request, etag, build_data, render):
+    """
+    Async twin of conditional_response(). build_data is a coroutine function
+    returning the payload and render turns a payload into an HttpResponse.
+    """
+    if etag is None:
+        return render(await build_data())
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    cache, ttl = _response_cache()
+    key = f'employee-response:{await aemployee_generation()}:{etag}' if cache else None
+    data = await cache.aget(key) if cache else None
+    if data is None:
+        data = await build_data()
+        if cache:
+            await cache.aset(key, data, ttl)
+    response = render(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
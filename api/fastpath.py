@@ -0,0 +1,40 @@
+"""
+Read-only fast path for the employee list endpoint.
+
+Rows are fetched as plain dicts with .values() and turned into response
+dicts directly, skipping DRF's per-field to_representation. The display
+name comes from the precomputed Employee.display_name column, so the
+employee_data JSON is never loaded for a list.
+"""
+from django.utils import timezone
+
+from employee_system.metrics import timed
+
+LIST_VALUES = ('id', 'form__name', 'display_name', 'created_at', 'is_active')
+LIST_FIELDS = ('id', 'form_name', 'display_name', 'created_at', 'is_active')
+
+
+def format_datetime(value):
+    """Same output as DRF's DateTimeField: current timezone, 'Z' for UTC"""
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def build_list_rows(rows, fields=None):
+    """Turn .values(*LIST_VALUES) dicts into list response rows"""
+    result = []
+    with timed('serialize'):
+        for row in rows:
+            item = {
+                'id': row['id'],
+                'form_name': row['form__name'],
+                'display_name': row['display_name'] or f"Employee #{row['id']}",
+                'created_at': format_datetime(row['created_at']),
+                'is_active': row['is_active'],
+            }
+            if fields is not None:
+                item = {name: value for name, value in item.items() if name in fields}
+            result.append(item)
+    return result
@@ -0,0 +1,135 @@
+"""
+Sparse fieldsets for API responses.
+
+    ?fields=id,employee_data.salary   only these fields (employee_data keys projected in SQL)
+    ?omit=created_at                  drop fields
+    ?expand=form,form.created_by      nest related objects instead of returning their ids
+"""
+from django.db.models.fields.json import KeyTransform
+from rest_framework import serializers
+
+from employee_system.metrics import timed
+
+DATA_FIELD = 'employee_data'
+DATA_ALIAS = 'projected_data_{}'
+
+
+def _split(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+class Fieldset:
+    def __init__(self, fields=None, omit=(), expand=(), data_keys=None):
+        self.fields = fields
+        self.omit = set(omit)
+        self.expand = set(expand)
+        self.data_keys = data_keys
+
+    @classmethod
+    def from_params(cls, params):
+        requested = _split(params.get('fields'))
+        fields = None
+        data_keys = None
+        if requested:
+            fields = set()
+            for name in requested:
+                if name.startswith(f'{DATA_FIELD}.'):
+                    data_keys = data_keys or []
+                    key = name[len(DATA_FIELD) + 1:]
+                    if key and key not in data_keys:
+                        data_keys.append(key)
+                    fields.add(DATA_FIELD)
+                else:
+                    fields.add(name)
+            if DATA_FIELD in requested:
+                data_keys = None
+        return cls(fields, _split(params.get('omit')), _split(params.get('expand')), data_keys)
+
+    def data_annotations(self):
+        """Annotations that pull only the requested employee_data keys out in SQL"""
+        return {
+            DATA_ALIAS.format(index): KeyTransform(key, DATA_FIELD)
+            for index, key in enumerate(self.data_keys or [])
+        }
+
+
+def get_fieldset(request):
+    """Parse (once per request) the fieldset query params"""
+    if request is None:
+        return Fieldset()
+    fieldset = getattr(request, '_fieldset', None)
+    if fieldset is None:
+        params = getattr(request, 'query_params', None) or request.GET
+        fieldset = Fieldset.from_params(params)
+        request._fieldset = fieldset
+    return fieldset
+
+
+class ProjectedDataField(serializers.Field):
+    """Rebuilds employee_data from the annotations added by Fieldset.data_annotations"""
+    def __init__(self, data_keys, **kwargs):
+        self.data_keys = data_keys
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        data = {}
+        for index, key in enumerate(self.data_keys):
+            alias = DATA_ALIAS.format(index)
+            if hasattr(instance, alias):
+                value = getattr(instance, alias)
+            else:
+                value = (instance.employee_data or {}).get(key)
+            if value is not None:
+                data[key] = value
+        return data
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin applying ?fields=, ?omit= and ?expand=.
+
+    expandable_fields maps a field name to a callable returning the nested
+    serializer used when it is expanded; otherwise the declared field (an id)
+    is kept. Nested serializers receive an expand_prefix such as 'form.'.
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        self.expand_prefix = kwargs.pop('expand_prefix', '')
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        fieldset = get_fieldset(request)
+
+        for name, factory in self.expandable_fields.items():
+            path = f'{self.expand_prefix}{name}'
+            if name in fields and path in fieldset.expand:
+                fields[name] = factory(expand_prefix=f'{path}.')
+
+        if self.expand_prefix or request is None or request.method != 'GET':
+            return fields
+        if fieldset.fields is not None:
+            fields = {name: field for name, field in fields.items() if name in fieldset.fields}
+        for name in fieldset.omit:
+            fields.pop(name, None)
+        if fieldset.data_keys and DATA_FIELD in fields:
+            fields[DATA_FIELD] = ProjectedDataField(fieldset.data_keys)
+        return fields
+
+    @property
+    def data(self):
+        # Timed once per response; nested and per-row to_representation calls are not
+        with timed('serialize'):
+            return super().data
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """list_serializer_class of the SparseFieldsetMixin serializers: times a whole list once"""
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
@@ -0,0 +1,125 @@
+"""
+Query-param filtering shared by the DRF employee viewset and the async views.
+
+Everything here only builds querysets, so it is safe to call from async code;
+the FormDefinition needed for indexed-field filters is looked up by the caller.
+"""
+from employees import facets, projections
+from employees.search import annotate_display_name_lower, filter_display_name_prefix, search_employees
+
+
+def filter_employees(queryset, params, form=None):
+    """
+    Apply ?search=, ?field=, ?name=, ?form_id= and ?order= to an Employee
+    queryset. form is the FormDefinition of ?form_id= when its indexed-field
+    filters should apply. Returns (queryset, keyset ordering or None) and
+    raises projections.ProjectionQueryError for unusable filters.
+    """
+    ordering = None
+    
+    # Search functionality
+    search = params.get('search', None)
+    if search:
+        queryset = search_employees(queryset, search, field=params.get('field', None))
+    
+    # Prefix search on the indexed display name
+    name = params.get('name', None)
+    if name:
+        queryset = filter_display_name_prefix(queryset, name)
+    
+    # Sort by display name (case-insensitive, served by the Lower(display_name) index)
+    params = params.copy()
+    order = params.get('order', '')
+    if order.lstrip('-') == 'display_name':
+        queryset = annotate_display_name_lower(queryset)
+        descending = order.startswith('-')
+        ordering = ('-display_name_lower', '-id') if descending else ('display_name_lower', 'id')
+        del params['order']
+    
+    # Filter by form
+    try:
+        form_id = parse_form_id(params)
+    except ValueError:
+        raise projections.ProjectionQueryError('form_id must be an integer')
+    if form_id is not None:
+        queryset = queryset.filter(form_id=form_id)
+        
+        # Filters/ordering on the form's indexed fields, e.g. ?salary__gte=50000&order=joining_date
+        if form is not None:
+            queryset, field_ordering = projections.filter_queryset(queryset, form, params)
+            ordering = field_ordering or ordering
+    
+    return queryset, ordering
+
+
+def parse_form_id(params):
+    """?form_id= as an int, or None when absent; raises ValueError for anything else"""
+    form_id = params.get('form_id', None)
+    if form_id in (None, ''):
+        return None
+    return int(form_id)
+
+
+def parse_facets(params, form=None):
+    """
+    The (field names, limit) requested by ?facets=a,b&facet_limit=N, or None.
+    Facets need ?form_id= (form is its FormDefinition) and must name indexed
+    fields; raises projections.ProjectionQueryError otherwise.
+    """
+    names = [name.strip() for name in params.get('facets', '').split(',') if name.strip()]
+    if not names:
+        return None
+    if form is None:
+        raise projections.ProjectionQueryError('facets need the form_id of an active form')
+    fields = projections.indexed_fields(form)
+    unknown = [name for name in names if name not in fields]
+    if unknown:
+        raise projections.ProjectionQueryError(
+            f"facets must name indexed fields of form '{form.name}', not: {', '.join(unknown)}"
+        )
+    limit = params.get('facet_limit', None)
+    try:
+        limit = facets.DEFAULT_LIMIT if limit in (None, '') else int(limit)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= facets.MAX_LIMIT:
+        raise projections.ProjectionQueryError(f'facet_limit must be between 1 and {facets.MAX_LIMIT}')
+    return list(dict.fromkeys(names)), limit
+
+
+def has_row_filters(params, form):
+    """
+    Whether the list of form's employees is narrowed by more than ?form_id=,
+    i.e. whether its facets must be counted over the matching rows instead
+    of read from the stored counts
+    """
+    if params.get('search', None) or params.get('name', None):
+        return True
+    fields = projections.indexed_fields(form)
+    if params.get('order', '').lstrip('-') in fields:
+        return True  # Employees without the sort field are left out
+    return any(param.partition('__')[0] in fields for param in params)
+
+
+def list_values(ordering, values):
+    """values plus the keyset columns the paginator reads back off each row"""
+    extra = tuple(
+        name.lstrip('-') for name in ordering or ()
+        if name.lstrip('-') not in values
+    )
+    return values + extra
+
+
+def select_expanded(queryset, fieldset):
+    """Join only the relations an Employee detail response expands"""
+    related = [name for name in ('form', 'created_by') if name in fieldset.expand]
+    if 'form.created_by' in fieldset.expand:
+        related.append('form__created_by')
+    return queryset.select_related(*related) if related else queryset
+
+
+def project_data(queryset, fieldset):
+    """Pull only the requested employee_data keys out in SQL"""
+    if fieldset.data_keys and 'display_name' not in fieldset.fields:
+        queryset = queryset.defer('employee_data').annotate(**fieldset.data_annotations())
+    return queryset
@@ -0,0 +1,84 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.fastpath import LIST_VALUES, build_list_rows
+from api.renderers import FastJSONRenderer
+from api.serializers import EmployeeListSerializer
+from employees.models import DynamicForm, Employee
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of EmployeeListSerializer vs the list fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._ensure_rows(options['rows'])
+                self._run(options['rows'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _ensure_rows(self, rows):
+        missing = rows - Employee.objects.filter(is_active=True).count()
+        if missing <= 0:
+            return
+        user = User.objects.first() or User.objects.create_user(username='benchmark', password='benchmark')
+        form = DynamicForm.objects.create(
+            name=f'Benchmark form {time.time()}',
+            fields_config=[
+                {'name': 'employee_code', 'label': 'Code', 'type': 'text'},
+                {'name': 'department', 'label': 'Department', 'type': 'text'},
+                {'name': 'full_name', 'label': 'Full Name', 'type': 'text'},
+                {'name': 'email', 'label': 'Email', 'type': 'email'},
+            ],
+            created_by=user,
+        )
+        Employee.objects.bulk_create(
+            [
+                Employee(
+                    form=form,
+                    created_by=user,
+                    employee_data={
+                        'employee_code': f'E{i:06d}',
+                        'department': 'Engineering',
+                        'full_name': f'Employee {i}',
+                        'email': f'employee{i}@example.com',
+                    },
+                )
+                for i in range(missing)
+            ],
+            batch_size=1000,
+        )
+
+    def _run(self, rows, repeat):
+        queryset = Employee.objects.filter(is_active=True).select_related('form')[:rows]
+        values = Employee.objects.filter(is_active=True).values(*LIST_VALUES)[:rows]
+
+        def serializer_path():
+            return JSONRenderer().render(EmployeeListSerializer(list(queryset), many=True).data)
+
+        def fast_path():
+            return FastJSONRenderer().render(build_list_rows(list(values)))
+
+        for label, func in (('serializer', serializer_path), ('fast path', fast_path)):
+            func()  # warm up
+            started = time.perf_counter()
+            for _ in range(repeat):
+                func()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{label:>10}: {rows * repeat / elapsed:,.0f} rows/sec')
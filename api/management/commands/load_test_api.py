@@ -0,0 +1,110 @@
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Client(threading.local):
+    """One keep-alive connection per load-generating thread"""
+
+    def __init__(self, headers, timeout):
+        self.headers = headers
+        self.timeout = timeout
+        self.connection = None
+        self.netloc = None
+
+    def get(self, url):
+        parts = urlsplit(url)
+        if self.connection is None or self.netloc != parts.netloc:
+            connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+            self.connection = connection_class(parts.netloc, timeout=self.timeout)
+            self.netloc = parts.netloc
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        try:
+            self.connection.request('GET', path, headers=self.headers)
+            response = self.connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            raise
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire concurrent GETs at one or more running servers and compare throughput, '
+        'e.g. --target wsgi=http://127.0.0.1:8000/api/employees/ '
+        '--target asgi=http://127.0.0.1:8001/api/async/employees/'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, help='NAME=URL, repeatable')
+        parser.add_argument('--concurrency', default='1,8,32,64', help='Comma separated client counts')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per target and concurrency')
+        parser.add_argument('--token', help='JWT access token sent as a Bearer header')
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, sep, url = target.partition('=')
+            if not sep or not url.startswith(('http://', 'https://')):
+                raise CommandError(f'--target must look like NAME=http://host/path, got {target!r}')
+            targets.append((name, url))
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+        except ValueError:
+            raise CommandError('--concurrency must be a comma separated list of integers')
+
+        headers = {'Accept': 'application/json'}
+        if options['token']:
+            headers['Authorization'] = f"Bearer {options['token']}"
+
+        self.stdout.write(
+            f"{'target':<12}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+        )
+        for concurrency in levels:
+            for name, url in targets:
+                result = self._run(url, concurrency, options['requests'], headers, options['timeout'])
+                self.stdout.write(
+                    f"{name:<12}{concurrency:>8}{result['rate']:>10.1f}{result['p50']:>10.1f}"
+                    f"{result['p95']:>10.1f}{result['p99']:>10.1f}{result['errors']:>8}"
+                )
+
+    def _run(self, url, concurrency, total, headers, timeout):
+        client = Client(headers, timeout)
+        try:
+            client.get(url)  # warm up
+        except (OSError, http.client.HTTPException) as e:
+            raise CommandError(f'Cannot reach {url}: {e}')
+
+        def one(_):
+            started = time.perf_counter()
+            try:
+                ok = client.get(url) == 200
+            except (OSError, http.client.HTTPException):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for latency, ok in results if ok)
+        errors = sum(1 for _, ok in results if not ok)
+        if not latencies:
+            return {'rate': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'errors': errors}
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            'rate': len(latencies) / elapsed,
+            'p50': quantiles[49],
+            'p95': quantiles[94],
+            'p99': quantiles[98],
+            'errors': errors,
+        }
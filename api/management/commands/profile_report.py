@@ -0,0 +1,51 @@
+import glob
+import io
+import os
+import pstats
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# <view>-<unix time>-<ms>ms.prof, as written by RequestMetricsMiddleware
+DUMP_RE = re.compile(r'^(?P<view>.+)-(?P<time>\d+)-(?P<ms>\d+)ms\.prof$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarize the cProfile dumps of slow requests written by the request '
+        'metrics middleware (METRICS_PROFILE_DIR), merged per view.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help='Defaults to METRICS_PROFILE_DIR')
+        parser.add_argument('--view', default=None, help='Only views whose name contains this')
+        parser.add_argument('--sort', default='cumulative', choices=['cumulative', 'tottime', 'calls'])
+        parser.add_argument('--limit', type=int, default=15, help='Functions listed per view')
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or getattr(settings, 'METRICS_PROFILE_DIR', None)
+        if not directory or not os.path.isdir(directory):
+            raise CommandError('No profile directory; pass --dir or set METRICS_PROFILE_DIR')
+
+        dumps = defaultdict(list)
+        for path in glob.glob(os.path.join(directory, '*.prof')):
+            match = DUMP_RE.match(os.path.basename(path))
+            if match and (not options['view'] or options['view'] in match['view']):
+                dumps[match['view']].append((int(match['ms']), path))
+        if not dumps:
+            self.stdout.write('No profiles recorded')
+            return
+
+        # Views with the slowest requests first
+        for view, entries in sorted(dumps.items(), key=lambda item: -max(ms for ms, _path in item[1])):
+            durations = sorted(ms for ms, _path in entries)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{view}: {len(entries)} profiles, median {durations[len(durations) // 2]} ms, '
+                f'slowest {durations[-1]} ms'
+            ))
+            output = io.StringIO()
+            stats = pstats.Stats(*(path for _ms, path in entries), stream=output)
+            stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
+            self.stdout.write(output.getvalue())
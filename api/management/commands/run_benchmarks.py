@@ -0,0 +1,244 @@
+import csv
+import datetime
+import io
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+
+from employees.caching import bump_employee_generation
+from employees.models import DynamicForm, Employee, EmployeeChange
+from employees.validation import get_validator
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the main request paths in-process against a dataset made by '
+        'seed_benchmark_data and write the results as JSON. Rows written by the '
+        'write scenarios are removed afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='bench', help='The --prefix given to seed_benchmark_data')
+        parser.add_argument('--password', default='benchmark-pass')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--import-rows', type=int, default=500, help='Rows per bulk import iteration')
+        parser.add_argument('--only', default='', help='Comma separated scenario names')
+        parser.add_argument('--output', default=None, help='Defaults to benchmark-<timestamp>.json')
+        parser.add_argument('--compare', default=None, help='Earlier results file to compare p50 against')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Percent p50 slowdown reported as a regression')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=f"{options['prefix']}_user_0000").first()
+        forms = list(
+            DynamicForm.objects.filter(name__startswith=f"{options['prefix']} ", is_active=True)
+            .order_by('-employee_count')
+        )
+        if user is None or not forms:
+            raise CommandError('No seeded data found; run seed_benchmark_data first')
+        self.options = options
+        self.user = user
+        self.form = forms[0]
+        self.client = Client()
+        # Like the test runner: no per-query logging, which DEBUG turns on
+        with override_settings(DEBUG=False):
+            self._run()
+
+    def _run(self):
+        options = self.options
+        self._login()
+
+        scenarios = self._scenarios()
+        only = {name.strip() for name in options['only'].split(',') if name.strip()}
+        unknown = only - {name for name, _run, _setup in scenarios}
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        last_employee = Employee.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        last_change = EmployeeChange.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        results = {}
+        try:
+            self.scratch_id = self._create_scratch_employee()
+            self.stdout.write(f"{'scenario':<16}{'p50 ms':>9}{'p95 ms':>9}{'mean ms':>9}{'ops/s':>9}{'queries':>9}")
+            for name, run, setup in scenarios:
+                if only and name not in only:
+                    continue
+                results[name] = self._measure(run, setup)
+                result = results[name]
+                self.stdout.write(
+                    f"{name:<16}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['mean_ms']:>9.2f}"
+                    f"{result['ops_per_sec']:>9.1f}{result['queries']:>9}"
+                )
+        finally:
+            self._cleanup(last_employee, last_change)
+
+        report = {'meta': self._meta(), 'results': results}
+        output = options['output'] or f"benchmark-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if options['compare']:
+            self._compare(options['compare'], results, options['threshold'])
+
+    def _login(self):
+        response = self.client.post(
+            '/api/auth/login/', {'username': self.user.username, 'password': self.options['password']},
+            content_type='application/json',
+        )
+        if response.status_code != 200:
+            raise CommandError(f'Could not log in as {self.user.username}: {response.status_code}')
+        self.tokens = response.json()['tokens']
+        self.auth = {'HTTP_AUTHORIZATION': f"Bearer {self.tokens['access']}"}
+
+    def _scenarios(self):
+        """(name, request callable taking the iteration number, untimed setup or None)"""
+        form = self.form
+        terms = sorted({
+            name.split()[-1] for name in
+            Employee.objects.filter(form=form, is_active=True).values_list('display_name', flat=True)[:200]
+            if name
+        }) or ['a']
+        sample = Employee.objects.filter(form=form, is_active=True).values_list('employee_data', flat=True).first()
+        fresh = bump_employee_generation  # Lists and statistics are otherwise served from cache
+
+        def get(url):
+            return lambda i: self.client.get(url.format(i=i, term=terms[i % len(terms)]), **self.auth)
+
+        def post_json(url, payload):
+            return lambda i: self.client.post(url, payload(i), content_type='application/json', **self.auth)
+
+        return [
+            ('login', lambda i: self.client.post(
+                '/api/auth/login/', {'username': self.user.username, 'password': self.options['password']},
+                content_type='application/json',
+            ), None),
+            ('token_refresh', post_json('/api/auth/token/refresh/', lambda i: {'refresh': self.tokens['refresh']}),
+             None),
+            ('list', get('/api/employees/'), fresh),
+            ('list_cached', get('/api/employees/'), None),
+            ('list_form', get(f'/api/employees/?form_id={form.id}&order=display_name'), fresh),
+            ('search', get('/api/employees/?search={term}'), fresh),
+            ('statistics', get('/api/employees/statistics/?by_creator=true&period=month'), fresh),
+            ('create', post_json('/api/employees/', lambda i: {
+                'form_id': form.id, 'employee_data': dict(sample, full_name=f'Benchmark Create {i}'),
+            }), None),
+            ('edit', lambda i: self.client.patch(
+                f'/api/employees/{self.scratch_id}/',
+                {'employee_data': dict(sample, full_name=f'Benchmark Edit {i}')},
+                content_type='application/json', **self.auth,
+            ), None),
+            ('bulk_import', lambda i: self.client.post(
+                f'/api/forms/{form.id}/import/', {'file': self._import_file(sample, i)}, **self.auth
+            ), None),
+            ('export', self._export, None),
+        ]
+
+    def _export(self, i):
+        response = self.client.get(f'/api/forms/{self.form.id}/export/?export_format=csv', **self.auth)
+        b''.join(response.streaming_content)
+        return response
+
+    def _import_file(self, sample, iteration):
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=list(sample))
+        writer.writeheader()
+        for row in range(self.options['import_rows']):
+            writer.writerow(dict(sample, full_name=f'Benchmark Import {iteration}-{row}'))
+        return SimpleUploadedFile('employees.csv', output.getvalue().encode(), content_type='text/csv')
+
+    def _create_scratch_employee(self):
+        sample = Employee.objects.filter(form=self.form, is_active=True).values_list('employee_data', flat=True).first()
+        cleaned, errors = get_validator(self.form).clean(dict(sample, full_name='Benchmark Scratch'))
+        if errors:
+            raise CommandError(f'Seeded data does not validate: {errors}')
+        return Employee.objects.create(form=self.form, employee_data=cleaned, created_by=self.user).id
+
+    def _measure(self, run, setup):
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries[-1] += 1
+            return execute(sql, params, many, context)
+
+        timings = []
+        for i in range(self.options['warmup'] + self.options['iterations']):
+            if setup is not None:
+                setup()
+            queries.append(0)
+            with connection.execute_wrapper(count_query):
+                started = time.perf_counter()
+                response = run(i)
+                elapsed = time.perf_counter() - started
+            if response.status_code >= 400:
+                raise CommandError(f'{response.status_code} from {response.request["PATH_INFO"]}')
+            if i >= self.options['warmup']:
+                timings.append(elapsed * 1000)
+
+        measured = queries[self.options['warmup']:]
+        timings.sort()
+        mean = statistics.fmean(timings)
+        return {
+            'iterations': len(timings),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[min(int(0.95 * len(timings)), len(timings) - 1)], 3),
+            'mean_ms': round(mean, 3),
+            'min_ms': round(timings[0], 3),
+            'max_ms': round(timings[-1], 3),
+            'ops_per_sec': round(1000 / mean, 1) if mean else 0,
+            'queries': int(statistics.median(measured)),
+        }
+
+    def _cleanup(self, last_employee, last_change):
+        with transaction.atomic():
+            Employee.objects.filter(id__gt=last_employee).delete()
+            EmployeeChange.objects.filter(id__gt=last_change).delete()
+
+    def _meta(self):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR
+            ).stdout.strip() or None
+        except OSError:
+            commit = None
+        return {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'commit': commit,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'database_profile': getattr(settings, 'DATABASE_PROFILE', None),
+            'iterations': self.options['iterations'],
+            'import_rows': self.options['import_rows'],
+            'dataset': {
+                'users': User.objects.count(),
+                'forms': DynamicForm.objects.filter(is_active=True).count(),
+                'employees': Employee.objects.filter(is_active=True).count(),
+            },
+        }
+
+    def _compare(self, path, results, threshold):
+        with open(path) as f:
+            baseline = json.load(f)
+        self.stdout.write(f"\nCompared with {path} ({baseline['meta'].get('commit') or 'unknown commit'}):")
+        self.stdout.write(f"{'scenario':<16}{'before':>9}{'after':>9}{'change':>9}")
+        for name, result in results.items():
+            before = baseline['results'].get(name)
+            if before is None:
+                continue
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+            line = f"{name:<16}{before['p50_ms']:>9.2f}{result['p50_ms']:>9.2f}{change:>+8.1f}%"
+            self.stdout.write(self.style.ERROR(line) if change > threshold else line)
@@ -1,3 +1,20 @@
 from django.db import models
 
-# Create your models here.
+
+class RevokedToken(models.Model):
+    """
+    JWT denylist entry, used when JWT_REVOCATION_CACHE_ALIAS is not set: a
+    revoked token id, or a user whose tokens issued up to revoked_before are
+    revoked. Rows are kept until the tokens they cover would have expired.
+    """
+    key = models.CharField(max_length=100, primary_key=True)  # tokens.REVOKED_TOKEN_KEY / REVOKED_BEFORE_KEY
+    revoked_before = models.BigIntegerField(blank=True, null=True)  # Microsecond cutoff of user rows
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        db_table = 'jwt_revoked_token'
+        verbose_name = 'Revoked Token'
+        verbose_name_plural = 'Revoked Tokens'
@@ -0,0 +1,88 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from employees.pagination import InvalidCursor, KeysetPaginator
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    DRF adapter around employees.pagination.KeysetPaginator so the API and
+    the HTML list page share the same cursors and ordering. A view may set
+    keyset_ordering to page over a different unique ordering.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordering = getattr(view, 'keyset_ordering', None) or self.ordering
+        paginator = KeysetPaginator(ordering=ordering)
+        try:
+            self.page = paginator.paginate(
+                queryset,
+                cursor=request.query_params.get(self.cursor_query_param),
+                page_size=request.query_params.get(self.page_size_query_param),
+            )
+        except InvalidCursor:
+            raise ValidationError({'error': 'Invalid cursor'})
+        return self.page.items
+
+    async def apaginate_queryset(self, queryset, request, ordering=None):
+        """Async twin of paginate_queryset() for plain Django (ASGI) requests"""
+        self.request = request
+        paginator = KeysetPaginator(ordering=ordering or self.ordering)
+        try:
+            self.page = await paginator.apaginate(
+                queryset,
+                cursor=request.GET.get(self.cursor_query_param),
+                page_size=request.GET.get(self.page_size_query_param),
+            )
+        except InvalidCursor:
+            raise ValidationError({'error': 'Invalid cursor'})
+        return self.page.items
+
+    def get_next_link(self):
+        if not self.page.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.page.next_cursor)
+
+    def get_previous_link(self):
+        if not self.page.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.page.previous_cursor)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class EmployeeCursorPagination(KeysetCursorPagination):
+    """Newest employees first, matching Employee.Meta.ordering"""
+    ordering = ('-created_at', '-id')
+
+
+class JobCursorPagination(KeysetCursorPagination):
+    """Newest jobs first"""
+    ordering = ('-id',)
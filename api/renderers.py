@@ -0,0 +1,45 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from employee_system.metrics import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed. Falls back to
+    DRF's encoder for indented (browsable) output, data orjson cannot encode,
+    or when orjson is missing.
+    """
+    _fallback_encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('serialize'):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(data, default=self._fallback_encoder.default)
+        except orjson.JSONEncodeError:
+            # Values orjson refuses, such as ints beyond 64 bits stored before they were bounded
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class PrometheusTextRenderer(BaseRenderer):
+    """Plain text metrics exposition; error details become comments"""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = ''.join(f'# {key}: {value}\n' for key, value in data.items())
+        return data.encode(self.charset)
@@ -1,6 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from employees.models import DynamicForm, Employee
+from django.urls import reverse
+from employees import projections
+from employees.models import DynamicForm, Employee, display_fields_error
+from employees.validation import get_validator
+from jobs.models import Job
+from .fieldsets import SparseFieldsetMixin, TimedListSerializer
 
 User = get_user_model()
 
@@ -32,19 +37,18 @@ class UserSerializer(serializers.ModelSerializer):
                   'phone_number', 'date_of_birth', 'address']
         read_only_fields = ['id']
 
-class DynamicFormSerializer(serializers.ModelSerializer):
+class DynamicFormSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for dynamic forms"""
-    created_by = UserSerializer(read_only=True)
-    employee_count = serializers.SerializerMethodField()
+    created_by = serializers.PrimaryKeyRelatedField(read_only=True)
+    employee_count = serializers.IntegerField(read_only=True)
+    version = serializers.PrimaryKeyRelatedField(read_only=True)
     
     class Meta:
         model = DynamicForm
-        fields = ['id', 'name', 'description', 'fields_config', 'created_by', 
+        fields = ['id', 'name', 'description', 'fields_config', 'display_fields', 'version', 'created_by', 
                   'created_at', 'updated_at', 'is_active', 'employee_count']
-        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
-    
-    def get_employee_count(self, obj):
-        return obj.employees.filter(is_active=True).count()
+        read_only_fields = ['id', 'version', 'created_by', 'created_at', 'updated_at', 'employee_count']
+        list_serializer_class = TimedListSerializer
     
     def validate_fields_config(self, value):
         """Validate fields configuration structure"""
@@ -59,36 +63,94 @@ class DynamicFormSerializer(serializers.ModelSerializer):
                     "Each field must have 'name', 'type', and 'label' keys"
                 )
         
+        reserved = projections.invalid_indexed_names(value)
+        if reserved:
+            raise serializers.ValidationError(projections.reserved_names_error(reserved))
         return value
+    
+    def validate(self, attrs):
+        """Display fields must be part of the form's fields"""
+        fields_config = attrs.get('fields_config', getattr(self.instance, 'fields_config', []))
+        display_fields = attrs.get('display_fields', getattr(self.instance, 'display_fields', []))
+        error = display_fields_error(display_fields, fields_config)
+        if error:
+            raise serializers.ValidationError({'display_fields': error})
+        return attrs
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for employees"""
-    form = DynamicFormSerializer(read_only=True)
+    form = serializers.PrimaryKeyRelatedField(read_only=True)
     form_id = serializers.PrimaryKeyRelatedField(
         queryset=DynamicForm.objects.filter(is_active=True),
         source='form',
         write_only=True
     )
-    created_by = UserSerializer(read_only=True)
+    form_version = serializers.PrimaryKeyRelatedField(read_only=True)
+    created_by = serializers.PrimaryKeyRelatedField(read_only=True)
     display_name = serializers.CharField(source='get_display_name', read_only=True)
     
     class Meta:
         model = Employee
-        fields = ['id', 'form', 'form_id', 'employee_data', 'created_by', 
+        fields = ['id', 'form', 'form_id', 'form_version', 'employee_data', 'created_by', 
                   'created_at', 'updated_at', 'is_active', 'display_name']
-        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'form_version', 'created_by', 'created_at', 'updated_at']
+        list_serializer_class = TimedListSerializer
     
     def validate_employee_data(self, value):
         """Validate employee data against form fields"""
         if not isinstance(value, dict):
             raise serializers.ValidationError("Employee data must be a dictionary")
         return value
+    
+    def validate(self, attrs):
+        """
+        Type-check and normalize employee_data with the compiled validator of
+        the form's current version, which the employee then points at
+        """
+        form = attrs.get('form') or getattr(self.instance, 'form', None)
+        if form is None:
+            return attrs
+        data = attrs.get('employee_data', getattr(self.instance, 'employee_data', None))
+        cleaned, errors = get_validator(form).clean(data)
+        if errors:
+            raise serializers.ValidationError({'employee_data': errors})
+        attrs['employee_data'] = cleaned
+        attrs['form_version_id'] = form.version_id
+        return attrs
 
-class EmployeeListSerializer(serializers.ModelSerializer):
+class EmployeeListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for employee listing"""
     form_name = serializers.CharField(source='form.name', read_only=True)
     display_name = serializers.CharField(source='get_display_name', read_only=True)
     
     class Meta:
         model = Employee
-        fields = ['id', 'form_name', 'display_name', 'created_at', 'is_active']
\ No newline at end of file
+        fields = ['id', 'form_name', 'display_name', 'created_at', 'is_active']
+        list_serializer_class = TimedListSerializer
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for background jobs (read-only; jobs are submitted through JobViewSet.create)"""
+    created_by = serializers.PrimaryKeyRelatedField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'params', 'status', 'progress', 'result', 'error', 'attempts',
+                  'max_attempts', 'cancel_requested', 'download_url', 'created_by', 'created_at',
+                  'started_at', 'finished_at']
+        read_only_fields = fields
+    
+    def get_download_url(self, job):
+        if not job.output_file or job.status != Job.SUCCEEDED:
+            return None
+        url = reverse('api-job-download', args=[job.id])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+DynamicFormSerializer.expandable_fields = {
+    'created_by': lambda **kwargs: UserSerializer(read_only=True),
+}
+EmployeeSerializer.expandable_fields = {
+    'form': lambda **kwargs: DynamicFormSerializer(read_only=True, **kwargs),
+    'created_by': lambda **kwargs: UserSerializer(read_only=True),
+}
@@ -0,0 +1,42 @@
+"""
+Keep stateless JWT auth honest when a user changes: a new password or a
+deactivated account revokes every token issued so far, and any save drops
+the cached full user.
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import forget_user
+from .tokens import revoke_user_tokens
+
+REVOKING_FIELDS = ('password', 'is_active')
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def detect_credential_change(sender, instance, update_fields=None, **kwargs):
+    instance._revoke_tokens = False
+    if instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(REVOKING_FIELDS):
+        return
+    previous = sender.objects.filter(pk=instance.pk).values(*REVOKING_FIELDS).first()
+    if previous is None:
+        return
+    instance._revoke_tokens = (
+        previous['password'] != instance.password
+        or (previous['is_active'] and not instance.is_active)
+    )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def revoke_changed_credentials(sender, instance, **kwargs):
+    forget_user(instance.pk)
+    if getattr(instance, '_revoke_tokens', False):
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def revoke_deleted_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+    revoke_user_tokens(instance.pk)
@@ -1,3 +1,928 @@
-from django.test import TestCase
+import base64
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from api.checks import check_response_cache, check_revocation_cache
+from api.serializers import EmployeeListSerializer
+from api.tokens import EmployeeRefreshToken
+from employee_system import metrics
+from employees import changes
+from employees.models import DynamicForm, Employee, EmployeeChange
+
+
+class EmployeeCountQueryTests(TestCase):
+    """employee_count is read from DynamicForm, never counted per object"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.forms = [
+            DynamicForm.objects.create(
+                name=f'Form {i}',
+                fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+                created_by=cls.user,
+            )
+            for i in range(5)
+        ]
+        for form in cls.forms:
+            for j in range(3):
+                Employee.objects.create(
+                    form=form, employee_data={'full_name': f'Employee {j}'}, created_by=cls.user
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_form_list_query_count_is_constant(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/forms/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({form['employee_count'] for form in response.json()}, {3})
+
+    def test_employee_detail_does_not_count_employees(self):
+        employee = Employee.objects.filter(form=self.forms[0]).first()
+        # One query for the ETag, one for the employee with its form and users
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                f'/api/employees/{employee.id}/?expand=form,form.created_by,created_by'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['form']['employee_count'], 3)
+
+    def test_counter_follows_create_and_soft_delete(self):
+        form = self.forms[1]
+        employee = Employee.objects.create(form=form, employee_data={}, created_by=self.user)
+        form.refresh_from_db()
+        self.assertEqual(form.employee_count, 4)
+
+        response = self.client.delete(f'/api/employees/{employee.id}/')
+        self.assertEqual(response.status_code, 204)
+        form.refresh_from_db()
+        self.assertEqual(form.employee_count, 3)
+
+    def test_counter_follows_reactivation_moves_and_hard_deletes(self):
+        source, target = self.forms[2], self.forms[3]
+        employee = Employee.objects.filter(form=source).first()
+
+        employee.is_active = False
+        employee.save()
+        employee.is_active = True
+        employee.save()
+        employee.form = target
+        employee.save()
+        source.refresh_from_db()
+        target.refresh_from_db()
+        self.assertEqual((source.employee_count, target.employee_count), (2, 4))
+
+        employee.delete()
+        Employee.objects.filter(form=source).first().delete()
+        source.refresh_from_db()
+        target.refresh_from_db()
+        self.assertEqual((source.employee_count, target.employee_count), (1, 3))
+        self.assertEqual(
+            {form['id']: form['employee_count'] for form in self.client.get('/api/forms/').json()}[source.id], 1
+        )
+
+
+class FormDefinitionCacheTests(TestCase):
+    """Form fields are served from the definition cache with ETag/Last-Modified"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        self.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/forms/{self.form.id}/fields/'
+
+    def test_fields_not_modified_until_the_form_changes(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        fields_config = self.form.fields_config + [{'name': 'city', 'label': 'City', 'type': 'text'}]
+        response = self.client.patch(
+            f'/api/forms/{self.form.id}/', {'fields_config': fields_config}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([field['name'] for field in response.json()['fields']], ['full_name', 'city'])
+
+    def test_inactive_forms_are_not_found(self):
+        self.client.get(self.url)
+        self.form.is_active = False
+        self.form.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class ConditionalRequestTests(TestCase):
+    """Employee responses carry ETags computed before serialization"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by=cls.user,
+        )
+        cls.employee = Employee.objects.create(
+            form=cls.form, employee_data={'full_name': 'Ada Lovelace'}, created_by=cls.user
+        )
+
+    def setUp(self):
+        # A bearer token authenticates both the DRF views and their async twins
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {EmployeeRefreshToken.for_user(self.user).access_token}'
+        )
+
+    def test_not_modified_until_a_write(self):
+        detail = f'/api/employees/{self.employee.id}/'
+        for url in ('/api/employees/', detail, f'/api/async/employees/{self.employee.id}/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            etag = response['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304, url)
+
+        response = self.client.get(detail)
+        etag = response['ETag']
+        list_etag = self.client.get('/api/employees/')['ETag']
+        response = self.client.patch(detail, {'employee_data': {'full_name': 'Ada King'}}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        # New ETags, and the cached responses are not served again
+        response = self.client.get(detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['employee_data'], {'full_name': 'Ada King'})
+        response = self.client.get('/api/employees/', HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['display_name'], 'Ada King')
+
+    def test_etag_depends_on_query_params(self):
+        etag = self.client.get('/api/employees/')['ETag']
+        response = self.client.get('/api/employees/?fields=id', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{'id': self.employee.id}])
+
+    @override_settings(JWT_REVOCATION_CACHE_ALIAS='default')
+    def test_list_etag_needs_no_query(self):
+        for url in ('/api/employees/', '/api/async/employees/'):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304, url)
+
+    def test_form_rename_changes_list_etag(self):
+        etag = self.client.get('/api/employees/')['ETag']
+        self.form.name = 'Employees'
+        self.form.save()
+        response = self.client.get('/api/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['form_name'], 'Employees')
+
+    @override_settings(ALLOWED_HOSTS=['a.example.com', 'b.example.com'])
+    def test_cached_links_follow_the_host(self):
+        Employee.objects.create(form=self.form, employee_data={'full_name': 'Grace Hopper'}, created_by=self.user)
+        for url in ('/api/employees/?page_size=1', '/api/async/employees/?page_size=1'):
+            first = self.client.get(url, HTTP_HOST='a.example.com')
+            second = self.client.get(url, HTTP_HOST='b.example.com')
+            self.assertNotEqual(first['ETag'], second['ETag'])
+            self.assertTrue(first.json()['next'].startswith('http://a.example.com/'), url)
+            self.assertTrue(second.json()['next'].startswith('http://b.example.com/'), url)
+
+    @override_settings(EMPLOYEE_RESPONSE_CACHE_ALIAS=None)
+    def test_list_etag_without_a_generation(self):
+        etag = self.client.get('/api/employees/')['ETag']
+        self.assertEqual(self.client.get('/api/employees/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Employee.objects.create(form=self.form, employee_data={'full_name': 'Grace Hopper'}, created_by=self.user)
+        response = self.client.get('/api/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, len(response.json()['results'])), (200, 2))
+
+    @override_settings(DEBUG=False)
+    def test_process_local_response_cache_warns(self):
+        self.assertEqual([warning.id for warning in check_response_cache(None)], ['api.W001'])
+
+    def test_detail_with_malformed_pk_is_not_found(self):
+        self.assertEqual(self.client.get('/api/employees/abc/').status_code, 404)
+        self.assertEqual(self.client.get('/api/employees/999999/').status_code, 404)
+
+
+class FastListTests(TestCase):
+    """The list fast path returns exactly what EmployeeListSerializer would"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by=cls.user,
+        )
+        for data in ({'full_name': 'Ada Lovelace'}, {}, {'full_name': 'Grace Hopper'}):
+            Employee.objects.create(form=cls.form, employee_data=data, created_by=cls.user)
+
+    def test_matches_serializer(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {EmployeeRefreshToken.for_user(self.user).access_token}')
+        expected = json.loads(json.dumps(EmployeeListSerializer(
+            Employee.objects.filter(is_active=True).order_by('-created_at', '-id'), many=True
+        ).data))
+        self.assertIn('Employee #', ''.join(row['display_name'] for row in expected))
+        for url in ('/api/employees/', '/api/async/employees/'):
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['results'], expected, url)
+
+
+    def test_renders_values_orjson_rejects(self):
+        # Stored before numbers were bounded to 64 bits
+        employee = Employee.objects.create(
+            form=self.form, employee_data={'full_name': 'Big', 'badge': 2 ** 70}, created_by=self.user
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {EmployeeRefreshToken.for_user(self.user).access_token}')
+        for url in (f'/api/employees/{employee.id}/', f'/api/async/employees/{employee.id}/'):
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(response.json()['employee_data']['badge'], 2 ** 70, url)
+        changes_page = client.get('/api/employees/changes/').json()
+        self.assertEqual(changes_page['results'][-1]['employee']['employee_data']['badge'], 2 ** 70)
+
+class SparseFieldsetTests(TestCase):
+    """?fields=, ?omit= and ?expand= trim and nest employee responses"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[
+                {'name': 'full_name', 'label': 'Full Name', 'type': 'text'},
+                {'name': 'city', 'label': 'City', 'type': 'text'},
+            ],
+            created_by=cls.user,
+        )
+        cls.employee = Employee.objects.create(
+            form=cls.form, employee_data={'full_name': 'Ada Lovelace', 'city': 'London'}, created_by=cls.user
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, query):
+        response = self.client.get(f'/api/employees/{self.employee.id}/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_fields_and_omit(self):
+        self.assertEqual(
+            self.get('fields=id,employee_data.city'),
+            {'id': self.employee.id, 'employee_data': {'city': 'London'}},
+        )
+        self.assertEqual(set(self.get('fields=id,employee_data')['employee_data']), {'full_name', 'city'})
+        data = self.get('omit=created_at,updated_at,employee_data')
+        self.assertNotIn('created_at', data)
+        self.assertNotIn('employee_data', data)
+        self.assertEqual(data['display_name'], 'Ada Lovelace')
+
+        response = self.client.get('/api/employees/?fields=id,display_name')
+        self.assertEqual(response.json()['results'], [{'id': self.employee.id, 'display_name': 'Ada Lovelace'}])
+        response = self.client.get('/api/employees/?omit=created_at,form_name')
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'display_name', 'is_active'})
+
+    def test_expand(self):
+        self.assertEqual(self.get('fields=form')['form'], self.form.id)
+        form = self.get('fields=form,created_by&expand=form,form.created_by')['form']
+        self.assertEqual((form['name'], form['created_by']['username']), ('Staff', 'hr'))
+        self.assertEqual(self.get('expand=created_by')['created_by']['username'], 'hr')
+
+
+class StatisticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[{'name': 'city', 'label': 'City', 'type': 'text'}],
+            created_by=cls.user,
+        )
+        for city in ('Pune', 'Pune', 'Goa'):
+            Employee.objects.create(form=cls.form, employee_data={'city': city}, created_by=cls.user)
+
+    def setUp(self):
+        # A bearer token authenticates both the DRF view and its async twin
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {EmployeeRefreshToken.for_user(self.user).access_token}'
+        )
+
+    def test_breakdowns(self):
+        for prefix in ('/api/', '/api/async/'):
+            response = self.client.get(
+                f'{prefix}employees/statistics/?period=day&form_id={self.form.id}&field=city'
+            )
+            self.assertEqual(response.status_code, 200, prefix)
+            data = response.json()
+            self.assertEqual(sum(row['employee_count'] for row in data['period_breakdown']), 3)
+            self.assertEqual(
+                {row['value']: row['count'] for row in data['field_histogram']['values']}, {'Pune': 2, 'Goa': 1}
+            )
+
+    def test_rejects_malformed_form_id(self):
+        for prefix in ('/api/', '/api/async/'):
+            for query in ('form_id=x', 'period=day&form_id=x', 'field=city&form_id=1.5'):
+                response = self.client.get(f'{prefix}employees/statistics/?{query}')
+                self.assertEqual(response.status_code, 400, f'{prefix} {query}')
+
+
+class BulkEmployeeTests(TestCase):
+    """Bulk create/update/delete validate every row first and write all or nothing"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        self.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[
+                {'name': 'full_name', 'label': 'Full Name', 'type': 'text', 'required': True},
+                {'name': 'age', 'label': 'Age', 'type': 'number'},
+            ],
+            created_by=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bulk(self, method, payload):
+        return getattr(self.client, method)('/api/employees/bulk/', payload, format='json')
+
+    def test_create_update_delete(self):
+        response = self.bulk('post', {'form_id': self.form.id, 'records': [
+            {'full_name': 'Ada', 'age': '36'}, {'full_name': 'Grace'},
+        ]})
+        self.assertEqual(response.status_code, 201)
+        ada_id, grace_id = response.json()['ids']
+        self.assertEqual(Employee.objects.get(id=ada_id).employee_data, {'full_name': 'Ada', 'age': 36})
+        self.form.refresh_from_db()
+        self.assertEqual(self.form.employee_count, 2)
+
+        response = self.bulk('patch', {'records': [{'id': grace_id, 'employee_data': {'full_name': 'Grace H'}}]})
+        self.assertEqual(response.json(), {'updated': 1, 'ids': [grace_id]})
+        self.assertEqual(Employee.objects.get(id=grace_id).display_name, 'Grace H')
+
+        response = self.bulk('delete', {'ids': [ada_id, grace_id, 999999]})
+        self.assertEqual(response.json(), {'deleted': 2})
+        self.assertFalse(Employee.objects.filter(is_active=True).exists())
+        self.form.refresh_from_db()
+        self.assertEqual(self.form.employee_count, 0)
+
+    def test_invalid_rows_write_nothing(self):
+        response = self.bulk('post', {'form_id': self.form.id, 'records': [
+            {'full_name': 'Ada'}, {'age': 'old'},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([row['index'] for row in response.json()['errors']], [1])
+        self.assertFalse(Employee.objects.exists())
+
+        employee = Employee.objects.create(
+            form=self.form, employee_data={'full_name': 'Ada'}, created_by=self.user
+        )
+        response = self.bulk('patch', {'records': [
+            {'id': employee.id, 'employee_data': {'full_name': 'Ada L'}},
+            {'id': 999999, 'employee_data': {'full_name': 'Nobody'}},
+            {'id': True, 'employee_data': {'full_name': 'Bool'}},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([row['index'] for row in response.json()['errors']], [1, 2])
+        employee.refresh_from_db()
+        self.assertEqual(employee.employee_data, {'full_name': 'Ada'})
+
+    @override_settings(EMPLOYEE_BULK_MAX_RECORDS=2)
+    def test_delete_rejects_bools_and_oversized_batches(self):
+        employee = Employee.objects.create(
+            form=self.form, employee_data={'full_name': 'Ada'}, created_by=self.user
+        )
+        self.assertEqual(self.bulk('delete', {'ids': [True]}).status_code, 400)
+        self.assertEqual(self.bulk('delete', {'ids': [employee.id, 2, 3]}).status_code, 400)
+        self.assertTrue(Employee.objects.get(id=employee.id).is_active)
+
+
+class ExportImportTests(TestCase):
+    """A form's export imports back into a form with the same fields"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        fields_config = [
+            {'name': 'full_name', 'label': 'Full Name', 'type': 'text', 'required': True},
+            {'name': 'age', 'label': 'Age', 'type': 'number'},
+        ]
+        self.source, self.target = [
+            DynamicForm.objects.create(name=name, fields_config=fields_config, created_by=self.user)
+            for name in ('Source', 'Target')
+        ]
+        for name, age in (('Ada', 36), ('Grace, "Amazing"', 85), ('Linus', '')):
+            Employee.objects.create(
+                form=self.source, employee_data={'full_name': name, 'age': age}, created_by=self.user
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def data(self, form):
+        return sorted(
+            (data['full_name'], data.get('age') or None)
+            for data in Employee.objects.filter(form=form).values_list('employee_data', flat=True)
+        )
+
+    def round_trip(self, export_format, file_name):
+        response = self.client.get(f'/api/forms/{self.source.id}/export/?export_format={export_format}')
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content)
+        upload = SimpleUploadedFile(file_name, content)
+        response = self.client.post(f'/api/forms/{self.target.id}/import/', {'file': upload})
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def test_csv_round_trip(self):
+        result = self.round_trip('csv', 'employees.csv')
+        self.assertEqual((result['imported'], result['rejected']), (3, 0))
+        self.assertEqual(self.data(self.target), self.data(self.source))
+
+    def test_ndjson_round_trip_with_rejected_rows(self):
+        Employee.objects.create(form=self.source, employee_data={'age': 1}, created_by=self.user)
+        result = self.round_trip('ndjson', 'employees.jsonl')
+        self.assertEqual((result['processed'], result['imported'], result['rejected']), (4, 3, 1))
+        self.assertEqual(list(result['rejected_rows'][0]['errors']), ['full_name'])
+        self.assertEqual(len(self.data(self.target)), 3)
+
+    def import_file(self, file_name, content):
+        upload = SimpleUploadedFile(file_name, content)
+        response = self.client.post(f'/api/forms/{self.target.id}/import/', {'file': upload})
+        self.assertEqual(response.status_code, 201, response.content)
+        result = response.json()
+        return (result['processed'], result['imported'], result['rejected']), {
+            row['line']: row['errors']['record'] for row in result['rejected_rows']
+        }
+
+    def test_rejects_undecodable_lines(self):
+        counts, errors = self.import_file('employees.jsonl', (
+            b'{"full_name": "Ada"}\n{"full_name": "Gr\xe2ce"}\n{"full_name": "Linus"}\n'
+        ))
+        self.assertEqual((counts, errors), ((3, 2, 1), {2: 'Invalid UTF-8'}))
+        counts, errors = self.import_file('employees.csv', b'full_name,age\nAda,1\n\xffGrace,2\nLin\x00us,3\n')
+        self.assertEqual((counts, errors), ((3, 1, 2), {3: 'Invalid UTF-8', 4: 'NUL characters are not allowed'}))
+
+    def test_rejects_non_finite_json_numbers(self):
+        counts, errors = self.import_file('employees.jsonl', (
+            b'{"full_name": "Ada", "age": NaN}\n'
+            b'{"full_name": "Grace", "age": -Infinity}\n'
+            b'{"full_name": "Linus"}\n'
+        ))
+        self.assertEqual((counts, errors), ((3, 1, 2), {1: 'Invalid JSON', 2: 'Invalid JSON'}))
+        self.assertEqual(self.data(self.target), [('Linus', None)])
+
+    def test_rejects_malformed_csv_rows(self):
+        limit = csv.field_size_limit(20)
+        self.addCleanup(csv.field_size_limit, limit)
+        counts, errors = self.import_file('employees.csv', b'full_name\nAda\n' + b'x' * 30 + b'\nLinus\n')
+        self.assertEqual(counts, (3, 2, 1))
+        self.assertEqual(list(errors.values()), ['Invalid CSV: field larger than field limit (20)'])
+
+
+class KeysetPaginationTests(TestCase):
+    """Employee list cursors walk both ways, even across rows with the same created_at"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by=cls.user,
+        )
+        for i in range(7):
+            Employee.objects.create(form=cls.form, employee_data={'full_name': f'Employee {i}'}, created_by=cls.user)
+        # Every row shares one timestamp, so only the id tie-breaker orders them
+        Employee.objects.update(created_at=timezone.now())
+        cls.expected = list(Employee.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {EmployeeRefreshToken.for_user(self.user).access_token}'
+        )
+
+    def walk(self, url, direction):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            data = response.json()
+            pages.append([row['id'] for row in data['results']])
+            url = data[direction]
+        return pages, data
+
+    def test_next_and_previous(self):
+        for prefix in ('/api/', '/api/async/'):
+            pages, last = self.walk(f'{prefix}employees/?page_size=3', 'next')
+            self.assertEqual(pages, [self.expected[:3], self.expected[3:6], self.expected[6:]], prefix)
+            self.assertIsNone(last['next'])
+            back, first = self.walk(last['previous'], 'previous')
+            self.assertEqual(back, [self.expected[3:6], self.expected[:3]], prefix)
+            self.assertIsNone(first['previous'])
+
+    def test_invalid_cursors(self):
+        next_cursor = self.client.get('/api/employees/?page_size=3').json()['next'].split('cursor=')[1]
+        tampered = [
+            'bogus',
+            base64.urlsafe_b64encode(b'{"v": ["yesterday", 1], "r": 0}').decode(),
+            base64.urlsafe_b64encode(b'{"v": [1], "r": 0}').decode(),
+            base64.urlsafe_b64encode(b'[]').decode(),
+            next_cursor[:-4],
+        ]
+        for prefix in ('/api/', '/api/async/'):
+            for cursor in tampered:
+                response = self.client.get(f'{prefix}employees/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 400, (prefix, cursor))
+                self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+    def test_invalid_form_id(self):
+        for prefix in ('/api/', '/api/async/'):
+            for form_id in ('abc', '\u00b2'):
+                response = self.client.get(f'{prefix}employees/', {'form_id': form_id})
+                self.assertEqual(response.status_code, 400, (prefix, form_id))
+                self.assertEqual(response.json(), {'error': 'form_id must be an integer'})
+
+
+class AsyncViewTests(TestCase):
+    """The /api/async/ read endpoints answer like their DRF twins"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[
+                {'name': 'full_name', 'label': 'Full Name', 'type': 'text'},
+                {'name': 'salary', 'label': 'Salary', 'type': 'number', 'indexed': True},
+            ],
+            created_by=cls.user,
+        )
+        for i in range(5):
+            Employee.objects.create(
+                form=cls.form, employee_data={'full_name': f'Employee {i}', 'salary': i * 10}, created_by=cls.user
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {EmployeeRefreshToken.for_user(self.user).access_token}'
+        )
+
+    def assertSameResponse(self, path):
+        sync = self.client.get(f'/api/{path}')
+        asynchronous = self.client.get(f'/api/async/{path}')
+        self.assertEqual(asynchronous.status_code, sync.status_code, path)
+        # Pagination links point back at the endpoint that served them
+        body = json.loads(asynchronous.content.decode().replace('/api/async/', '/api/'))
+        self.assertEqual(body, sync.json(), path)
+        return asynchronous
+
+    def test_responses_match(self):
+        employee_id = Employee.objects.first().id
+        for path in (
+            'employees/',
+            f'employees/?form_id={self.form.id}&salary__gte=20&order=-salary&fields=id,display_name',
+            'employees/?search=employee+3',
+            'employees/?cursor=bogus',
+            f'employees/{employee_id}/?fields=id,employee_data.salary',
+            'employees/statistics/',
+            'forms/',
+            f'forms/{self.form.id}/',
+            f'forms/{self.form.id}/fields/',
+        ):
+            self.assertSameResponse(path)
+
+    def test_cursor_pages(self):
+        response = self.assertSameResponse('employees/?page_size=2')
+        seen = [row['id'] for row in response.json()['results']]
+        next_link = response.json()['next']
+        while next_link:
+            page = self.client.get(next_link.replace('/api/employees/', '/api/async/employees/')).json()
+            seen.extend(row['id'] for row in page['results'])
+            next_link = page['next']
+        self.assertEqual(seen, list(Employee.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_authentication_and_not_found(self):
+        self.assertEqual(APIClient().get('/api/async/employees/').status_code, 401)
+        self.assertEqual(self.client.get('/api/async/employees/999999/').status_code, 404)
+        self.assertEqual(self.client.get('/api/async/forms/999999/').status_code, 404)
+        self.assertEqual(self.client.post('/api/async/employees/').status_code, 405)
+
+
+class ChangeFeedTests(TestCase):
+    """GET /api/employees/changes/ pages through the change log by cursor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by=cls.user,
+        )
+        cls.other_form = DynamicForm.objects.create(
+            name='Contractors',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by=cls.user,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create(self, name, form=None):
+        return Employee.objects.create(
+            form=form or self.form, employee_data={'full_name': name}, created_by=self.user
+        )
+
+    def read_all(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+            url = pages[-1]['next']
+        return pages
+
+    def test_pages_follow_the_log(self):
+        first = self.create('Ann')
+        second = self.create('Bob')
+        contractor = self.create('Cid', form=self.other_form)
+        response = self.client.patch(
+            f'/api/employees/{first.id}/', {'employee_data': {'full_name': 'Ann Lee'}}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.delete(f'/api/employees/{second.id}/').status_code, 204)
+
+        pages = self.read_all('/api/employees/changes/?page_size=2')
+        self.assertEqual([page['has_more'] for page in pages], [True, True, False])
+        results = [row for page in pages for row in page['results']]
+        self.assertEqual(
+            [(row['action'], row['employee_id']) for row in results],
+            [('created', first.id), ('created', second.id), ('created', contractor.id),
+             ('updated', first.id), ('deleted', second.id)],
+        )
+        self.assertEqual(len({row['change_id'] for row in results}), 5)
+        # Rows carry the current state of live employees only
+        self.assertEqual(results[0]['employee']['employee_data']['full_name'], 'Ann Lee')
+        self.assertIsNone(results[1]['employee'])
+        self.assertIsNone(results[4]['employee'])
+
+        # The last cursor resumes with only what happened since
+        since = pages[-1]['since']
+        caught_up = self.client.get('/api/employees/changes/', {'since': since}).json()
+        self.assertEqual((caught_up['results'], caught_up['since'], caught_up['next']), ([], since, None))
+        newest = self.create('Dee')
+        delta = self.client.get('/api/employees/changes/', {'since': since}).json()
+        self.assertEqual([row['employee_id'] for row in delta['results']], [newest.id])
+
+    def test_form_filter(self):
+        self.create('Ann')
+        contractor = self.create('Cid', form=self.other_form)
+        response = self.client.get('/api/employees/changes/', {'form_id': self.other_form.id})
+        self.assertEqual([row['employee_id'] for row in response.json()['results']], [contractor.id])
+        for form_id in ('x', '\u00b2', '1.5'):
+            response = self.client.get('/api/employees/changes/', {'form_id': form_id})
+            self.assertEqual(response.status_code, 400, form_id)
+
+    def test_bad_cursors(self):
+        self.create('Ann')
+        stale = self.client.get('/api/employees/changes/').json()['since']
+        self.create('Bob')
+        self.create('Cid')
+        self.assertEqual(self.client.get('/api/employees/changes/', {'since': 'bogus'}).status_code, 400)
+
+        changes.prune_changes(timezone.now() + datetime.timedelta(seconds=1))
+        response = self.client.get('/api/employees/changes/', {'since': stale})
+        self.assertEqual(response.status_code, 410)
+
+
+class EmployeeEventTests(TestCase):
+    """GET /api/async/employees/events/ as a long poll and as server-sent events"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by=cls.user,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {EmployeeRefreshToken.for_user(self.user).access_token}'
+        )
+
+    def create(self, name):
+        return Employee.objects.create(form=self.form, employee_data={'full_name': name}, created_by=self.user)
+
+    async def read_stream(self, response):
+        return b''.join([chunk async for chunk in response.streaming_content])
+
+    def test_replays_changes_after_the_cursor(self):
+        self.create('Ann')
+        since = self.client.get('/api/employees/changes/').json()['since']
+        bob = self.create('Bob')
+        response = self.client.get('/api/async/employees/events/', {'since': since, 'timeout': 0})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([(row['action'], row['employee_id']) for row in data['results']], [('created', bob.id)])
+        self.assertEqual(data['since'], self.client.get('/api/employees/changes/').json()['since'])
+
+    @override_settings(EMPLOYEE_EVENT_MAX_WAIT=0.01)
+    def test_timeout(self):
+        self.create('Ann')
+        # Without a cursor the poll starts at the newest change and times out empty
+        response = self.client.get('/api/async/employees/events/', {'timeout': 30})
+        self.assertEqual(response.json(), {
+            'since': self.client.get('/api/employees/changes/').json()['since'], 'results': [],
+        })
+        for timeout in ('nan', 'inf', '-inf', 'soon'):
+            response = self.client.get('/api/async/employees/events/', {'timeout': timeout})
+            self.assertEqual(response.status_code, 400, timeout)
+
+    def test_bad_requests(self):
+        self.assertEqual(APIClient().get('/api/async/employees/events/').status_code, 401)
+        for form_id in ('x', '\u00b2', '1.5'):
+            response = self.client.get('/api/async/employees/events/', {'form_id': form_id})
+            self.assertEqual(response.status_code, 400, form_id)
+        self.assertEqual(self.client.get('/api/async/employees/events/', {'since': 'bogus'}).status_code, 400)
+
+    def test_event_stream(self):
+        self.create('Ann')
+        since = self.client.get('/api/employees/changes/').json()['since']
+        bob = self.create('Bob')
+        response = self.client.get(
+            '/api/async/employees/events/', HTTP_ACCEPT='text/event-stream', HTTP_LAST_EVENT_ID=since
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        # Not served by ASGI, so the stream ends after one batch
+        body = async_to_sync(self.read_stream)(response).decode()
+        cursor = self.client.get('/api/employees/changes/').json()['since']
+        self.assertTrue(body.startswith('retry: 1000\n\n'))
+        self.assertIn(f'id: {cursor}\nevent: created\ndata: ', body)
+        self.assertIn(f'"employee_id":{bob.id}', body.replace(' ', ''))
+
+
+class BenchmarkCommandsTests(TestCase):
+    """seed_benchmark_data and run_benchmarks still run end to end"""
+
+    def test_seed_and_run(self):
+        call_command('seed_benchmark_data', users=2, forms=2, employees=20, prefix='smoke', stdout=io.StringIO())
+        self.assertEqual(Employee.objects.filter(form__name__startswith='smoke ').count(), 20)
+        employees = list(Employee.objects.values_list('id', 'employee_data'))
+        form_counts = list(DynamicForm.objects.values_list('id', 'employee_count'))
+        change_count = EmployeeChange.objects.count()
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command(
+                'run_benchmarks', prefix='smoke', iterations=1, warmup=0, import_rows=5, output=output,
+                stdout=io.StringIO(),
+            )
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(len(report['results']), 11)
+        self.assertEqual(report['meta']['dataset']['employees'], 20)
+        # The rows the write scenarios added are gone again
+        self.assertEqual(list(Employee.objects.values_list('id', 'employee_data')), employees)
+        self.assertEqual(EmployeeChange.objects.count(), change_count)
+        self.assertEqual(list(DynamicForm.objects.values_list('id', 'employee_count')), form_counts)
+
+
+class StatelessJWTAuthTests(TestCase):
+    """Bearer tokens are checked without loading the user, and stay revocable"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+
+    def client_for(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client
+
+    def login(self):
+        response = APIClient().post(
+            '/api/auth/login/', {'username': 'hr', 'password': 'secret123'}, format='json'
+        )
+        return response.json()['tokens']
+
+    def test_authentication_does_not_query_the_user(self):
+        client = self.client_for(self.login()['access'])
+        # One denylist lookup besides the form list
+        with self.assertNumQueries(2) as queries:
+            response = client.get('/api/forms/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('"jwt_revoked_token"', queries.captured_queries[0]['sql'])
+
+        with override_settings(JWT_REVOCATION_CACHE_ALIAS='default'), self.assertNumQueries(1):
+            self.assertEqual(client.get('/api/forms/').status_code, 200)
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        tokens = self.login()
+        client = self.client_for(tokens['access'])
+        response = client.post('/api/auth/logout/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(client.get('/api/forms/').status_code, 401)
+        response = APIClient().post('/api/auth/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_password_change_revokes_earlier_tokens(self):
+        access = EmployeeRefreshToken.for_user(self.user).access_token
+        access['iat'] -= 5
+        client = self.client_for(str(access))
+        self.assertEqual(client.get('/api/forms/').status_code, 200)
+
+        self.user.set_password('changed123')
+        self.user.save()
+        self.assertEqual(client.get('/api/forms/').status_code, 401)
+
+    def test_password_change_revokes_tokens_of_the_same_second(self):
+        access = EmployeeRefreshToken.for_user(self.user).access_token
+        self.user.set_password('changed123')
+        self.user.save()
+        self.assertEqual(self.client_for(str(access)).get('/api/forms/').status_code, 401)
+
+        # Tokens issued after the change, even within the same second, still work
+        access = EmployeeRefreshToken.for_user(self.user).access_token
+        self.assertEqual(self.client_for(str(access)).get('/api/forms/').status_code, 200)
+
+    @override_settings(DEBUG=False, JWT_REVOCATION_CACHE_ALIAS='default')
+    def test_process_local_revocation_cache_fails_checks(self):
+        self.assertEqual([error.id for error in check_revocation_cache(None)], ['api.E002'])
+
+
+class RequestMetricsTests(TestCase):
+    """Per-view query counts and timings are exposed to staff in Prometheus format"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = CustomUser.objects.create_user(username='ops', password='secret123', is_staff=True)
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+
+    def setUp(self):
+        metrics.registry.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_records_queries_per_view(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/forms/')
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('http_request_db_queries{view="api-form-list",quantile="0.5"} 1\n', body)
+        self.assertIn('http_requests_total{view="api-form-list",method="GET",status="200"} 1\n', body)
+
+    def test_serialization_is_timed_once_per_response(self):
+        for name in ('Staff', 'Contractors', 'Interns'):
+            DynamicForm.objects.create(name=name, fields_config=[], created_by=self.staff)
+        with mock.patch('api.fieldsets.timed', wraps=metrics.timed) as timed:
+            self.client.get('/api/forms/', {'expand': 'created_by'})
+            self.assertEqual(timed.call_count, 1)
+            self.client.get(f'/api/forms/{DynamicForm.objects.first().id}/')
+            self.assertEqual(timed.call_count, 2)
+
+    def test_metrics_are_staff_only(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get('/api/metrics/').status_code, 403)
@@ -0,0 +1,117 @@
+"""
+JWT issuing and revocation.
+
+Tokens carry the claims StatelessJWTAuthentication needs (username,
+is_staff, is_superuser), so API requests are authenticated without loading
+the user row. Revocation is a denylist of single token ids for logout, plus
+a per-user cutoff that invalidates every token issued up to it (password
+change, deactivation, logout everywhere). The denylist lives in the
+jwt_revoked_token table, shared by every worker and never evicted early, at
+the cost of one indexed query per request; JWT_REVOCATION_CACHE_ALIAS moves
+it to a shared cache such as Redis for no queries at all.
+
+The cutoff is compared with the iat_us claim, the issue time in
+microseconds, since iat has whole seconds only and a token minted in the
+revoking second must not survive.
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import RevokedToken
+
+REVOKED_TOKEN_KEY = 'jwt-revoked:{}'
+REVOKED_BEFORE_KEY = 'jwt-revoked-before:{}'
+ISSUED_CLAIM = 'iat_us'
+
+
+class EmployeeRefreshToken(RefreshToken):
+    """Refresh token whose claims are copied into every access token it mints"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.get_username()
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        token[ISSUED_CLAIM] = time.time_ns() // 1000
+        return token
+
+
+def _cache():
+    alias = getattr(settings, 'JWT_REVOCATION_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def _keys(token):
+    return (
+        REVOKED_TOKEN_KEY.format(token.get(api_settings.JTI_CLAIM)),
+        REVOKED_BEFORE_KEY.format(token.get(api_settings.USER_ID_CLAIM)),
+    )
+
+
+def _issued_us(token):
+    issued = token.get(ISSUED_CLAIM)
+    if issued is None:
+        # Tokens minted without the claim: assume the end of their iat second
+        return (token.get('iat', 0) + 1) * 1_000_000 - 1
+    return issued
+
+
+def _revoked(token, found):
+    token_key, user_key = _keys(token)
+    if token_key in found:
+        return True
+    cutoff = found.get(user_key)
+    return cutoff is not None and _issued_us(token) <= cutoff
+
+
+def _denylist_rows(keys):
+    return RevokedToken.objects.filter(key__in=keys).values_list('key', 'revoked_before')
+
+
+def _save(key, value, timeout):
+    cache = _cache()
+    if cache is not None:
+        cache.set(key, value, timeout)
+        return
+    now = timezone.now()
+    RevokedToken.objects.filter(expires_at__lte=now).delete()
+    RevokedToken.objects.update_or_create(key=key, defaults={
+        'revoked_before': None if value is True else value,
+        'expires_at': now + datetime.timedelta(seconds=timeout),
+    })
+
+
+def revoke_token(token):
+    """Revoke one access or refresh token until it would have expired anyway"""
+    remaining = int(token.get('exp', 0) - time.time())
+    if remaining > 0:
+        _save(_keys(token)[0], True, remaining)
+
+
+def revoke_user_tokens(user_id):
+    """Revoke every token of a user issued up to now"""
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    _save(REVOKED_BEFORE_KEY.format(user_id), time.time_ns() // 1000, int(lifetime.total_seconds()))
+
+
+def is_revoked(token):
+    cache = _cache()
+    keys = _keys(token)
+    if cache is not None:
+        return _revoked(token, cache.get_many(keys))
+    return _revoked(token, {key: cutoff for key, cutoff in _denylist_rows(keys)})
+
+
+async def ais_revoked(token):
+    cache = _cache()
+    keys = _keys(token)
+    if cache is not None:
+        return _revoked(token, await cache.aget_many(keys))
+    return _revoked(token, {key: cutoff async for key, cutoff in _denylist_rows(keys)})
@@ -1,19 +1,30 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
-from . import views
+from . import async_views, views
 
 # Create router for viewsets
 router = DefaultRouter()
 router.register(r'forms', views.DynamicFormViewSet, basename='api-form')
 router.register(r'employees', views.EmployeeViewSet, basename='api-employee')
+router.register(r'jobs', views.JobViewSet, basename='api-job')
 
 urlpatterns = [
     # Authentication endpoints
     path('auth/register/', views.register_api, name='api-register'),
     path('auth/login/', views.login_api, name='api-login'),
-    path('auth/token/refresh/', TokenRefreshView.as_view(), name='api-token-refresh'),
+    path('auth/logout/', views.logout_api, name='api-logout'),
+    path('auth/token/refresh/', views.TokenRefreshApiView.as_view(), name='api-token-refresh'),
     path('auth/profile/', views.user_profile_api, name='api-profile'),
+    path('metrics/', views.metrics_api, name='api-metrics'),
+    
+    # Async (ASGI) read endpoints
+    path('async/employees/', async_views.employee_list, name='api-async-employee-list'),
+    path('async/employees/events/', async_views.employee_events, name='api-async-employee-events'),
+    path('async/employees/statistics/', async_views.employee_statistics, name='api-async-employee-statistics'),
+    path('async/employees/<int:pk>/', async_views.employee_detail, name='api-async-employee-detail'),
+    path('async/forms/', async_views.form_list, name='api-async-form-list'),
+    path('async/forms/<int:pk>/', async_views.form_detail, name='api-async-form-detail'),
+    path('async/forms/<int:pk>/fields/', async_views.form_fields, name='api-async-form-fields'),
     
     # Include router URLs
     path('', include(router.urls)),
@@ -1,16 +1,57 @@
+import json
+
 from rest_framework import status, generics, viewsets
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView
+from django.conf import settings
 from django.contrib.auth import authenticate
-from django.db.models import Q
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
 
+from . import conditional
+from .authentication import get_full_user
+from .fastpath import LIST_FIELDS, LIST_VALUES, build_list_rows, format_datetime
+from .fieldsets import get_fieldset
+from .filters import (
+    filter_employees, has_row_filters, list_values, parse_facets, parse_form_id, project_data,
+    select_expanded,
+)
+from .pagination import EmployeeCursorPagination, JobCursorPagination
+from .renderers import PrometheusTextRenderer
+from .tokens import EmployeeRefreshToken, is_revoked, revoke_token, revoke_user_tokens
 from .serializers import (
     UserRegistrationSerializer, UserSerializer,
-    DynamicFormSerializer, EmployeeSerializer, EmployeeListSerializer
+    DynamicFormSerializer, EmployeeSerializer, EmployeeListSerializer, JobSerializer
+)
+from employee_system import metrics
+from employees import facets, projections, reports
+from employees.bulk import (
+    BulkValidationError, bulk_create_employees,
+    bulk_soft_delete_employees, bulk_update_employees, is_employee_id
 )
-from employees.models import DynamicForm, Employee
+from employees.caching import get_form_definition
+from employees.changes import ExpiredCursor, read_changes
+from employees.export import EXPORT_FORMATS, iter_export
+from employees.importer import IMPORT_FORMATS, guess_format, import_employees, open_text
+from employees.models import DynamicForm, Employee, EmployeeChange
+from employees.pagination import InvalidCursor
+from employees.versions import migrate_employees, version_counts
+from jobs import runner
+from jobs.models import Job
+from jobs.registry import JobParamsError, get_kind
+
+# Rejected rows echoed back by the import endpoint
+IMPORT_REJECTED_ROWS_LIMIT = 100
+# Employees that failed a version migration echoed back by the migrate endpoint
+MIGRATE_FAILED_ROWS_LIMIT = 100
 
 # Authentication Views
 @api_view(['POST'])
@@ -24,7 +65,7 @@ def register_api(request):
         user = serializer.save()
         
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = EmployeeRefreshToken.for_user(user)
         
         return Response({
             'message': 'User registered successfully',
@@ -55,7 +96,7 @@ def login_api(request):
     
     if user is not None:
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = EmployeeRefreshToken.for_user(user)
         
         return Response({
             'message': 'Login successful',
@@ -70,26 +111,74 @@ def login_api(request):
         'error': 'Invalid credentials'
     }, status=status.HTTP_401_UNAUTHORIZED)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout_api(request):
+    """
+    Revoke the access token of this request, the refresh token in the body
+    and, with "all": true, every token issued to the user so far
+    """
+    refresh = request.data.get('refresh')
+    if refresh:
+        try:
+            revoke_token(RefreshToken(refresh))
+        except TokenError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if request.auth is not None:
+        revoke_token(request.auth)
+    if request.data.get('all') in (True, 'true', '1'):
+        revoke_user_tokens(request.user.id)
+    
+    return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
+
+class RevocationAwareTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuse to mint access tokens from a revoked refresh token"""
+    def validate(self, attrs):
+        try:
+            refresh = RefreshToken(attrs['refresh'])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        if is_revoked(refresh):
+            raise InvalidToken('Token has been revoked')
+        return super().validate(attrs)
+
+class TokenRefreshApiView(TokenRefreshView):
+    serializer_class = RevocationAwareTokenRefreshSerializer
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_profile_api(request):
     """
     Get current user profile
     """
-    serializer = UserSerializer(request.user)
+    serializer = UserSerializer(get_full_user(request.user))
     return Response(serializer.data)
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@renderer_classes([PrometheusTextRenderer])
+def metrics_api(request):
+    """
+    Per-view request metrics of this process in the Prometheus text format (staff only)
+    """
+    return Response(metrics.render_prometheus())
+
 # Dynamic Form ViewSet
 class DynamicFormViewSet(viewsets.ModelViewSet):
     """
     ViewSet for CRUD operations on Dynamic Forms
     """
-    queryset = DynamicForm.objects.filter(is_active=True)
     serializer_class = DynamicFormSerializer
     permission_classes = [IsAuthenticated]
     
+    def get_queryset(self):
+        queryset = DynamicForm.objects.filter(is_active=True)
+        if 'created_by' in get_fieldset(self.request).expand:
+            queryset = queryset.select_related('created_by')
+        return queryset
+    
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        serializer.save(created_by_id=self.request.user.id)
     
     def destroy(self, request, *args, **kwargs):
         """Soft delete"""
@@ -102,14 +191,130 @@ class DynamicFormViewSet(viewsets.ModelViewSet):
         )
     
     @action(detail=True, methods=['get'])
-    def fields(self, request, pk=None):
-        """Get form fields configuration"""
+    def export(self, request, pk=None):
+        """Stream all active employees of this form (?export_format=csv|ndjson)"""
         form = self.get_object()
-        return Response({
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"export_format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        response = StreamingHttpResponse(
+            iter_export(form, export_format), content_type=EXPORT_FORMATS[export_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="form-{form.id}-employees.{export_format}"'
+        return response
+    
+    @action(detail=True, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request, pk=None):
+        """
+        Import employees from an uploaded CSV or JSONL file
+        
+        Multipart fields: file, file_format (csv|jsonl, defaults to the extension),
+        mapping (JSON object of {source column: form field}), batch_size
+        """
+        form = self.get_object()
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        file_format = request.data.get('file_format') or guess_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {'error': f"file_format must be one of: {', '.join(IMPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            mapping = json.loads(request.data.get('mapping') or '{}')
+        except ValueError:
+            return Response({'error': 'mapping must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(mapping, dict):
+            return Response({'error': 'mapping must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        rejected_rows = []
+        
+        def on_reject(line_number, record, errors):
+            if len(rejected_rows) < IMPORT_REJECTED_ROWS_LIMIT:
+                rejected_rows.append({'line': line_number, 'errors': errors})
+        
+        result = import_employees(
+            form, open_text(upload.file), file_format, request.user.id,
+            mapping=mapping,
+            batch_size=request.data.get('batch_size'),
+            on_reject=on_reject,
+        )
+        return Response(
+            dict(result.as_dict(), rejected_rows=rejected_rows),
+            status=status.HTTP_201_CREATED if result.imported else status.HTTP_400_BAD_REQUEST
+        )
+    
+    @action(detail=True, methods=['get'])
+    def fields(self, request, pk=None):
+        """Get form fields configuration (cached, honours If-None-Match/If-Modified-Since)"""
+        form = get_form_definition(pk)
+        if form is None:
+            raise NotFound('Form not found')
+        not_modified = get_conditional_response(
+            request, etag=form.etag, last_modified=int(form.updated_at.timestamp())
+        )
+        if not_modified is not None:
+            return not_modified
+        response = Response({
             'form_id': form.id,
             'form_name': form.name,
+            'version': form.version_id,
             'fields': form.fields_config
         })
+        response['ETag'] = form.etag
+        response['Last-Modified'] = form.last_modified
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def versions(self, request, pk=None):
+        """Schema versions of this form, newest first, with their active employee counts"""
+        form = self.get_object()
+        counts = version_counts(form.id)
+        return Response({
+            'current': form.version_id,
+            'pending': sum(count for version_id, count in counts.items() if version_id != form.version_id),
+            'versions': [
+                {
+                    'id': version.id,
+                    'number': version.number,
+                    'fields_config': version.fields_config,
+                    'display_fields': version.display_fields,
+                    'created_at': format_datetime(version.created_at),
+                    'employee_count': counts.get(version.id, 0),
+                }
+                for version in form.versions.order_by('-number')
+            ],
+        })
+    
+    @action(detail=True, methods=['post'], url_path='versions/migrate')
+    def migrate_versions(self, request, pk=None):
+        """
+        Move employees on older versions of this form to the current version
+        
+        Body: defaults (object of {field: value} filling fields the old data
+        lacks), batch_size. Employees that do not validate stay where they are.
+        """
+        form = self.get_object()
+        defaults = request.data.get('defaults') or {}
+        if not isinstance(defaults, dict):
+            return Response({'error': 'defaults must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        failed_rows = []
+        
+        def on_failure(employee_id, errors):
+            if len(failed_rows) < MIGRATE_FAILED_ROWS_LIMIT:
+                failed_rows.append({'id': employee_id, 'errors': errors})
+        
+        result = migrate_employees(
+            form.id, defaults=defaults, batch_size=request.data.get('batch_size'), on_failure=on_failure
+        )
+        return Response(dict(result.as_dict(), failed_rows=failed_rows))
 
 # Employee ViewSet
 class EmployeeViewSet(viewsets.ModelViewSet):
@@ -117,22 +322,35 @@ class EmployeeViewSet(viewsets.ModelViewSet):
     ViewSet for CRUD operations on Employees
     """
     permission_classes = [IsAuthenticated]
+    pagination_class = EmployeeCursorPagination
+    keyset_ordering = None
+    facet_form = None
+    facet_request = None
     
     def get_queryset(self):
-        queryset = Employee.objects.filter(is_active=True).select_related('form', 'created_by')
-        
-        # Search functionality
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(employee_data__icontains=search) |
-                Q(form__name__icontains=search)
-            )
+        queryset = Employee.objects.filter(is_active=True)
+        
+        # Sparse fieldsets: join only expanded relations, project employee_data keys in SQL
+        if self.action == 'list':
+            queryset = queryset.select_related('form')
+        else:
+            fieldset = get_fieldset(self.request)
+            queryset = select_expanded(queryset, fieldset)
+        if self.action == 'retrieve':
+            queryset = project_data(queryset, fieldset)
         
-        # Filter by form
+        form = None
         form_id = self.request.query_params.get('form_id', None)
-        if form_id:
-            queryset = queryset.filter(form_id=form_id)
+        if form_id and self.action == 'list':
+            form = get_form_definition(form_id)
+        try:
+            queryset, ordering = filter_employees(queryset, self.request.query_params, form)
+            if self.action == 'list':
+                self.facet_request = parse_facets(self.request.query_params, form)
+                self.facet_form = form
+        except projections.ProjectionQueryError as e:
+            raise ValidationError({'error': str(e)})
+        self.keyset_ordering = ordering
         
         return queryset
     
@@ -141,8 +359,38 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             return EmployeeListSerializer
         return EmployeeSerializer
     
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = conditional.list_etag(queryset, request)
+        return conditional.conditional_response(request, etag, lambda: self._fast_list(queryset))
+    
+    def _fast_list(self, queryset):
+        """Build list rows straight from .values() instead of EmployeeListSerializer"""
+        values = list_values(self.keyset_ordering, LIST_VALUES)
+        page = self.paginate_queryset(queryset.values(*values))
+        
+        fieldset = get_fieldset(self.request)
+        fields = set(LIST_FIELDS) if fieldset.fields is None else set(fieldset.fields)
+        fields -= fieldset.omit
+        response = self.get_paginated_response(build_list_rows(page, fields))
+        
+        # ?facets=department,city: value counts of indexed fields next to the page
+        if self.facet_request:
+            names, limit = self.facet_request
+            filtered = has_row_filters(self.request.query_params, self.facet_form)
+            response.data['facets'] = facets.get_facets(
+                self.facet_form.id, names, queryset if filtered else None, limit
+            )
+        return response
+    
+    def retrieve(self, request, *args, **kwargs):
+        etag = conditional.detail_etag(kwargs.get('pk'), request)
+        return conditional.conditional_response(
+            request, etag, lambda: super(EmployeeViewSet, self).retrieve(request, *args, **kwargs)
+        )
+    
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        serializer.save(created_by_id=self.request.user.id)
     
     def destroy(self, request, *args, **kwargs):
         """Soft delete"""
@@ -154,24 +402,218 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             status=status.HTTP_204_NO_CONTENT
         )
     
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Bulk operations on employees
+        
+        POST:   {"form_id": 1, "records": [{...employee_data}], "batch_size": 500}
+        PATCH:  {"records": [{"id": 1, "employee_data": {...}}], "batch_size": 500}
+        DELETE: {"ids": [1, 2, 3]}
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        max_records = settings.EMPLOYEE_BULK_MAX_RECORDS
+        
+        if request.method == 'DELETE':
+            ids = data.get('ids')
+            if not isinstance(ids, list) or not all(is_employee_id(pk) for pk in ids):
+                return Response({'error': 'ids must be a list of integers'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(ids) > max_records:
+                return Response(
+                    {'error': f'At most {max_records} ids per request'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            deleted = bulk_soft_delete_employees(ids)
+            return Response({'deleted': deleted}, status=status.HTTP_200_OK)
+        
+        records = data.get('records')
+        if not isinstance(records, list) or not records:
+            return Response({'error': 'records must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(records) > max_records:
+            return Response(
+                {'error': f'At most {max_records} records per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            if request.method == 'POST':
+                form = DynamicForm.objects.filter(id=data.get('form_id'), is_active=True).first()
+                if form is None:
+                    return Response({'error': 'Form not found'}, status=status.HTTP_400_BAD_REQUEST)
+                ids = bulk_create_employees(form, records, request.user.id, data.get('batch_size'))
+                return Response({'created': len(ids), 'ids': ids}, status=status.HTTP_201_CREATED)
+            
+            ids = bulk_update_employees(records, data.get('batch_size'))
+            return Response({'updated': len(ids), 'ids': ids}, status=status.HTTP_200_OK)
+        except BulkValidationError as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Incremental change feed: created, updated and deleted employees in log order.
+        Pass the returned "since" cursor back to resume (?since=&page_size=&form_id=).
+        """
+        params = request.query_params
+        try:
+            form_id = parse_form_id(params)
+        except ValueError:
+            return Response({'error': 'form_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            entries, cursor, has_more = read_changes(
+                since=params.get('since'), page_size=params.get('page_size'), form_id=form_id
+            )
+        except InvalidCursor:
+            return Response({'error': 'Invalid since cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        except ExpiredCursor as e:
+            return Response({'error': f'{e}; resync from the start'}, status=status.HTTP_410_GONE)
+        
+        # Current state of every employee the page mentions, serialized once
+        live_ids = {entry.employee_id for entry in entries if entry.action != EmployeeChange.DELETED}
+        employees = list(Employee.objects.filter(id__in=live_ids, is_active=True))
+        serialized = EmployeeSerializer(employees, many=True, context=self.get_serializer_context()).data
+        by_id = {employee.id: data for employee, data in zip(employees, serialized)}
+        
+        results = [
+            {
+                'change_id': entry.id,
+                'action': entry.action,
+                'employee_id': entry.employee_id,
+                'form_id': entry.form_id,
+                'changed_at': format_datetime(entry.changed_at),
+                'employee': None if entry.action == EmployeeChange.DELETED else by_id.get(entry.employee_id),
+            }
+            for entry in entries
+        ]
+        next_link = None
+        if has_more:
+            next_link = replace_query_param(request.build_absolute_uri(), 'since', cursor)
+        return Response({'since': cursor, 'has_more': has_more, 'next': next_link, 'results': results})
+    
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Get employee statistics"""
-        total_employees = Employee.objects.filter(is_active=True).count()
-        total_forms = DynamicForm.objects.filter(is_active=True).count()
-        
-        # Get employee count by form
-        forms_with_counts = []
-        for form in DynamicForm.objects.filter(is_active=True):
-            count = form.employees.filter(is_active=True).count()
-            forms_with_counts.append({
+        """
+        Get employee statistics
+
+        Optional breakdowns:
+        - by_creator=true: employee count per creating user
+        - period=day|week|month: employees created per period (form_id narrows it)
+        - form_id=<id>&field=<name>: value histogram of one fields_config field
+        """
+        params = request.query_params
+        try:
+            form_id = parse_form_id(params)
+        except ValueError:
+            return Response({'error': 'form_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        forms_breakdown = reports.form_breakdown()
+        data = {
+            'total_employees': reports.employee_totals(),
+            'total_forms': len(forms_breakdown),
+            'forms_breakdown': forms_breakdown,
+        }
+        
+        if params.get('by_creator') in ('1', 'true', 'True'):
+            data['creators_breakdown'] = reports.creator_breakdown()
+        
+        period = params.get('period')
+        if period:
+            if period not in reports.PERIODS:
+                return Response(
+                    {'error': f"period must be one of: {', '.join(reports.PERIODS)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            data['period_breakdown'] = reports.period_breakdown(period, form_id=form_id)
+        
+        field_name = params.get('field')
+        if field_name:
+            form = None
+            if form_id is not None:
+                form = DynamicForm.objects.filter(id=form_id, is_active=True).first()
+            if form is None:
+                return Response(
+                    {'error': 'A valid form_id is required for a field histogram'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if field_name not in {field.get('name') for field in form.fields_config}:
+                return Response(
+                    {'error': f"Field '{field_name}' is not part of form '{form.name}'"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            data['field_histogram'] = {
                 'form_id': form.id,
-                'form_name': form.name,
-                'employee_count': count
-            })
+                'field': field_name,
+                'values': reports.field_histogram(form.id, field_name),
+            }
         
-        return Response({
-            'total_employees': total_employees,
-            'total_forms': total_forms,
-            'forms_breakdown': forms_with_counts
-        })
\ No newline at end of file
+        return Response(data)
+
+
+# Background Job ViewSet
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Submit background jobs and poll their status. Users see their own jobs,
+    staff see all of them.
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = JobCursorPagination
+    
+    def get_queryset(self):
+        queryset = Job.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by_id=self.request.user.id)
+        kind = self.request.query_params.get('kind')
+        if kind:
+            queryset = queryset.filter(kind=kind)
+        job_status = self.request.query_params.get('status')
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset
+    
+    def create(self, request, *args, **kwargs):
+        """
+        Queue a job
+        
+        Body (JSON or multipart): kind, params (object; a JSON string in
+        multipart requests) and, for imports, file
+        """
+        kind_name = request.data.get('kind')
+        kind = get_kind(kind_name)
+        if kind is None:
+            return Response({'error': f"Unknown job kind '{kind_name}'"}, status=status.HTTP_400_BAD_REQUEST)
+        if kind.staff_only and not request.user.is_staff:
+            return Response({'error': 'Only staff can run this job'}, status=status.HTTP_403_FORBIDDEN)
+        
+        params = request.data.get('params') or {}
+        if isinstance(params, str):
+            try:
+                params = json.loads(params)
+            except ValueError:
+                return Response({'error': 'params must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            job = runner.submit(kind_name, params, user=request.user, input_file=request.FILES.get('file'))
+        except JobParamsError as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+        response['Location'] = request.build_absolute_uri(f'{job.id}/')
+        return response
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a queued job, or ask a running one to stop after its current batch"""
+        job = self.get_object()
+        if not runner.cancel(job):
+            return Response({'error': f'Job already {job.status}'}, status=status.HTTP_409_CONFLICT)
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """The output file of a finished job (e.g. an export)"""
+        job = self.get_object()
+        if job.status != Job.SUCCEEDED or not job.output_file:
+            raise NotFound('This job has no output')
+        return FileResponse(
+            job.output_file.open('rb'), as_attachment=True, filename=job.output_file.name.rsplit('/', 1)[-1]
+        )
@@ -0,0 +1,105 @@
+"""
+Database settings profiles, selected with the DJANGO_DB_PROFILE environment
+variable (see DATABASES in settings.py).
+
+sqlite          (default) WAL journal, busy_timeout and tuned pragmas applied on
+                every connection, IMMEDIATE write transactions so concurrent
+                writers queue on the busy timeout instead of failing with
+                "database is locked", and persistent connections.
+sqlite-basic    Django's stock SQLite settings, kept for comparison.
+postgres        PostgreSQL through psycopg 3 (requirements-postgres.txt). Uses a
+                connection pool (psycopg[pool]) unless DB_POOL=0, in which case
+                connections persist for DB_CONN_MAX_AGE seconds with health checks.
+
+PostgreSQL connection parameters come from DB_NAME, DB_USER, DB_PASSWORD,
+DB_HOST and DB_PORT; pool size from DB_POOL_MIN_SIZE and DB_POOL_MAX_SIZE.
+"""
+import importlib.util
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Milliseconds a writer waits for the SQLite write lock before giving up
+SQLITE_BUSY_TIMEOUT = 20000
+
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA mmap_size=134217728',
+)
+
+
+def _flag(env, name, default):
+    return env.get(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+def sqlite_basic(base_dir, env):
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': env.get('DB_NAME', base_dir / 'db.sqlite3'),
+    }
+
+
+def sqlite(base_dir, env):
+    database = sqlite_basic(base_dir, env)
+    database.update({
+        'CONN_MAX_AGE': int(env.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(SQLITE_PRAGMAS),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+    return database
+
+
+def postgres(base_dir, env):
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': env.get('DB_NAME', 'employee_system'),
+        'USER': env.get('DB_USER', 'postgres'),
+        'PASSWORD': env.get('DB_PASSWORD', ''),
+        'HOST': env.get('DB_HOST', 'localhost'),
+        'PORT': env.get('DB_PORT', '5432'),
+        'OPTIONS': {},
+    }
+    if _flag(env, 'DB_POOL', '1'):
+        # Django only imports psycopg_pool on the first connection; fail at startup instead
+        if importlib.util.find_spec('psycopg_pool') is None:
+            raise ImproperlyConfigured(
+                'The postgres profile pools connections with psycopg[pool]: '
+                'pip install -r requirements-postgres.txt, or set DB_POOL=0'
+            )
+        # Pooled connections are returned to the pool after each request;
+        # Django refuses CONN_MAX_AGE together with a pool
+        database['OPTIONS']['pool'] = {
+            'min_size': int(env.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(env.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': 10,
+        }
+    else:
+        database['CONN_MAX_AGE'] = int(env.get('DB_CONN_MAX_AGE', 60))
+        database['CONN_HEALTH_CHECKS'] = True
+    return database
+
+
+PROFILES = {
+    'sqlite': sqlite,
+    'sqlite-basic': sqlite_basic,
+    'postgres': postgres,
+}
+
+
+def database_settings(profile, base_dir, env=None):
+    """The DATABASES['default'] dict of a profile"""
+    env = os.environ if env is None else env
+    try:
+        build = PROFILES[profile]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown DJANGO_DB_PROFILE '{profile}'; use one of: {', '.join(PROFILES)}"
+        )
+    return build(base_dir, env)
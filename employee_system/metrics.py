@@ -0,0 +1,262 @@
+"""
+Per-view request instrumentation.
+
+RequestMetricsMiddleware records, for every request, the wall time, the
+number of database queries and the time spent in them, serialization time
+(serializers, list row building and JSON rendering) and template render
+time, grouped by the resolved view name. Each metric keeps a count and sum
+since start plus a rolling window of the last METRICS_WINDOW samples for
+p50/p95/p99; render_prometheus() formats them for /api/metrics/.
+
+Setting METRICS_PROFILE_DIR turns on a sampling profiler: a
+METRICS_PROFILE_SAMPLE_RATE share of sync requests run under cProfile and
+those slower than METRICS_PROFILE_THRESHOLD_MS are dumped there as
+<view>-<unix time>-<ms>ms.prof (summarize them with profile_report).
+"""
+import contextvars
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# (key, Prometheus name, help)
+SUMMARIES = (
+    ('duration', 'http_request_duration_seconds', 'Request wall time'),
+    ('db_queries', 'http_request_db_queries', 'Database queries per request'),
+    ('db', 'http_request_db_seconds', 'Time spent in database queries'),
+    ('serialize', 'http_request_serialize_seconds', 'Time spent serializing response data'),
+    ('template', 'http_request_template_seconds', 'Time spent rendering templates'),
+)
+
+_current = contextvars.ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """Totals collected while one request is handled"""
+
+    def __init__(self):
+        self.values = {'db_queries': 0, 'db': 0.0, 'serialize': 0.0, 'template': 0.0}
+        self.active = set()
+
+
+@contextmanager
+def timed(section):
+    """Add the time spent in the block to the current request (outermost block only)"""
+    stats = _current.get()
+    if stats is None or section in stats.active:
+        yield
+        return
+    stats.active.add(section)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.values[section] += time.perf_counter() - started
+        stats.active.discard(section)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.values['db'] += time.perf_counter() - started
+        stats.values['db_queries'] += 1
+
+
+def instrument_connection(connection, **kwargs):
+    # First in line, so connection.execute_wrapper() blocks still pop their own wrapper
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+connection_created.connect(instrument_connection)
+
+
+class RollingSummary:
+    """Count and sum since start, quantiles over the most recent samples"""
+
+    def __init__(self, window):
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return []
+        return [(q, ordered[min(int(q * len(ordered)), len(ordered) - 1)]) for q in QUANTILES]
+
+
+class MetricsRegistry:
+    def __init__(self, window):
+        self.window = window
+        self._lock = threading.Lock()
+        self._summaries = {}
+        self._requests = {}
+
+    def record(self, view, method, status, duration, values):
+        with self._lock:
+            key = (view, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for name, value in (('duration', duration), *values.items()):
+                summary = self._summaries.get((name, view))
+                if summary is None:
+                    summary = self._summaries[(name, view)] = RollingSummary(self.window)
+                summary.observe(value)
+
+    def clear(self):
+        with self._lock:
+            self._summaries.clear()
+            self._requests.clear()
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            views = sorted({view for _name, view in self._summaries})
+            for key, metric, help_text in SUMMARIES:
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} summary')
+                for view in views:
+                    summary = self._summaries.get((key, view))
+                    if summary is None:
+                        continue
+                    label = f'view="{_escape(view)}"'
+                    for q, value in summary.quantiles():
+                        lines.append(f'{metric}{{{label},quantile="{q}"}} {value:.6g}')
+                    lines.append(f'{metric}_sum{{{label}}} {summary.sum:.6g}')
+                    lines.append(f'{metric}_count{{{label}}} {summary.count}')
+            lines.append('# HELP http_requests_total Requests handled')
+            lines.append('# TYPE http_requests_total counter')
+            for (view, method, status), count in sorted(self._requests.items()):
+                lines.append(
+                    f'http_requests_total{{view="{_escape(view)}",method="{method}",status="{status}"}} {count}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry(getattr(settings, 'METRICS_WINDOW', 1024))
+
+
+def render_prometheus():
+    return registry.render_prometheus()
+
+
+class RequestMetricsMiddleware:
+    """Records per-view request metrics into the process registry"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.profile_dir = getattr(settings, 'METRICS_PROFILE_DIR', None)
+        self.sample_rate = getattr(settings, 'METRICS_PROFILE_SAMPLE_RATE', 0.05)
+        self.threshold = getattr(settings, 'METRICS_PROFILE_THRESHOLD_MS', 500) / 1000
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        # Connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            instrument_connection(connection)
+        stats = RequestStats()
+        token = _current.set(stats)
+        profiler = self._start_profiler()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - started
+            if profiler is not None:
+                profiler.disable()
+            _current.reset(token)
+        self._finish(request, response, stats, duration, profiler)
+        return response
+
+    async def __acall__(self, request):
+        # cProfile follows one thread, so async requests are not profiled
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            duration = time.perf_counter() - started
+            _current.reset(token)
+        self._finish(request, response, stats, duration, None)
+        return response
+
+    def _start_profiler(self):
+        if not self.profile_dir or random.random() >= self.sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this thread
+            return None
+        return profiler
+
+    def _finish(self, request, response, stats, duration, profiler):
+        match = request.resolver_match
+        view = match.view_name if match is not None else '<unresolved>'
+        registry.record(view, request.method, response.status_code, duration, stats.values)
+        if profiler is not None and duration >= self.threshold:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            name = re.sub(r'[^\w.-]+', '_', view)
+            profiler.dump_stats(
+                os.path.join(self.profile_dir, f'{name}-{int(time.time())}-{duration * 1000:.0f}ms.prof')
+            )
+
+
+class TimedTemplate:
+    """Backend template whose render time counts towards the request's template time"""
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return self._template.render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timed for RequestMetricsMiddleware"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
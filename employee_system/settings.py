@@ -2,6 +2,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from .db_profiles import database_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -31,9 +33,11 @@ INSTALLED_APPS = [
     'accounts',
     'employees',
     'api',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'employee_system.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -48,7 +52,7 @@ ROOT_URLCONF = 'employee_system.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'employee_system.metrics.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'employee_system' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -64,14 +68,29 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'employee_system.wsgi.application'
 
-# Database
+# Database (profiles in employee_system/db_profiles.py: sqlite, sqlite-basic, postgres)
+DATABASE_PROFILE = os.environ.get('DJANGO_DB_PROFILE', 'sqlite')
 DATABASES = {
+    'default': database_settings(DATABASE_PROFILE, BASE_DIR),
+}
+
+# Caches
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Form definition cache: process-local LRU in front of a shared cache alias
+FORM_CACHE_ALIAS = 'default'  # None disables the shared layer
+FORM_CACHE_TIMEOUT = 3600
+FORM_CACHE_LOCAL_SIZE = 512
+FORM_CACHE_LOCAL_TTL = 30
+
+# Short-lived cache of serialized employee API responses (TTL 0 disables)
+EMPLOYEE_RESPONSE_CACHE_ALIAS = 'default'
+EMPLOYEE_RESPONSE_CACHE_TTL = 5
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -109,13 +128,55 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
+# Employee list pagination (keyset cursors on created_at, id)
+EMPLOYEE_PAGE_SIZE = 50
+EMPLOYEE_MAX_PAGE_SIZE = 500
+
+# Employee change feed: hold back entries this many seconds so transactions that
+# took their ids earlier can commit first (SQLite commits writers in id order)
+EMPLOYEE_CHANGE_FEED_DELAY = 2 if DATABASE_PROFILE == 'postgres' else 0
+
+# Live employee events (/api/async/employees/events/). LocalBroker only reaches
+# streams in the same process; with several workers use
+# 'employees.events.ChangeLogBroker', which polls the change log every
+# EMPLOYEE_EVENT_POLL_INTERVAL seconds
+EMPLOYEE_EVENT_BROKER = 'employees.events.LocalBroker'
+EMPLOYEE_EVENT_POLL_INTERVAL = 1
+EMPLOYEE_EVENT_KEEPALIVE = 15
+EMPLOYEE_EVENT_MAX_WAIT = 60
+
+# Request metrics (employee_system.metrics, served at /api/metrics/ to staff):
+# quantiles cover the last METRICS_WINDOW requests of each view. Setting
+# METRICS_PROFILE_DIR runs a sample of requests under cProfile and keeps the
+# dumps of those slower than METRICS_PROFILE_THRESHOLD_MS
+METRICS_WINDOW = 1024
+METRICS_PROFILE_DIR = os.environ.get('METRICS_PROFILE_DIR') or None
+METRICS_PROFILE_SAMPLE_RATE = float(os.environ.get('METRICS_PROFILE_SAMPLE_RATE', 0.05))
+METRICS_PROFILE_THRESHOLD_MS = 500
+
+# Bulk employee endpoints
+EMPLOYEE_BULK_BATCH_SIZE = 500
+EMPLOYEE_BULK_MAX_BATCH_SIZE = 5000
+EMPLOYEE_BULK_MAX_RECORDS = 10000
+
+# Background jobs (jobs app, run by manage.py run_worker)
+JOB_POLL_INTERVAL = 1  # Seconds between queue polls of an idle worker
+JOB_HEARTBEAT_INTERVAL = 30
+JOB_STALE_AFTER = 300  # Running jobs without a heartbeat for this long are requeued
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 30  # Seconds before the first retry, doubled for each further one
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=5),
@@ -139,6 +200,15 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Stateless JWT auth: revoked tokens live in the jwt_revoked_token table (None,
+# one indexed query per request) or in this cache, which must be shared by all
+# workers and must not evict entries early, e.g. Redis with noeviction (process
+# local caches fail a system check outside DEBUG). Views needing the full user
+# row get it from JWT_USER_CACHE_ALIAS for JWT_USER_CACHE_TTL seconds
+JWT_REVOCATION_CACHE_ALIAS = None
+JWT_USER_CACHE_ALIAS = 'default'
+JWT_USER_CACHE_TTL = 60
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -1,16 +1,23 @@
 from django.contrib import admin
-from .models import DynamicForm, Employee
+from .models import DynamicForm, Employee, FormVersion
 
 @admin.register(DynamicForm)
 class DynamicFormAdmin(admin.ModelAdmin):
-    list_display = ['name', 'created_by', 'created_at', 'is_active']
+    list_display = ['name', 'created_by', 'employee_count', 'created_at', 'is_active']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'description']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['employee_count', 'created_at', 'updated_at']
+
+@admin.register(FormVersion)
+class FormVersionAdmin(admin.ModelAdmin):
+    list_display = ['form', 'number', 'created_at']
+    list_select_related = ['form']
+    readonly_fields = ['form', 'number', 'fields_config', 'display_fields', 'created_at']
 
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
-    list_display = ['id', 'form', 'created_by', 'created_at', 'is_active']
+    list_display = ['id', 'display_name', 'form', 'created_by', 'created_at', 'is_active']
     list_filter = ['is_active', 'form', 'created_at']
-    search_fields = ['employee_data']
-    readonly_fields = ['created_at', 'updated_at']
\ No newline at end of file
+    list_select_related = ['form', 'created_by']
+    search_fields = ['display_name']
+    readonly_fields = ['display_name', 'created_at', 'updated_at']
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Set-based create/update/soft-delete of employees.
+
+Every record is validated before anything is written; writes then go out in
+batched bulk_create/bulk_update statements inside a single transaction, and
+the search index and form counters are refreshed once per call.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import projections, search
+from .changes import record_changes
+from .caching import bump_employee_generation, get_form_definition
+from .models import DynamicForm, Employee, EmployeeChange, build_display_name
+from .validation import get_validator
+
+
+class BulkValidationError(Exception):
+    """Raised with per-row errors when any record of a bulk call is invalid"""
+    def __init__(self, errors):
+        super().__init__('Bulk validation failed')
+        self.errors = errors
+
+
+def is_employee_id(value):
+    """A JSON integer id; bools are ints in Python but not ids"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def get_batch_size(requested=None):
+    default = getattr(settings, 'EMPLOYEE_BULK_BATCH_SIZE', 500)
+    if requested in (None, ''):
+        return default
+    try:
+        size = int(requested)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, getattr(settings, 'EMPLOYEE_BULK_MAX_BATCH_SIZE', 5000)))
+
+
+def bulk_create_employees(form, records, user_id, batch_size=None):
+    """Create one employee per employee_data dict in records; returns the new ids"""
+    validator = get_validator(form)
+    cleaned_records = []
+    errors = []
+    for index, data in enumerate(records):
+        cleaned, row_errors = validator.clean(data)
+        if row_errors:
+            errors.append({'index': index, 'errors': row_errors})
+        cleaned_records.append(cleaned)
+    if errors:
+        raise BulkValidationError(errors)
+
+    with transaction.atomic():
+        return insert_employees(form.id, cleaned_records, user_id, batch_size)
+
+
+def insert_employees(form_id, records, user_id, batch_size=None):
+    """
+    Insert already-validated employee_data dicts for one form.
+
+    Indexes the new rows and bumps the form counter; callers own the transaction.
+    """
+    batch_size = get_batch_size(batch_size)
+    form = get_form_definition(form_id, active_only=False)
+    display_fields = form.get_display_fields()
+    employees = [
+        Employee(
+            form_id=form_id,
+            form_version_id=form.version_id,
+            employee_data=data,
+            display_name=build_display_name(display_fields, data),
+            created_by_id=user_id,
+        )
+        for data in records
+    ]
+    created = Employee.objects.bulk_create(employees, batch_size=batch_size)
+    record_changes([(e.id, form_id) for e in created], EmployeeChange.CREATED, batch_size)
+    search.index_employees(created, batch_size=batch_size, replace=False)
+    projections.project_employees(created, batch_size=batch_size, replace=False)
+    DynamicForm.objects.filter(pk=form_id).update(employee_count=F('employee_count') + len(created))
+    transaction.on_commit(bump_employee_generation)
+    return [employee.id for employee in created]
+
+
+def bulk_update_employees(records, batch_size=None):
+    """
+    Replace employee_data for records shaped like {'id': ..., 'employee_data': {...}}.
+    The data is validated against the current form version, which the employees move to.
+    """
+    batch_size = get_batch_size(batch_size)
+    ids = [
+        record.get('id') for record in records
+        if isinstance(record, dict) and is_employee_id(record.get('id'))
+    ]
+    employees = Employee.objects.filter(id__in=ids, is_active=True).select_related('form').in_bulk()
+
+    errors = []
+    seen = set()
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors.append({'index': index, 'errors': {'record': 'Each record must be an object'}})
+            continue
+        record_id = record.get('id')
+        employee = employees.get(record_id) if is_employee_id(record_id) else None
+        if employee is None:
+            errors.append({'index': index, 'errors': {'id': 'Employee not found'}})
+            continue
+        if employee.id in seen:
+            errors.append({'index': index, 'errors': {'id': 'Duplicate id in request'}})
+            continue
+        seen.add(employee.id)
+        cleaned, row_errors = get_validator(employee.form).clean(record.get('employee_data'))
+        if row_errors:
+            errors.append({'index': index, 'errors': row_errors})
+            continue
+        employee.employee_data = cleaned
+    if errors:
+        raise BulkValidationError(errors)
+
+    now = timezone.now()
+    updated = []
+    for record in records:
+        employee = employees[record['id']]
+        employee.form_version_id = employee.form.version_id
+        employee.display_name = build_display_name(
+            employee.form.get_display_fields(), employee.employee_data
+        )
+        employee.updated_at = now
+        updated.append(employee)
+
+    with transaction.atomic():
+        Employee.objects.bulk_update(
+            updated, ['employee_data', 'form_version', 'display_name', 'updated_at'], batch_size=batch_size
+        )
+        record_changes([(e.id, e.form_id) for e in updated], EmployeeChange.UPDATED, batch_size)
+        search.index_employees(updated, batch_size=batch_size)
+        projections.project_employees(updated, batch_size=batch_size)
+        transaction.on_commit(bump_employee_generation)
+    return [employee.id for employee in updated]
+
+
+def bulk_soft_delete_employees(ids):
+    """Soft-delete employees by id with a single UPDATE; returns the number deleted"""
+    ids = list(ids)
+    with transaction.atomic():
+        rows = list(Employee.objects.filter(id__in=ids, is_active=True).values_list('id', 'form_id'))
+        form_ids = {form_id for _, form_id in rows}
+        deleted = Employee.objects.filter(id__in=[row[0] for row in rows], is_active=True).update(
+            is_active=False, updated_at=timezone.now()
+        )
+        record_changes(rows, EmployeeChange.DELETED)
+        search.unindex_employees(ids)
+        projections.unproject_employees(ids)
+        DynamicForm.refresh_employee_counts(form_ids)
+        transaction.on_commit(bump_employee_generation)
+    return deleted
@@ -0,0 +1,284 @@
+"""
+Caches shared by the employee views and API.
+
+DynamicForm definitions:
+
+Definitions are read through a small process-local LRU backed by an optional
+shared Django cache (FORM_CACHE_ALIAS). Entries are dropped on save/delete
+by signals; local entries also expire after FORM_CACHE_LOCAL_TTL seconds so
+other worker processes pick up changes made elsewhere.
+
+FormVersion schemas never change once written, so they are cached by
+version id in the same two tiers without any invalidation.
+
+Employee write generation: a counter in EMPLOYEE_RESPONSE_CACHE_ALIAS bumped
+on every employee or form write, so list ETags and cached API responses can
+be keyed by it. It starts from the clock, so a counter lost to eviction never
+comes back with a value it had before.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import http_date
+
+from .models import DynamicForm, FormVersion, resolve_display_fields
+from .validation import forget_validator
+
+CACHE_KEY = 'form-definition:v3:{}'
+VERSION_CACHE_KEY = 'form-version:{}'
+
+
+class FormDefinition:
+    """Immutable snapshot of the DynamicForm columns needed to render and validate a form"""
+    __slots__ = (
+        'id', 'name', 'description', 'fields_config', 'display_fields', 'updated_at', 'is_active', 'version_id'
+    )
+
+    def __init__(self, id, name, description, fields_config, display_fields, updated_at, is_active, version_id):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.fields_config = fields_config
+        self.display_fields = display_fields
+        self.updated_at = updated_at
+        self.is_active = is_active
+        self.version_id = version_id
+
+    @classmethod
+    def from_form(cls, form):
+        return cls(
+            form.id, form.name, form.description, form.fields_config,
+            form.display_fields, form.updated_at, form.is_active, form.version_id
+        )
+
+    def as_tuple(self):
+        return (
+            self.id, self.name, self.description, self.fields_config,
+            self.display_fields, self.updated_at, self.is_active, self.version_id
+        )
+
+    def get_display_fields(self):
+        return resolve_display_fields(self.display_fields, self.fields_config)
+
+    @property
+    def etag(self):
+        return f'"form-{self.id}-{self.updated_at.timestamp():.6f}"'
+
+    @property
+    def last_modified(self):
+        return http_date(self.updated_at.timestamp())
+
+
+class VersionDefinition:
+    """Snapshot of one FormVersion"""
+    __slots__ = ('id', 'form_id', 'number', 'fields_config', 'display_fields')
+
+    def __init__(self, id, form_id, number, fields_config, display_fields):
+        self.id = id
+        self.form_id = form_id
+        self.number = number
+        self.fields_config = fields_config
+        self.display_fields = display_fields
+
+    @classmethod
+    def from_version(cls, version):
+        return cls(version.id, version.form_id, version.number, version.fields_config, version.display_fields)
+
+    def as_tuple(self):
+        return (self.id, self.form_id, self.number, self.fields_config, self.display_fields)
+
+    @property
+    def version_id(self):
+        return self.id
+
+    def get_display_fields(self):
+        return resolve_display_fields(self.display_fields, self.fields_config)
+
+
+class LocalLRU:
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_local = LocalLRU(
+    getattr(settings, 'FORM_CACHE_LOCAL_SIZE', 512),
+    getattr(settings, 'FORM_CACHE_LOCAL_TTL', 30),
+)
+
+
+# Versions are immutable; the TTL only ages out entries of deleted forms
+_versions = LocalLRU(getattr(settings, 'FORM_CACHE_LOCAL_SIZE', 512), 24 * 3600)
+
+
+def _shared_cache():
+    alias = getattr(settings, 'FORM_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def get_form_definition(form_id, active_only=True):
+    """Return the FormDefinition for form_id, or None if it does not exist"""
+    try:
+        form_id = int(form_id)
+    except (TypeError, ValueError):
+        return None
+
+    definition = _local.get(form_id)
+    if definition is None:
+        shared = _shared_cache()
+        cached = shared.get(CACHE_KEY.format(form_id)) if shared else None
+        if cached is not None:
+            definition = FormDefinition(*cached)
+        else:
+            form = DynamicForm.objects.filter(id=form_id).first()
+            if form is None:
+                return None
+            definition = FormDefinition.from_form(form)
+            if shared:
+                shared.set(
+                    CACHE_KEY.format(form_id), definition.as_tuple(),
+                    getattr(settings, 'FORM_CACHE_TIMEOUT', 3600)
+                )
+        _local.set(form_id, definition)
+
+    if active_only and not definition.is_active:
+        return None
+    return definition
+
+
+async def aget_form_definition(form_id, active_only=True):
+    """Async twin of get_form_definition() for ASGI views"""
+    try:
+        form_id = int(form_id)
+    except (TypeError, ValueError):
+        return None
+
+    definition = _local.get(form_id)
+    if definition is None:
+        shared = _shared_cache()
+        cached = await shared.aget(CACHE_KEY.format(form_id)) if shared else None
+        if cached is not None:
+            definition = FormDefinition(*cached)
+        else:
+            form = await DynamicForm.objects.filter(id=form_id).afirst()
+            if form is None:
+                return None
+            definition = FormDefinition.from_form(form)
+            if shared:
+                await shared.aset(
+                    CACHE_KEY.format(form_id), definition.as_tuple(),
+                    getattr(settings, 'FORM_CACHE_TIMEOUT', 3600)
+                )
+        _local.set(form_id, definition)
+
+    if active_only and not definition.is_active:
+        return None
+    return definition
+
+
+def invalidate_form(form_id):
+    _local.delete(form_id)
+    shared = _shared_cache()
+    if shared:
+        shared.delete(CACHE_KEY.format(form_id))
+
+
+def get_form_version(version_id):
+    """Return the VersionDefinition for version_id, or None if it does not exist"""
+    if version_id is None:
+        return None
+    definition = _versions.get(version_id)
+    if definition is not None:
+        return definition
+
+    shared = _shared_cache()
+    cached = shared.get(VERSION_CACHE_KEY.format(version_id)) if shared else None
+    if cached is not None:
+        definition = VersionDefinition(*cached)
+    else:
+        version = FormVersion.objects.filter(id=version_id).first()
+        if version is None:
+            return None
+        definition = VersionDefinition.from_version(version)
+        if shared:
+            shared.set(VERSION_CACHE_KEY.format(version_id), definition.as_tuple(), None)
+    _versions.set(version_id, definition)
+    return definition
+
+
+def remember_form_version(version):
+    """
+    Prime the caches with a new version. Ids handed out by a rolled-back
+    transaction are used again, so entries left under them are replaced.
+    """
+    definition = VersionDefinition.from_version(version)
+    _versions.set(version.id, definition)
+    shared = _shared_cache()
+    if shared:
+        shared.set(VERSION_CACHE_KEY.format(version.id), definition.as_tuple(), None)
+    forget_validator(version.id)
+
+
+EMPLOYEE_GENERATION_KEY = 'employee-generation'
+
+
+def _response_cache():
+    alias = getattr(settings, 'EMPLOYEE_RESPONSE_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def employee_generation():
+    """Counter bumped on every employee write, or None without a response cache"""
+    shared = _response_cache()
+    if not shared:
+        return None
+    return shared.get_or_set(EMPLOYEE_GENERATION_KEY, time.time_ns, None)
+
+
+async def aemployee_generation():
+    shared = _response_cache()
+    if not shared:
+        return None
+    return await shared.aget_or_set(EMPLOYEE_GENERATION_KEY, time.time_ns, None)
+
+
+def bump_employee_generation():
+    shared = _response_cache()
+    if not shared:
+        return
+    try:
+        shared.incr(EMPLOYEE_GENERATION_KEY)
+    except ValueError:
+        shared.set(EMPLOYEE_GENERATION_KEY, time.time_ns(), None)
@@ -0,0 +1,132 @@
+"""
+Change log behind the incremental employee feed (/api/employees/changes/).
+
+Every create, update and soft delete appends an EmployeeChange row, from
+the Employee signals for single saves and from employees.bulk for bulk
+writes. Feed readers page through the log by id with KeysetPaginator, so a
+sync job resumes from its last cursor and only moves deltas. Committed
+entries are also published to the live event broker (employees.events).
+"""
+import datetime
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from . import events
+from .models import EmployeeChange
+from .pagination import InvalidCursor, KeysetPaginator
+
+
+class ExpiredCursor(Exception):
+    """Raised when the entries after a cursor have been pruned; the client must resync"""
+
+
+def change_action(instance, created):
+    """The feed action of an Employee save, or None when there is nothing to report"""
+    if created:
+        return EmployeeChange.CREATED if instance.is_active else None
+    was_active = getattr(instance, '_loaded_is_active', None)
+    if was_active is None:
+        was_active = instance.is_active
+    if was_active and not instance.is_active:
+        return EmployeeChange.DELETED
+    if not was_active and instance.is_active:
+        return EmployeeChange.CREATED
+    return EmployeeChange.UPDATED if instance.is_active else None
+
+
+def record_changes(rows, action, batch_size=1000):
+    """Append one change per (employee_id, form_id) pair, published once committed"""
+    entries = EmployeeChange.objects.bulk_create(
+        [EmployeeChange(employee_id=employee_id, form_id=form_id, action=action) for employee_id, form_id in rows],
+        batch_size=batch_size,
+    )
+    transaction.on_commit(partial(events.publish_changes, entries))
+
+
+def feed_queryset(form_id=None):
+    """
+    Entries visible to feed readers. On PostgreSQL ids are assigned before
+    commit, so entries younger than EMPLOYEE_CHANGE_FEED_DELAY seconds are
+    held back until concurrent transactions have had time to commit.
+    """
+    changes = EmployeeChange.objects.all()
+    if form_id:
+        changes = changes.filter(form_id=form_id)
+    delay = getattr(settings, 'EMPLOYEE_CHANGE_FEED_DELAY', 0)
+    if delay:
+        changes = changes.filter(changed_at__lte=timezone.now() - datetime.timedelta(seconds=delay))
+    return changes
+
+
+def change_cursor(change_id):
+    """The since cursor that resumes the feed after change_id"""
+    return KeysetPaginator(ordering=('id',)).encode_cursor({'id': change_id})
+
+
+def _cursor_id(since):
+    (since_id,), reverse = KeysetPaginator(ordering=('id',)).decode_cursor(EmployeeChange.objects.all(), since)
+    if reverse:
+        raise InvalidCursor('Invalid cursor')
+    return since_id
+
+
+def _check_available(since_id, oldest):
+    # since_id was delivered, so it or its successor is still stored unless pruned
+    if oldest is not None and since_id < oldest - 1:
+        raise ExpiredCursor('Changes after this cursor were pruned')
+    return since_id
+
+
+def check_cursor(since):
+    """Return the change id of a since cursor; raises InvalidCursor or ExpiredCursor"""
+    return _check_available(_cursor_id(since), EmployeeChange.objects.aggregate(oldest=Min('id'))['oldest'])
+
+
+async def acheck_cursor(since):
+    """Async twin of check_cursor"""
+    since_id = _cursor_id(since)
+    return _check_available(since_id, (await EmployeeChange.objects.aaggregate(oldest=Min('id')))['oldest'])
+
+
+def read_changes(since=None, page_size=None, form_id=None):
+    """
+    Return (changes, cursor, has_more) for entries after the since cursor.
+    cursor is what the client passes as since next time.
+    """
+    if since:
+        check_cursor(since)
+    paginator = KeysetPaginator(ordering=('id',))
+    page = paginator.paginate(feed_queryset(form_id), cursor=since or None, page_size=page_size)
+    cursor = paginator.encode_cursor(page.items[-1]) if page.items else since
+    return page.items, cursor, page.has_next
+
+
+async def aread_changes(since=None, page_size=None, form_id=None):
+    """Async twin of read_changes"""
+    if since:
+        await acheck_cursor(since)
+    paginator = KeysetPaginator(ordering=('id',))
+    page = await paginator.apaginate(feed_queryset(form_id), cursor=since or None, page_size=page_size)
+    cursor = paginator.encode_cursor(page.items[-1]) if page.items else since
+    return page.items, cursor, page.has_next
+
+
+async def alatest_change_id():
+    """Id of the newest entry visible to feed readers (0 while the log is empty)"""
+    return await feed_queryset().order_by('-id').values_list('id', flat=True).afirst() or 0
+
+
+def prune_changes(older_than):
+    """
+    Delete entries older than a datetime; returns the number removed. The
+    newest entry is always kept so up-to-date cursors stay valid.
+    """
+    latest = EmployeeChange.objects.order_by('-id').values_list('id', flat=True).first()
+    if latest is None:
+        return 0
+    deleted, _ = EmployeeChange.objects.filter(changed_at__lt=older_than, id__lt=latest).delete()
+    return deleted
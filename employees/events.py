@@ -0,0 +1,184 @@
+"""
+Live employee change events behind /api/async/employees/events/.
+
+Entries appended to the change log (employees.changes) are published once
+their transaction commits. Each open stream holds a Subscription that
+queues the events of its form on the stream's event loop. The broker is
+chosen with EMPLOYEE_EVENT_BROKER:
+
+LocalBroker      (default) in-process fan-out. With several worker processes
+                 a stream only sees the changes its own process made.
+ChangeLogBroker  while it has subscribers, each process polls the shared
+                 change log every EMPLOYEE_EVENT_POLL_INTERVAL seconds and fans
+                 new entries out locally, so streams on every worker see every
+                 change. A stand-in for a Redis or LISTEN/NOTIFY backend, which
+                 would plug in the same way (subclass LocalBroker, feed dispatch).
+"""
+import asyncio
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from . import changes
+
+
+def change_event(entry):
+    """The event published for an EmployeeChange"""
+    return {
+        'change_id': entry.id,
+        'action': entry.action,
+        'employee_id': entry.employee_id,
+        'form_id': entry.form_id,
+        'changed_at': entry.changed_at,
+    }
+
+
+class Subscription:
+    """
+    Events for one stream. Use as an async context manager; a consumer that
+    falls more than max_pending events behind is flagged overflowed and
+    should re-read the change log.
+    """
+
+    def __init__(self, broker, form_id=None, max_pending=1000):
+        self.broker = broker
+        self.form_id = form_id
+        self.overflowed = False
+        self._loop = None
+        self._queue = asyncio.Queue(max_pending)
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        await self.broker.attach(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker.detach(self)
+
+    def deliver(self, events):
+        """Queue events for the consumer; safe to call from any thread"""
+        if self.form_id is not None:
+            events = [event for event in events if event['form_id'] == self.form_id]
+        if not events:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._put, events)
+        except RuntimeError:
+            # The consumer's event loop has closed
+            self.broker.detach(self)
+
+    def _put(self, events):
+        for event in events:
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                return
+
+    async def get(self, timeout):
+        """Wait up to timeout seconds for events and return all queued ones ([] on timeout)"""
+        try:
+            events = [await asyncio.wait_for(self._queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        while not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+    def reset(self):
+        """Drop queued events before re-reading the change log"""
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self.overflowed = False
+
+
+class LocalBroker:
+    """Fans published events out to the subscriptions of this process"""
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, form_id=None):
+        return Subscription(self, form_id, getattr(settings, 'EMPLOYEE_EVENT_MAX_PENDING', 1000))
+
+    async def attach(self, subscription):
+        with self._lock:
+            self._subscriptions.add(subscription)
+
+    def detach(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, events):
+        """Deliver committed change events (called from changes.record_changes)"""
+        self.dispatch(events)
+
+    def dispatch(self, events):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.deliver(events)
+
+
+class ChangeLogBroker(LocalBroker):
+    """Shares events between processes by polling the change log table"""
+
+    def __init__(self):
+        super().__init__()
+        self.interval = getattr(settings, 'EMPLOYEE_EVENT_POLL_INTERVAL', 1)
+        self._poller = None
+
+    async def attach(self, subscription):
+        await super().attach(subscription)
+        if self._poller is not None:
+            return
+        # Read the starting point before the caller reads its own, so nothing
+        # committed in between is missed
+        last_id = await changes.alatest_change_id()
+        with self._lock:
+            if self._poller is None:
+                self._poller = threading.Thread(
+                    target=self._poll, args=(last_id,), name='employee-events', daemon=True
+                )
+                self._poller.start()
+
+    def publish(self, events):
+        """Nothing to send: every process's poller reads the committed entries"""
+
+    def _poll(self, last_id):
+        try:
+            while True:
+                with self._lock:
+                    if not self._subscriptions:
+                        self._poller = None
+                        return
+                entries = list(changes.feed_queryset().filter(id__gt=last_id).order_by('id')[:1000])
+                if entries:
+                    last_id = entries[-1].id
+                    self.dispatch([change_event(entry) for entry in entries])
+                else:
+                    time.sleep(self.interval)
+        finally:
+            connection.close()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The broker configured by EMPLOYEE_EVENT_BROKER (one per process)"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, 'EMPLOYEE_EVENT_BROKER', 'employees.events.LocalBroker'))()
+    return _broker
+
+
+def publish_changes(entries):
+    get_broker().publish([change_event(entry) for entry in entries])
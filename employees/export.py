@@ -0,0 +1,62 @@
+"""
+Streaming export of a form's employees as CSV or NDJSON.
+
+Rows are read with values_list(...).iterator(chunk_size=...), so no model
+instances are built and memory use does not grow with the number of rows.
+"""
+import csv
+import json
+
+from .models import Employee
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller"""
+    def write(self, value):
+        return value
+
+
+def export_columns(form):
+    return [field.get('name') for field in form.fields_config]
+
+
+def iter_employee_rows(form, chunk_size=DEFAULT_CHUNK_SIZE):
+    return Employee.objects.filter(form_id=form.id, is_active=True).order_by('id').values_list(
+        'id', 'created_at', 'employee_data'
+    ).iterator(chunk_size=chunk_size)
+
+
+def iter_csv(form, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield CSV lines: id, created_at, then one column per fields_config entry"""
+    columns = export_columns(form)
+    writer = csv.writer(Echo())
+    yield writer.writerow(['id', 'created_at'] + columns)
+    for employee_id, created_at, data in iter_employee_rows(form, chunk_size):
+        data = data or {}
+        yield writer.writerow(
+            [employee_id, created_at.isoformat()] + [data.get(column, '') for column in columns]
+        )
+
+
+def iter_ndjson(form, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one JSON object per line"""
+    columns = export_columns(form)
+    for employee_id, created_at, data in iter_employee_rows(form, chunk_size):
+        data = data or {}
+        row = {'id': employee_id, 'created_at': created_at.isoformat()}
+        row.update((column, data.get(column)) for column in columns)
+        yield json.dumps(row) + '\n'
+
+
+def iter_export(form, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    if export_format == 'csv':
+        return iter_csv(form, chunk_size)
+    if export_format == 'ndjson':
+        return iter_ndjson(form, chunk_size)
+    raise ValueError(f'Unsupported export format: {export_format}')
@@ -0,0 +1,135 @@
+"""
+Facet counts over indexed fields.
+
+EmployeeFacetCount holds, per form and indexed field, how many active
+employees have each value. It summarizes the EmployeeFieldValue projection
+rows and is adjusted by the same writes (projections.project_employees and
+unproject_employees) with one upsert per changed value, so unfiltered
+facets are a top-N read of a small indexed table instead of a GROUP BY
+over every employee. Facets of a filtered list are grouped over the
+projection rows of the matching employees only.
+
+Values are the projected column rendered as text: text as stored, dates
+in ISO format and whole numbers without a decimal point, which is also
+what the field filters accept.
+"""
+from collections import Counter
+
+from django.db import connection
+from django.db.models import Count
+
+from .models import EmployeeFacetCount, EmployeeFieldValue
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+# Columns of an EmployeeFieldValue row that add_counts() reads
+ROW_COLUMNS = ('form_id', 'field_name', 'number_value', 'date_value', 'text_value')
+
+
+def facet_value(number_value, date_value, text_value):
+    if number_value is not None:
+        return str(int(number_value)) if number_value.is_integer() else repr(number_value)
+    if date_value is not None:
+        return date_value.isoformat()
+    return text_value
+
+
+def add_counts(deltas, rows, sign):
+    """Add sign for every (form_id, field_name, number, date, text) row to a Counter"""
+    for form_id, field_name, number_value, date_value, text_value in rows:
+        value = facet_value(number_value, date_value, text_value)
+        if value is not None:
+            deltas[(form_id, field_name, value)] += sign
+
+
+def row_columns(value):
+    """The ROW_COLUMNS of an unsaved EmployeeFieldValue"""
+    return (value.form_id, value.field_name, value.number_value, value.date_value, value.text_value)
+
+
+def apply_counts(deltas):
+    """Add a Counter built by add_counts() to the stored counts"""
+    params = [(form_id, field_name, value, delta) for (form_id, field_name, value), delta in deltas.items() if delta]
+    if not params:
+        return
+    quote = connection.ops.quote_name
+    table = quote(EmployeeFacetCount._meta.db_table)
+    # Same upsert syntax on SQLite and PostgreSQL; Django's bulk_create can only overwrite
+    sql = (
+        f'INSERT INTO {table} ({quote("form_id")}, {quote("field_name")}, {quote("value")}, {quote("count")}) '
+        f'VALUES (%s, %s, %s, %s) '
+        f'ON CONFLICT ({quote("form_id")}, {quote("field_name")}, {quote("value")}) '
+        f'DO UPDATE SET {quote("count")} = {table}.{quote("count")} + excluded.{quote("count")}'
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+    if any(delta < 0 for *_key, delta in params):
+        EmployeeFacetCount.objects.filter(form_id__in={row[0] for row in params}, count__lte=0).delete()
+
+
+def recount(form_id, batch_size=1000):
+    """Rebuild the counts of one form from its projection rows"""
+    EmployeeFacetCount.objects.filter(form_id=form_id).delete()
+    grouped = EmployeeFieldValue.objects.filter(form_id=form_id).order_by().values_list(
+        *ROW_COLUMNS
+    ).annotate(count=Count('id'))
+    counts = Counter()
+    for *row, count in grouped:
+        add_counts(counts, [row], count)
+    EmployeeFacetCount.objects.bulk_create(
+        [
+            EmployeeFacetCount(form_id=form_id, field_name=field_name, value=value, count=count)
+            for (_form_id, field_name, value), count in counts.items()
+        ],
+        batch_size=batch_size,
+    )
+
+
+def _stored_query(form_id, field_name, limit):
+    return EmployeeFacetCount.objects.filter(form_id=form_id, field_name=field_name).order_by(
+        '-count', 'value'
+    ).values_list('value', 'count')[:limit]
+
+
+def _grouped_query(form_id, field_names, employees):
+    return EmployeeFieldValue.objects.filter(
+        form_id=form_id, field_name__in=field_names, employee_id__in=employees.order_by().values('id')
+    ).order_by().values_list(*ROW_COLUMNS).annotate(count=Count('id'))
+
+
+def _top(grouped, field_names, limit):
+    counts = Counter()
+    for *row, count in grouped:
+        add_counts(counts, [row], count)
+    facets = {field_name: [] for field_name in field_names}
+    for (_form_id, field_name, value), count in sorted(counts.items(), key=lambda item: (-item[1], item[0][2])):
+        if len(facets[field_name]) < limit:
+            facets[field_name].append({'value': value, 'count': count})
+    return facets
+
+
+def get_facets(form_id, field_names, employees=None, limit=DEFAULT_LIMIT):
+    """
+    {field_name: [{'value': ..., 'count': ...}, ...]} with the limit most
+    common values of each field, from the stored counts, or over the
+    employees queryset when the list is filtered
+    """
+    if employees is not None:
+        return _top(_grouped_query(form_id, field_names, employees), field_names, limit)
+    return {
+        field_name: [{'value': value, 'count': count} for value, count in _stored_query(form_id, field_name, limit)]
+        for field_name in field_names
+    }
+
+
+async def aget_facets(form_id, field_names, employees=None, limit=DEFAULT_LIMIT):
+    """Async twin of get_facets()"""
+    if employees is not None:
+        grouped = [row async for row in _grouped_query(form_id, field_names, employees)]
+        return _top(grouped, field_names, limit)
+    facets = {}
+    for field_name in field_names:
+        facets[field_name] = [
+            {'value': value, 'count': count} async for value, count in _stored_query(form_id, field_name, limit)
+        ]
+    return facets
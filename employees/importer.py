@@ -0,0 +1,164 @@
+"""
+Streaming import of employees from CSV or JSONL files.
+
+Records are parsed one at a time, mapped onto the target form's fields,
+validated by field type and written in batched bulk_create transactions.
+Rejected rows are handed to a callback instead of aborting the import.
+"""
+import csv
+import io
+import json
+
+from django.db import transaction
+
+from .bulk import get_batch_size, insert_employees
+from .validation import get_validator
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+
+class ImportResult:
+    def __init__(self):
+        self.processed = 0
+        self.imported = 0
+        self.rejected = 0
+
+    def as_dict(self):
+        return {
+            'processed': self.processed,
+            'imported': self.imported,
+            'rejected': self.rejected,
+        }
+
+
+def guess_format(filename):
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+
+def open_text(binary):
+    """
+    Text stream over an uploaded file. Undecodable bytes are kept as lone
+    surrogates so iter_records can reject just the rows holding them.
+    """
+    return io.TextIOWrapper(binary, encoding='utf-8-sig', errors='surrogateescape', newline='')
+
+
+def _text_error(text):
+    if '\x00' in text:
+        return 'NUL characters are not allowed'
+    try:
+        text.encode('utf-8')
+    except UnicodeEncodeError:
+        return 'Invalid UTF-8'
+    return None
+
+
+def _reject_constant(name):
+    raise ValueError(f'{name} is not a valid JSON number')
+
+
+def _iter_csv(stream):
+    reader = csv.DictReader(stream)
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield reader.line_num, None, f'Invalid CSV: {e}'
+            continue
+        values = [value for value in record.values() if isinstance(value, str)]
+        error = next(filter(None, map(_text_error, values)), None)
+        yield reader.line_num, record, error
+
+
+def _iter_jsonl(stream):
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        line = line.rstrip('\n')
+        error = _text_error(line)
+        if error:
+            yield line_number, line, error
+            continue
+        try:
+            # NaN/Infinity are not JSON, and the database's JSON check refuses them
+            record = json.loads(line, parse_constant=_reject_constant)
+        except ValueError:
+            yield line_number, line, 'Invalid JSON'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, record, 'Each line must be a JSON object'
+            continue
+        yield line_number, record, None
+
+
+def iter_records(stream, file_format):
+    """Yield (line_number, record, parse_error) from a text stream"""
+    if file_format == 'csv':
+        return _iter_csv(stream)
+    if file_format == 'jsonl':
+        return _iter_jsonl(stream)
+    raise ValueError(f'Unsupported import format: {file_format}')
+
+
+def map_record(record, fields, mapping):
+    """
+    Project a source record onto the form fields. Columns named like a field
+    map to it automatically; mapping ({source: field}) overrides that.
+    """
+    data = {}
+    for source, value in record.items():
+        field_name = mapping.get(source, source)
+        if field_name not in fields:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        data[field_name] = '' if value is None else value
+    return data
+
+
+def import_employees(form, stream, file_format, user_id, mapping=None,
+                     batch_size=None, on_reject=None, on_progress=None):
+    """
+    Import every record from stream into form.
+
+    on_reject(line_number, record, errors) is called for each rejected row;
+    on_progress(result) after each committed batch.
+    """
+    batch_size = get_batch_size(batch_size)
+    mapping = mapping or {}
+    validator = get_validator(form)
+    fields = validator.field_names
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            insert_employees(form.id, batch, user_id, batch_size)
+        result.imported += len(batch)
+        batch.clear()
+        if on_progress:
+            on_progress(result)
+
+    for line_number, record, parse_error in iter_records(stream, file_format):
+        result.processed += 1
+        if parse_error:
+            errors = {'record': parse_error}
+        else:
+            data, errors = validator.clean(map_record(record, fields, mapping))
+        if errors:
+            result.rejected += 1
+            if on_reject:
+                on_reject(line_number, record, errors)
+            continue
+        batch.append(data)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return result
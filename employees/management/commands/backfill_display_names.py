@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from employees.caching import bump_employee_generation, get_form_version
+from employees.models import DynamicForm, Employee, build_display_name
+
+
+class Command(BaseCommand):
+    help = 'Recompute Employee.display_name from the display fields of each employee\'s form version'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--form', type=int, help='Only backfill employees of this form id')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        forms = DynamicForm.objects.all()
+        if options['form']:
+            forms = forms.filter(id=options['form'])
+
+        for form in forms:
+            employees = Employee.objects.filter(form_id=form.id).only(
+                'id', 'form_version_id', 'employee_data', 'display_name'
+            ).order_by('id')
+            changed = []
+            total = 0
+            for employee in employees.iterator(chunk_size=batch_size):
+                version = get_form_version(employee.form_version_id) or form
+                display_name = build_display_name(version.get_display_fields(), employee.employee_data)
+                if display_name != employee.display_name:
+                    employee.display_name = display_name
+                    changed.append(employee)
+                if len(changed) >= batch_size:
+                    total += self._save(changed, batch_size)
+                    changed = []
+            if changed:
+                total += self._save(changed, batch_size)
+            self.stdout.write(f"Updated {total} display names of '{form.name}'")
+
+        self.stdout.write(self.style.SUCCESS('Display names backfilled'))
+
+    def _save(self, employees, batch_size):
+        with transaction.atomic():
+            Employee.objects.bulk_update(employees, ['display_name'], batch_size=batch_size)
+            transaction.on_commit(bump_employee_generation)
+        return len(employees)
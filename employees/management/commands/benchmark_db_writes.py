@@ -0,0 +1,154 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+
+from employee_system.db_profiles import PROFILES, database_settings
+from employees.models import DynamicForm, Employee, FormVersion
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent employee write throughput for database profiles. '
+        'SQLite profiles run against a scratch database file; other profiles '
+        'write to the configured database and remove their rows afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default='sqlite-basic,sqlite',
+                            help=f"Comma separated, from: {', '.join(PROFILES)}")
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=200, help='Writes per thread')
+
+    def handle(self, *args, **options):
+        profiles = [name.strip() for name in options['profiles'].split(',') if name.strip()]
+        unknown = [name for name in profiles if name not in PROFILES]
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(unknown)}")
+
+        self.stdout.write(
+            f"{'profile':<14}{'threads':>8}{'writes/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'locked':>8}"
+        )
+        for profile in profiles:
+            result = self._benchmark(profile, options['threads'], options['writes'])
+            self.stdout.write(
+                f"{profile:<14}{options['threads']:>8}{result['rate']:>10.1f}"
+                f"{result['p50']:>9.1f}{result['p95']:>9.1f}{result['locked']:>8}"
+            )
+
+    def _benchmark(self, profile, threads, writes):
+        alias = f'benchmark-{profile}'
+        database = database_settings(profile, settings.BASE_DIR)
+        scratch = None
+        if database['ENGINE'].endswith('sqlite3'):
+            handle, scratch = tempfile.mkstemp(suffix='.sqlite3')
+            os.close(handle)
+            database['NAME'] = scratch
+        connections.settings[alias] = connections.configure_settings({'default': database})['default']
+        try:
+            if scratch:
+                with connections[alias].schema_editor() as editor:
+                    # Every table the written models point at
+                    for model in (User, DynamicForm, FormVersion, Employee):
+                        editor.create_model(model)
+            user, form, version = self._fixtures(alias, profile)
+            try:
+                return self._run(alias, form.id, version.id, user.id, threads, writes)
+            finally:
+                if not scratch:
+                    # One transaction: the form and its version reference each other
+                    with transaction.atomic(using=alias):
+                        Employee.objects.using(alias).filter(form_id=form.id)._raw_delete(alias)
+                        FormVersion.objects.using(alias).filter(form_id=form.id)._raw_delete(alias)
+                        DynamicForm.objects.using(alias).filter(id=form.id)._raw_delete(alias)
+                    User.objects.using(alias).filter(id=user.id)._raw_delete(alias)
+        finally:
+            connections[alias].close()
+            del connections.settings[alias]
+            if scratch:
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(scratch + suffix):
+                        os.remove(scratch + suffix)
+
+    def _fixtures(self, alias, profile):
+        stamp = f'{profile}-{time.time():.6f}'
+        user = User(username=f'benchmark-{stamp}'[:150])
+        user.set_unusable_password()
+        user.save(using=alias)
+        form = DynamicForm(
+            name=f'Benchmark {stamp}',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by_id=user.id,
+        )
+        # bulk_create: skip the post_save signals, which use the default database
+        DynamicForm.objects.using(alias).bulk_create([form])
+        if form.id is None:
+            form = DynamicForm.objects.using(alias).get(name=form.name)
+        version = FormVersion(form_id=form.id, number=1, fields_config=form.fields_config)
+        FormVersion.objects.using(alias).bulk_create([version])
+        if version.id is None:
+            version = FormVersion.objects.using(alias).get(form_id=form.id, number=1)
+        DynamicForm.objects.using(alias).filter(id=form.id).update(version=version.id)
+        return user, form, version
+
+    def _run(self, alias, form_id, version_id, user_id, threads, writes):
+        latencies = []
+        locked = []
+        lock = threading.Lock()
+
+        def writer(index):
+            own_latencies = []
+            own_locked = 0
+            try:
+                for i in range(writes):
+                    started = time.perf_counter()
+                    try:
+                        # Read-then-write like the employee create path: look up the
+                        # form, insert the row, bump the counter
+                        with transaction.atomic(using=alias):
+                            DynamicForm.objects.using(alias).filter(id=form_id).values('fields_config').first()
+                            Employee.objects.using(alias).bulk_create([Employee(
+                                form_id=form_id,
+                                form_version_id=version_id,
+                                created_by_id=user_id,
+                                employee_data={'full_name': f'Writer {index} row {i}'},
+                                display_name=f'Writer {index} row {i}',
+                            )])
+                            DynamicForm.objects.using(alias).filter(id=form_id).update(
+                                employee_count=F('employee_count') + 1
+                            )
+                    except OperationalError:
+                        own_locked += 1
+                        continue
+                    own_latencies.append(time.perf_counter() - started)
+            finally:
+                connections[alias].close()
+            with lock:
+                latencies.extend(own_latencies)
+                locked.append(own_locked)
+
+        workers = [threading.Thread(target=writer, args=(index,)) for index in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for latency in latencies)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else (latencies or [0.0]) * 99
+        return {
+            'rate': len(latencies) / elapsed,
+            'p50': quantiles[49],
+            'p95': quantiles[94],
+            'locked': sum(locked),
+        }
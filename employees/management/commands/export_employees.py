@@ -0,0 +1,30 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, iter_export
+from employees.models import DynamicForm
+
+
+class Command(BaseCommand):
+    help = 'Stream every active employee of a form to CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('form_id', type=int)
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            form = DynamicForm.objects.get(id=options['form_id'], is_active=True)
+        except DynamicForm.DoesNotExist:
+            raise CommandError(f"Form {options['form_id']} not found")
+
+        lines = iter_export(form, options['format'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(lines)
+            self.stderr.write(self.style.SUCCESS(f"Exported form '{form.name}' to {options['output']}"))
+        else:
+            sys.stdout.writelines(lines)
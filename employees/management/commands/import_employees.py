@@ -0,0 +1,78 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.importer import IMPORT_FORMATS, guess_format, import_employees, open_text
+from employees.models import DynamicForm
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Stream-import employees from a CSV or JSONL file into a form'
+
+    def add_arguments(self, parser):
+        parser.add_argument('form_id', type=int)
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--user', required=True, help='Username recorded as created_by')
+        parser.add_argument(
+            '--map', action='append', default=[], metavar='COLUMN=FIELD',
+            help='Map a source column onto a form field (repeatable)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--errors', help='Write rejected rows to this JSONL file')
+
+    def handle(self, *args, **options):
+        try:
+            form = DynamicForm.objects.get(id=options['form_id'], is_active=True)
+        except DynamicForm.DoesNotExist:
+            raise CommandError(f"Form {options['form_id']} not found")
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' not found")
+
+        mapping = {}
+        for item in options['map']:
+            source, sep, field_name = item.partition('=')
+            if not sep:
+                raise CommandError(f"Invalid --map '{item}', expected COLUMN=FIELD")
+            mapping[source] = field_name
+
+        file_format = options['format'] or guess_format(options['path'])
+        error_file = open(options['errors'], 'w', encoding='utf-8') if options['errors'] else None
+        started = time.monotonic()
+
+        def on_reject(line_number, record, errors):
+            if error_file:
+                error_file.write(json.dumps({'line': line_number, 'record': record, 'errors': errors}) + '\n')
+
+        def on_progress(result):
+            elapsed = time.monotonic() - started
+            rate = result.processed / elapsed if elapsed else 0
+            self.stdout.write(
+                f'{result.processed} processed, {result.imported} imported, '
+                f'{result.rejected} rejected ({rate:.0f} rows/s)'
+            )
+
+        try:
+            with open(options['path'], 'rb') as upload:
+                result = import_employees(
+                    form, open_text(upload), file_format, user.id,
+                    mapping=mapping,
+                    batch_size=options['batch_size'],
+                    on_reject=on_reject,
+                    on_progress=on_progress,
+                )
+        finally:
+            if error_file:
+                error_file.close()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.imported} of {result.processed} rows into '
+            f"'{form.name}' in {elapsed:.1f}s ({result.rejected} rejected)"
+        ))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.models import DynamicForm
+from employees.validation import format_errors
+from employees.versions import migrate_employees
+
+
+class Command(BaseCommand):
+    help = (
+        'Move employees still on an older schema version of their form to the '
+        'current version, in batches. Employees whose data does not validate '
+        'against the current version are reported and left where they are.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--form', type=int, help='Only migrate employees of this form id')
+        parser.add_argument(
+            '--default', action='append', default=[], metavar='FIELD=VALUE',
+            help='Value for a field the old data lacks (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        defaults = {}
+        for item in options['default']:
+            field_name, sep, value = item.partition('=')
+            if not sep or not field_name:
+                raise CommandError(f'--default expects FIELD=VALUE, got {item!r}')
+            defaults[field_name] = value
+
+        forms = DynamicForm.objects.filter(is_active=True)
+        if options['form']:
+            forms = forms.filter(id=options['form'])
+
+        for form in forms:
+            def on_failure(employee_id, errors):
+                self.stdout.write(self.style.WARNING(f'  employee #{employee_id} kept: {format_errors(errors)}'))
+
+            result = migrate_employees(
+                form.id,
+                defaults=defaults,
+                batch_size=options['batch_size'],
+                on_failure=on_failure,
+            )
+            self.stdout.write(
+                f"Migrated {result.migrated} of {result.processed} employees of '{form.name}' "
+                f"to version {result.version} ({result.failed} failed)"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Form versions migrated'))
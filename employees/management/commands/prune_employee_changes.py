@@ -0,0 +1,18 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from employees.changes import prune_changes
+
+
+class Command(BaseCommand):
+    help = 'Delete change feed entries older than --days (clients behind that get 410 and resync)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        deleted = prune_changes(cutoff)
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} change feed entries'))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from employees import projections
+from employees.models import DynamicForm, Employee, EmployeeFacetCount, EmployeeFieldValue
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild typed projection rows for the fields marked "indexed" in the '
+        'form version of each employee, together with their facet counts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--form', type=int, help='Only rebuild this form id')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        forms = DynamicForm.objects.all()
+        if options['form']:
+            forms = forms.filter(id=options['form'])
+
+        for form in forms:
+            EmployeeFieldValue.objects.filter(form_id=form.id).delete()
+            EmployeeFacetCount.objects.filter(form_id=form.id).delete()
+            if not any(projections.indexed_fields(version) for version in form.versions.all()):
+                continue
+            employees = Employee.objects.filter(form_id=form.id, is_active=True).only(
+                'id', 'form_id', 'form_version_id', 'employee_data', 'is_active'
+            ).order_by('id')
+            batch = []
+            total = 0
+            for employee in employees.iterator(chunk_size=batch_size):
+                batch.append(employee)
+                if len(batch) >= batch_size:
+                    projections.project_employees(batch, batch_size=batch_size, replace=False)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                projections.project_employees(batch, batch_size=batch_size, replace=False)
+                total += len(batch)
+            self.stdout.write(f"Projected {total} employees of '{form.name}'")
+
+        self.stdout.write(self.style.SUCCESS('Projections rebuilt'))
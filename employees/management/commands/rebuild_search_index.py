@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from employees import search
+from employees.models import Employee, EmployeeSearchEntry
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the employee_data search index from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--form', type=int, help='Only reindex employees of this form id')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        employees = Employee.objects.filter(is_active=True).only(
+            'id', 'form_id', 'employee_data', 'is_active'
+        ).order_by('id')
+        entries = EmployeeSearchEntry.objects.all()
+        if options['form']:
+            employees = employees.filter(form_id=options['form'])
+            entries = entries.filter(form_id=options['form'])
+
+        entries.delete()
+        batch = []
+        total = 0
+        for employee in employees.iterator(chunk_size=batch_size):
+            batch.append(employee)
+            if len(batch) >= batch_size:
+                search.index_employees(batch, batch_size=batch_size)
+                total += len(batch)
+                batch = []
+        if batch:
+            search.index_employees(batch, batch_size=batch_size)
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} employees'))
@@ -0,0 +1,188 @@
+import datetime
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from employees.bulk import insert_employees
+from employees.models import DynamicForm, Employee
+
+User = get_user_model()
+
+FIRST_NAMES = (
+    'Aisha', 'Ben', 'Carla', 'Dmitri', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas',
+    'Kavya', 'Liam', 'Maya', 'Nikolai', 'Olga', 'Pedro', 'Qiu', 'Rosa', 'Sven', 'Tariq',
+    'Uma', 'Victor', 'Wen', 'Ximena', 'Yusuf', 'Zoe',
+)
+LAST_NAMES = (
+    'Adams', 'Banerjee', 'Costa', 'Dubois', 'Eriksen', 'Fischer', 'Garcia', 'Haddad', 'Ito',
+    'Jensen', 'Kowalski', 'Lopez', 'Murphy', 'Nakamura', 'Okafor', 'Petrov', 'Rossi', 'Silva',
+    'Tanaka', 'Usman', 'Varga', 'Wagner', 'Yilmaz', 'Zhang',
+)
+DEPARTMENTS = ('Engineering', 'Sales', 'Finance', 'Operations', 'Support', 'Marketing', 'People', 'Legal')
+TITLES = ('Associate', 'Analyst', 'Engineer', 'Senior Engineer', 'Manager', 'Director', 'Specialist', 'Lead')
+CITIES = ('Berlin', 'Lagos', 'Lisbon', 'Mumbai', 'Osaka', 'Toronto', 'Austin', 'Sydney', 'Warsaw')
+
+# Optional fields per DynamicForm field type; every seeded form gets at least
+# one field of each type in DynamicForm.FIELD_TYPES
+FIELD_POOL = {
+    'text': [('department', 'Department'), ('job_title', 'Job Title'), ('city', 'City'),
+             ('employee_code', 'Employee Code')],
+    'number': [('salary', 'Salary'), ('years_experience', 'Years of Experience'), ('age', 'Age')],
+    'email': [('personal_email', 'Personal Email')],
+    'date': [('start_date', 'Start Date'), ('birth_date', 'Birth Date')],
+    'password': [('portal_pin', 'Portal PIN')],
+    'textarea': [('bio', 'Bio'), ('notes', 'Notes')],
+    'tel': [('phone', 'Phone'), ('emergency_phone', 'Emergency Phone')],
+    'url': [('linkedin_url', 'LinkedIn Profile'), ('website', 'Website')],
+}
+INDEXED = {'salary', 'years_experience', 'start_date', 'department'}
+EPOCH = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a deterministic synthetic dataset (users, forms covering every field '
+        'type, employees) with bulk inserts. Run it against an empty database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--forms', type=int, default=10)
+        parser.add_argument('--employees', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--prefix', default='bench', help='Prefix of seeded usernames and form names')
+        parser.add_argument('--password', default='benchmark-pass', help='Password of every seeded user')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if options['users'] < 1 or options['forms'] < 1:
+            raise CommandError('--users and --forms must be at least 1')
+        if DynamicForm.objects.filter(name__startswith=f'{prefix} ').exists():
+            raise CommandError(f"Forms prefixed '{prefix}' already exist; use another --prefix or an empty database")
+
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        users = self._create_users(prefix, options['users'], options['password'])
+        forms = self._create_forms(rng, prefix, options['forms'], users)
+
+        # Skewed sizes, like real forms: the first forms hold most employees
+        weights = [1 / (index + 1) for index in range(len(forms))]
+        counts = [0] * len(forms)
+        for index in rng.choices(range(len(forms)), weights=weights, k=options['employees']):
+            counts[index] += 1
+
+        created = 0
+        for form, count in zip(forms, counts):
+            created += self._create_employees(rng, form, count, users, options['batch_size'])
+            self.stdout.write(f'  {form.name}: {count} employees')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(users)} users, {len(forms)} forms and {created} employees '
+            f'in {elapsed:.1f}s (seed {options["seed"]})'
+        ))
+
+    def _create_users(self, prefix, count, password):
+        # One hash for everyone: hashing per user would dominate the run
+        password_hash = make_password(password)
+        User.objects.bulk_create([
+            User(
+                username=f'{prefix}_user_{index:04d}',
+                email=f'{prefix}_user_{index:04d}@example.com',
+                password=password_hash,
+                is_staff=index == 0,
+            )
+            for index in range(count)
+        ])
+        return list(User.objects.filter(username__startswith=f'{prefix}_user_').order_by('username'))
+
+    def _create_forms(self, rng, prefix, count, users):
+        forms = []
+        for index in range(count):
+            fields = [
+                {'name': 'full_name', 'label': 'Full Name', 'type': 'text', 'required': True, 'max_length': 120},
+                {'name': 'work_email', 'label': 'Work Email', 'type': 'email', 'required': True},
+            ]
+            names = {'full_name', 'work_email'}
+            for field_type, _label in DynamicForm.FIELD_TYPES:
+                pool = [item for item in FIELD_POOL[field_type] if item[0] not in names]
+                picks = rng.sample(pool, k=min(len(pool), rng.randint(1, 2))) if pool else []
+                for name, label in picks:
+                    config = {'name': name, 'label': label, 'type': field_type, 'required': False}
+                    if name in INDEXED:
+                        config['indexed'] = True
+                    fields.append(config)
+                    names.add(name)
+            department = DEPARTMENTS[index % len(DEPARTMENTS)]
+            forms.append(DynamicForm.objects.create(
+                name=f'{prefix} {department} form {index:03d}',
+                description=f'Synthetic {department} onboarding form',
+                fields_config=fields,
+                display_fields=['full_name'],
+                created_by=users[index % len(users)],
+            ))
+        return forms
+
+    def _create_employees(self, rng, form, count, users, batch_size):
+        created = 0
+        while created < count:
+            size = min(batch_size, count - created)
+            creator = users[rng.randrange(len(users))]
+            records = [self._employee_data(rng, form.fields_config, created + i) for i in range(size)]
+            stamps = [EPOCH + datetime.timedelta(seconds=rng.randrange(3 * 365 * 86400)) for _ in range(size)]
+            with transaction.atomic():
+                ids = insert_employees(form.id, records, creator.id, batch_size)
+                # Spread creation dates for period statistics and list ordering
+                Employee.objects.bulk_update(
+                    [Employee(id=pk, created_at=stamp) for pk, stamp in zip(ids, stamps)],
+                    ['created_at'],
+                    batch_size=batch_size,
+                )
+            created += size
+        return created
+
+    def _employee_data(self, rng, fields_config, index):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        handle = f'{first}.{last}{index}'.lower()
+        data = {}
+        for field in fields_config:
+            name, field_type = field['name'], field['type']
+            if not field.get('required') and rng.random() < 0.1:
+                continue  # Optional fields are sometimes left out
+            if name == 'full_name':
+                value = f'{first} {last}'
+            elif field_type == 'email':
+                value = f'{handle}@{"example.com" if name == "work_email" else "mail.example.org"}'
+            elif field_type == 'number':
+                value = {
+                    'salary': rng.randrange(30000, 250000, 500),
+                    'years_experience': rng.randint(0, 35),
+                }.get(name, rng.randint(20, 65))
+            elif field_type == 'date':
+                days = rng.randrange(20 * 365) if name == 'start_date' else rng.randrange(365 * 20, 365 * 60)
+                value = (EPOCH.date() - datetime.timedelta(days=days)).isoformat()
+            elif field_type == 'tel':
+                value = f'+1 555 {rng.randrange(1000):03d} {rng.randrange(10000):04d}'
+            elif field_type == 'url':
+                value = f'https://www.example.com/in/{handle}'
+            elif field_type == 'password':
+                value = f'{rng.randrange(10000):04d}'
+            elif field_type == 'textarea':
+                value = (
+                    f'{first} joined {rng.choice(DEPARTMENTS)} as {rng.choice(TITLES).lower()} '
+                    f'and works from {rng.choice(CITIES)}.'
+                )
+            else:
+                value = {
+                    'department': rng.choice(DEPARTMENTS),
+                    'job_title': rng.choice(TITLES),
+                    'city': rng.choice(CITIES),
+                    'employee_code': f'E{index:06d}',
+                }.get(name, f'{name} {index}')
+            data[name] = value
+        return data
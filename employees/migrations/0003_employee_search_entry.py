@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_search_index(apps, schema_editor):
+    from employees.search import tokenize
+
+    Employee = apps.get_model('employees', 'Employee')
+    EmployeeSearchEntry = apps.get_model('employees', 'EmployeeSearchEntry')
+    batch = []
+    for employee in Employee.objects.filter(is_active=True).iterator(chunk_size=1000):
+        for field_name, value in (employee.employee_data or {}).items():
+            for token in set(tokenize(value)):
+                batch.append(EmployeeSearchEntry(
+                    employee_id=employee.id,
+                    form_id=employee.form_id,
+                    field_name=field_name[:100],
+                    normalized_value=token,
+                ))
+        if len(batch) >= 1000:
+            EmployeeSearchEntry.objects.bulk_create(batch)
+            batch = []
+    EmployeeSearchEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_alter_dynamicform_id_alter_employee_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeSearchEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('field_name', models.CharField(max_length=100)),
+                ('normalized_value', models.CharField(max_length=255)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='employees.employee')),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='employees.dynamicform')),
+            ],
+            options={
+                'verbose_name': 'Employee Search Entry',
+                'verbose_name_plural': 'Employee Search Entries',
+                'db_table': 'employee_search_entry',
+                'indexes': [models.Index(fields=['normalized_value'], name='search_value_idx'), models.Index(fields=['field_name', 'normalized_value'], name='search_field_value_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:06
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_employee_count(apps, schema_editor):
+    DynamicForm = apps.get_model('employees', 'DynamicForm')
+    Employee = apps.get_model('employees', 'Employee')
+    active_count = Employee.objects.filter(
+        form_id=models.OuterRef('pk'), is_active=True
+    ).order_by().values('form_id').annotate(count=models.Count('id')).values('count')
+    DynamicForm.objects.update(employee_count=Coalesce(models.Subquery(active_count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employee_search_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamicform',
+            name='employee_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_employee_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_dynamicform_employee_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeFieldValue',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('field_name', models.CharField(max_length=100)),
+                ('number_value', models.FloatField(blank=True, null=True)),
+                ('date_value', models.DateField(blank=True, null=True)),
+                ('text_value', models.CharField(blank=True, max_length=255, null=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='field_values', to='employees.employee')),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='employees.dynamicform')),
+            ],
+            options={
+                'verbose_name': 'Employee Field Value',
+                'verbose_name_plural': 'Employee Field Values',
+                'db_table': 'employee_field_value',
+                'indexes': [models.Index(fields=['form', 'field_name', 'number_value'], name='field_value_number_idx'), models.Index(fields=['form', 'field_name', 'date_value'], name='field_value_date_idx'), models.Index(fields=['form', 'field_name', 'text_value'], name='field_value_text_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'field_name'), name='unique_employee_field_value')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:15
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_display_names(apps, schema_editor):
+    from employees.models import build_display_name, resolve_display_fields
+
+    DynamicForm = apps.get_model('employees', 'DynamicForm')
+    Employee = apps.get_model('employees', 'Employee')
+    for form in DynamicForm.objects.all():
+        display_fields = resolve_display_fields(form.display_fields, form.fields_config)
+        batch = []
+        for employee in Employee.objects.filter(form_id=form.id).iterator(chunk_size=1000):
+            employee.display_name = build_display_name(display_fields, employee.employee_data)
+            batch.append(employee)
+            if len(batch) >= 1000:
+                Employee.objects.bulk_update(batch, ['display_name'])
+                batch = []
+        Employee.objects.bulk_update(batch, ['display_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0005_employee_field_value'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamicform',
+            name='display_fields',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='display_name',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(django.db.models.functions.text.Lower('display_name'), name='employee_name_lower_idx'),
+        ),
+        migrations.RunPython(backfill_display_names, migrations.RunPython.noop),
+    ]
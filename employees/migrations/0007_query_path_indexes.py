@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0006_display_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dynamicform',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='form_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='employee_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['form', '-created_at', '-id'], name='employee_active_form_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_by'], name='employee_active_creator_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+def backfill_created_changes(apps, schema_editor):
+    """Seed the feed with one 'created' entry per active employee"""
+    Employee = apps.get_model('employees', 'Employee')
+    EmployeeChange = apps.get_model('employees', 'EmployeeChange')
+    batch = []
+    rows = Employee.objects.filter(is_active=True).order_by('id').values_list('id', 'form_id')
+    for employee_id, form_id in rows.iterator(chunk_size=1000):
+        batch.append(EmployeeChange(employee_id=employee_id, form_id=form_id, action='created'))
+        if len(batch) >= 1000:
+            EmployeeChange.objects.bulk_create(batch)
+            batch = []
+    EmployeeChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0007_query_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('employee_id', models.IntegerField()),
+                ('form_id', models.IntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Employee Change',
+                'verbose_name_plural': 'Employee Changes',
+                'db_table': 'employee_change',
+                'indexes': [models.Index(fields=['form_id', 'id'], name='employee_change_form_idx'), models.Index(fields=['changed_at'], name='employee_change_time_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_created_changes, migrations.RunPython.noop),
+    ]
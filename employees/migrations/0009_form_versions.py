@@ -0,0 +1,59 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_initial_versions(apps, schema_editor):
+    DynamicForm = apps.get_model('employees', 'DynamicForm')
+    FormVersion = apps.get_model('employees', 'FormVersion')
+    Employee = apps.get_model('employees', 'Employee')
+    for form in DynamicForm.objects.all():
+        version = FormVersion.objects.create(
+            form_id=form.id, number=1,
+            fields_config=form.fields_config, display_fields=form.display_fields,
+        )
+        DynamicForm.objects.filter(pk=form.pk).update(version=version)
+        Employee.objects.filter(form_id=form.id).update(form_version=version)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0008_employee_change'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FormVersion',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('number', models.PositiveIntegerField()),
+                ('fields_config', models.JSONField(default=list)),
+                ('display_fields', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='employees.dynamicform')),
+            ],
+            options={
+                'verbose_name': 'Form Version',
+                'verbose_name_plural': 'Form Versions',
+                'db_table': 'form_version',
+                'ordering': ['form', 'number'],
+            },
+        ),
+        migrations.AddField(
+            model_name='dynamicform',
+            name='version',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='employees.formversion'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='form_version',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='employees', to='employees.formversion'),
+        ),
+        migrations.AddConstraint(
+            model_name='formversion',
+            constraint=models.UniqueConstraint(fields=('form', 'number'), name='unique_form_version_number'),
+        ),
+        migrations.RunPython(create_initial_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_facet_counts(apps, schema_editor):
+    """Group the projection rows by value; same rendering as employees.facets.facet_value"""
+    EmployeeFieldValue = apps.get_model('employees', 'EmployeeFieldValue')
+    EmployeeFacetCount = apps.get_model('employees', 'EmployeeFacetCount')
+    grouped = EmployeeFieldValue.objects.order_by().values_list(
+        'form_id', 'field_name', 'number_value', 'date_value', 'text_value'
+    ).annotate(count=models.Count('id'))
+    counts = []
+    for form_id, field_name, number_value, date_value, text_value, count in grouped.iterator():
+        if number_value is not None:
+            value = str(int(number_value)) if number_value.is_integer() else repr(number_value)
+        elif date_value is not None:
+            value = date_value.isoformat()
+        elif text_value is not None:
+            value = text_value
+        else:
+            continue
+        counts.append(EmployeeFacetCount(form_id=form_id, field_name=field_name, value=value, count=count))
+    EmployeeFacetCount.objects.bulk_create(counts, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0009_form_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeFacetCount',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('field_name', models.CharField(max_length=100)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='employees.dynamicform')),
+            ],
+            options={
+                'verbose_name': 'Employee Facet Count',
+                'verbose_name_plural': 'Employee Facet Counts',
+                'db_table': 'employee_facet_count',
+                'indexes': [models.Index(fields=['form', 'field_name', '-count'], name='facet_count_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('form', 'field_name', 'value'), name='unique_facet_value')],
+            },
+        ),
+        migrations.RunPython(backfill_facet_counts, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,40 @@
 from django.db import models
+from django.db.models.functions import Coalesce, Lower
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+DISPLAY_NAME_MAX_LENGTH = 255
+
+
+def resolve_display_fields(display_fields, fields_config):
+    """Declared display fields, or the first field whose name looks like a name"""
+    if display_fields:
+        return list(display_fields)
+    for field in fields_config:
+        if isinstance(field, dict) and 'name' in str(field.get('name', '')).lower():
+            return [field['name']]
+    return []
+
+
+def display_fields_error(display_fields, fields_config):
+    """Why display_fields is not a list of fields_config field names, or None"""
+    if not isinstance(display_fields, list):
+        return 'Display fields must be a list'
+    names = {field.get('name') for field in fields_config if isinstance(field, dict)}
+    unknown = [name for name in display_fields if not isinstance(name, str) or name not in names]
+    if unknown:
+        return f"Unknown fields: {', '.join(map(str, unknown))}"
+    return None
+
+
+def build_display_name(display_fields, employee_data):
+    """Join the non-empty display field values of one employee"""
+    data = employee_data or {}
+    parts = [str(data[name]).strip() for name in display_fields if data.get(name) not in (None, '')]
+    return ' '.join(part for part in parts if part)[:DISPLAY_NAME_MAX_LENGTH]
+
+
 class DynamicForm(models.Model):
     """
     Model to store custom form templates
@@ -22,6 +54,12 @@ class DynamicForm(models.Model):
     name = models.CharField(max_length=200, unique=True)
     description = models.TextField(blank=True, null=True)
     fields_config = models.JSONField(default=list)  # Store field configurations as JSON
+    display_fields = models.JSONField(default=list, blank=True)  # Field names joined into Employee.display_name
+    # Snapshot of the current fields_config/display_fields, replaced by signals when they change
+    version = models.ForeignKey(
+        'FormVersion', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+'
+    )
+    employee_count = models.PositiveIntegerField(default=0, editable=False)  # Active employees, kept in sync by signals
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='forms')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -30,19 +68,72 @@ class DynamicForm(models.Model):
     def __str__(self):
         return self.name
     
+    def get_display_fields(self):
+        return resolve_display_fields(self.display_fields, self.fields_config)
+    
+    @classmethod
+    def refresh_employee_counts(cls, form_ids):
+        """Recompute the employee_count column for the given forms in one UPDATE"""
+        active_count = Employee.objects.filter(
+            form_id=models.OuterRef('pk'), is_active=True
+        ).order_by().values('form_id').annotate(count=models.Count('id')).values('count')
+        cls.objects.filter(pk__in=list(form_ids)).update(
+            employee_count=Coalesce(models.Subquery(active_count), 0)
+        )
+    
     class Meta:
         db_table = 'dynamic_form'
         ordering = ['-created_at']
+        indexes = [
+            # Active forms newest first (form list, statistics)
+            models.Index(fields=['-created_at'], name='form_active_recent_idx', condition=models.Q(is_active=True)),
+        ]
         verbose_name = 'Dynamic Form'
         verbose_name_plural = 'Dynamic Forms'
 
+class FormVersion(models.Model):
+    """
+    Immutable snapshot of a DynamicForm schema; employees point at the
+    version their data was captured with
+    """
+    id = models.AutoField(primary_key=True)
+    form = models.ForeignKey(DynamicForm, on_delete=models.CASCADE, related_name='versions')
+    number = models.PositiveIntegerField()
+    fields_config = models.JSONField(default=list)
+    display_fields = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.form_id} v{self.number}"
+    
+    @property
+    def version_id(self):
+        return self.id
+    
+    def get_display_fields(self):
+        return resolve_display_fields(self.display_fields, self.fields_config)
+    
+    class Meta:
+        db_table = 'form_version'
+        ordering = ['form', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['form', 'number'], name='unique_form_version_number'),
+        ]
+        verbose_name = 'Form Version'
+        verbose_name_plural = 'Form Versions'
+
 class Employee(models.Model):
     """
     Model to store employee records with dynamic data
     """
     id = models.AutoField(primary_key=True)
     form = models.ForeignKey(DynamicForm, on_delete=models.CASCADE, related_name='employees')
+    # Schema version employee_data was last validated against
+    form_version = models.ForeignKey(
+        FormVersion, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='employees'
+    )
     employee_data = models.JSONField(default=dict)  # Store all dynamic field values
+    display_name = models.CharField(max_length=DISPLAY_NAME_MAX_LENGTH, blank=True, default='', db_index=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='employees')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -51,16 +142,149 @@ class Employee(models.Model):
     def __str__(self):
         return f"Employee #{self.id} - {self.form.name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_state()
+        return instance
+    
+    def _remember_loaded_state(self):
+        """Snapshot the persisted state so signals can tell what a save changed"""
+        deferred = self.get_deferred_fields()
+        self._loaded_is_active = None if 'is_active' in deferred else self.is_active
+        self._loaded_form_id = None if 'form_id' in deferred else self.form_id
+    
     def get_display_name(self):
-        """Get a display name from employee data"""
-        # Try to find name-like fields
-        for key, value in self.employee_data.items():
-            if 'name' in key.lower() and value:
-                return value
-        return f"Employee #{self.id}"
+        """Get the precomputed display name"""
+        return self.display_name or f"Employee #{self.id}"
     
     class Meta:
         db_table = 'employee'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(Lower('display_name'), name='employee_name_lower_idx'),
+            # Keyset list pages: active employees by (-created_at, -id), optionally per form
+            models.Index(
+                fields=['-created_at', '-id'], name='employee_active_recent_idx', condition=models.Q(is_active=True)
+            ),
+            models.Index(
+                fields=['form', '-created_at', '-id'], name='employee_active_form_idx', condition=models.Q(is_active=True)
+            ),
+            # Per-creator statistics
+            models.Index(fields=['created_by'], name='employee_active_creator_idx', condition=models.Q(is_active=True)),
+        ]
         verbose_name = 'Employee'
-        verbose_name_plural = 'Employees'
\ No newline at end of file
+        verbose_name_plural = 'Employees'
+
+class EmployeeSearchEntry(models.Model):
+    """
+    Search index row: one normalized token of one employee_data field
+    """
+    id = models.BigAutoField(primary_key=True)
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='search_entries')
+    form = models.ForeignKey(DynamicForm, on_delete=models.CASCADE, related_name='+')
+    field_name = models.CharField(max_length=100)
+    normalized_value = models.CharField(max_length=255)
+    
+    def __str__(self):
+        return f"{self.field_name}={self.normalized_value}"
+    
+    class Meta:
+        db_table = 'employee_search_entry'
+        indexes = [
+            models.Index(fields=['normalized_value'], name='search_value_idx'),
+            models.Index(fields=['field_name', 'normalized_value'], name='search_field_value_idx'),
+        ]
+        verbose_name = 'Employee Search Entry'
+        verbose_name_plural = 'Employee Search Entries'
+
+
+class EmployeeFieldValue(models.Model):
+    """
+    Typed projection of one "indexed" fields_config field of an employee,
+    so filters and sorts on hot fields hit B-tree indexes instead of JSON
+    """
+    id = models.BigAutoField(primary_key=True)
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='field_values')
+    form = models.ForeignKey(DynamicForm, on_delete=models.CASCADE, related_name='+')
+    field_name = models.CharField(max_length=100)
+    number_value = models.FloatField(blank=True, null=True)
+    date_value = models.DateField(blank=True, null=True)
+    text_value = models.CharField(max_length=255, blank=True, null=True)
+    
+    def __str__(self):
+        return f"{self.field_name} of employee #{self.employee_id}"
+    
+    class Meta:
+        db_table = 'employee_field_value'
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'field_name'], name='unique_employee_field_value'),
+        ]
+        indexes = [
+            models.Index(fields=['form', 'field_name', 'number_value'], name='field_value_number_idx'),
+            models.Index(fields=['form', 'field_name', 'date_value'], name='field_value_date_idx'),
+            models.Index(fields=['form', 'field_name', 'text_value'], name='field_value_text_idx'),
+        ]
+        verbose_name = 'Employee Field Value'
+        verbose_name_plural = 'Employee Field Values'
+
+
+class EmployeeFacetCount(models.Model):
+    """
+    Number of active employees with one value of one indexed field, kept in
+    step with the EmployeeFieldValue rows it summarizes
+    """
+    id = models.BigAutoField(primary_key=True)
+    form = models.ForeignKey(DynamicForm, on_delete=models.CASCADE, related_name='+')
+    field_name = models.CharField(max_length=100)
+    value = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.field_name}={self.value}: {self.count}"
+    
+    class Meta:
+        db_table = 'employee_facet_count'
+        constraints = [
+            models.UniqueConstraint(fields=['form', 'field_name', 'value'], name='unique_facet_value'),
+        ]
+        indexes = [
+            # Top values of a field
+            models.Index(fields=['form', 'field_name', '-count'], name='facet_count_top_idx'),
+        ]
+        verbose_name = 'Employee Facet Count'
+        verbose_name_plural = 'Employee Facet Counts'
+
+
+class EmployeeChange(models.Model):
+    """
+    Append-only log of employee creates, updates and (soft) deletes, read by
+    the incremental change feed. Ids are plain integers so entries survive
+    hard deletes.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = [
+        (CREATED, 'Created'),
+        (UPDATED, 'Updated'),
+        (DELETED, 'Deleted'),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    employee_id = models.IntegerField()
+    form_id = models.IntegerField()
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    changed_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.action} employee #{self.employee_id}"
+    
+    class Meta:
+        db_table = 'employee_change'
+        indexes = [
+            models.Index(fields=['form_id', 'id'], name='employee_change_form_idx'),
+            models.Index(fields=['changed_at'], name='employee_change_time_idx'),
+        ]
+        verbose_name = 'Employee Change'
+        verbose_name_plural = 'Employee Changes'
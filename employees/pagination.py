@@ -0,0 +1,161 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor cannot be decoded for the current ordering"""
+
+
+class KeysetPage:
+    """
+    One page of a keyset paginated queryset
+    """
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a unique ordering such as ('-created_at', '-id').
+
+    Each page is fetched with a WHERE clause on the ordering columns instead
+    of an OFFSET, so page 10,000 costs the same as page 1. Cursors are opaque
+    url-safe strings that encode the boundary row and the direction.
+    """
+    def __init__(self, ordering=('-created_at', '-id'), page_size=None, max_page_size=None):
+        self.ordering = tuple(ordering)
+        self.page_size = page_size or getattr(settings, 'EMPLOYEE_PAGE_SIZE', 50)
+        self.max_page_size = max_page_size or getattr(settings, 'EMPLOYEE_MAX_PAGE_SIZE', 500)
+
+    def get_page_size(self, requested=None):
+        if requested in (None, ''):
+            return self.page_size
+        try:
+            size = int(requested)
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate(self, queryset, cursor=None, page_size=None):
+        """Return a KeysetPage for the given cursor (or the first page)"""
+        queryset, page_size, position, reverse = self._page_queryset(queryset, cursor, page_size)
+        items = list(queryset[:page_size + 1])
+        return self._build_page(items, page_size, position, reverse)
+
+    async def apaginate(self, queryset, cursor=None, page_size=None):
+        """Async twin of paginate() for ASGI views"""
+        queryset, page_size, position, reverse = self._page_queryset(queryset, cursor, page_size)
+        items = [item async for item in queryset[:page_size + 1]]
+        return self._build_page(items, page_size, position, reverse)
+
+    def _page_queryset(self, queryset, cursor, page_size):
+        page_size = self.get_page_size(page_size)
+        position, reverse = self.decode_cursor(queryset, cursor) if cursor else (None, False)
+
+        ordering = self._reversed_ordering() if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._boundary_filter(position, reverse))
+        return queryset, page_size, position, reverse
+
+    def _build_page(self, items, page_size, position, reverse):
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if reverse:
+            items.reverse()
+
+        if reverse:
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        next_cursor = previous_cursor = None
+        if items and has_next:
+            next_cursor = self.encode_cursor(items[-1], reverse=False)
+        if items and has_previous:
+            previous_cursor = self.encode_cursor(items[0], reverse=True)
+        return KeysetPage(items, next_cursor, previous_cursor)
+
+    def encode_cursor(self, item, reverse=False):
+        values = []
+        for name in self._field_names():
+            value = item[name] if isinstance(item, dict) else getattr(item, name)
+            values.append(None if value is None else self._serialize(value))
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, queryset, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            raw_values = payload['v']
+            reverse = bool(payload.get('r'))
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise InvalidCursor('Invalid cursor')
+
+        names = self._field_names()
+        if not isinstance(raw_values, list) or len(raw_values) != len(names):
+            raise InvalidCursor('Invalid cursor')
+
+        position = []
+        for name, raw in zip(names, raw_values):
+            try:
+                position.append(self._output_field(queryset, name).to_python(raw))
+            except ValidationError:
+                raise InvalidCursor('Invalid cursor')
+        return position, reverse
+
+    def _field_names(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def _reversed_ordering(self):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering)
+
+    def _boundary_filter(self, position, reverse):
+        """Build (a < x) OR (a = x AND b < y) ... for the row after the boundary"""
+        condition = Q()
+        equal_prefix = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal_prefix & Q(**{f'{name}__{lookup}': value})
+            equal_prefix &= Q(**{name: value})
+        return condition
+
+    @staticmethod
+    def _serialize(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    @staticmethod
+    def _output_field(queryset, name):
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        try:
+            return queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise InvalidCursor('Invalid cursor')
@@ -0,0 +1,206 @@
+"""
+Typed projection table for "indexed" fields.
+
+A fields_config entry with "indexed": true is materialized into
+EmployeeFieldValue rows (number_value for number fields, date_value for date
+fields, text_value for everything else), each covered by a
+(form, field_name, value) index. Filters such as ?salary__gte=50000 and
+orderings such as ?order=joining_date are answered from those indexes.
+Every write here also adjusts the value counts in employees.facets.
+
+Lookups: exact (or eq), gt, gte, lt, lte, in (?city__in=Pune,Delhi),
+range (?salary__range=40000,60000 with either end optional) and, for text
+fields, prefix (?name__prefix=Jo, case-sensitive).
+"""
+import datetime
+from collections import Counter
+
+from django.db.models import F, FilteredRelation, Q
+
+from . import facets
+from .caching import get_form_version
+from .models import EmployeeFieldValue
+from .search import PREFIX_UPPER_BOUND
+from .validation import COERCERS, FieldError
+
+FILTER_LOOKUPS = ('exact', 'eq', 'gt', 'gte', 'lt', 'lte', 'in', 'range', 'prefix')
+MAX_TEXT_LENGTH = 255
+# Employee list query params; indexed fields may not be named like them
+RESERVED_PARAMS = frozenset({
+    'cursor', 'expand', 'facet_limit', 'facets', 'field', 'fields', 'form_id', 'format',
+    'name', 'omit', 'order', 'page_size', 'search',
+})
+
+
+class ProjectionQueryError(ValueError):
+    """Raised for a filter or ordering the projection cannot serve"""
+
+
+def value_column(field_type):
+    if field_type == 'number':
+        return 'number_value'
+    if field_type == 'date':
+        return 'date_value'
+    return 'text_value'
+
+
+def indexed_fields(schema):
+    """{field_name: field_type} of the indexed fields of a form or form version"""
+    return indexed_fields_config(schema.fields_config)
+
+
+def indexed_fields_config(fields_config):
+    return {
+        field.get('name'): field.get('type')
+        for field in fields_config
+        if isinstance(field, dict) and field.get('indexed')
+    }
+
+
+def invalid_indexed_names(fields_config):
+    """Names of indexed fields that would collide with list query params or lookups"""
+    return [
+        name for name in indexed_fields_config(fields_config)
+        if name in RESERVED_PARAMS or '__' in str(name)
+    ]
+
+
+def reserved_names_error(names):
+    return (
+        "Indexed fields cannot be named like a list query parameter or contain '__': "
+        f"{', '.join(map(str, names))}"
+    )
+
+
+def to_column_value(field_type, value):
+    """Convert a stored/queried value to the projection column type"""
+    coerce = COERCERS.get(field_type, COERCERS['text'])
+    value = coerce(value)
+    if field_type == 'date':
+        return datetime.date.fromisoformat(value)
+    if field_type == 'number':
+        return float(value)
+    return value[:MAX_TEXT_LENGTH]
+
+
+def build_values(employee, fields):
+    rows = []
+    data = employee.employee_data or {}
+    for field_name, field_type in fields.items():
+        value = data.get(field_name)
+        if value is None or value == '':
+            continue
+        try:
+            column_value = to_column_value(field_type, value)
+        except (FieldError, OverflowError):
+            continue
+        rows.append(EmployeeFieldValue(
+            employee_id=employee.id,
+            form_id=employee.form_id,
+            field_name=field_name,
+            **{value_column(field_type): column_value},
+        ))
+    return rows
+
+
+def project_employees(employees, batch_size=1000, replace=True):
+    """(Re)build projection rows for a batch of employees from their form versions"""
+    employees = list(employees)
+    if not employees:
+        return
+    fields_by_version = {}
+    for version_id in {employee.form_version_id for employee in employees}:
+        version = get_form_version(version_id)
+        fields_by_version[version_id] = indexed_fields(version) if version else {}
+
+    deltas = Counter()
+    if replace:
+        old_rows = EmployeeFieldValue.objects.filter(employee_id__in=[e.id for e in employees])
+        facets.add_counts(deltas, old_rows.values_list(*facets.ROW_COLUMNS), -1)
+        old_rows.delete()
+    rows = []
+    for employee in employees:
+        fields = fields_by_version[employee.form_version_id]
+        if employee.is_active and fields:
+            rows.extend(build_values(employee, fields))
+    EmployeeFieldValue.objects.bulk_create(rows, batch_size=batch_size)
+    facets.add_counts(deltas, map(facets.row_columns, rows), 1)
+    facets.apply_counts(deltas)
+
+
+def unproject_employees(employee_ids):
+    rows = EmployeeFieldValue.objects.filter(employee_id__in=list(employee_ids))
+    deltas = Counter()
+    facets.add_counts(deltas, rows.values_list(*facets.ROW_COLUMNS), -1)
+    rows.delete()
+    facets.apply_counts(deltas)
+
+
+def _lookup_filter(field_name, field_type, lookup, raw_value):
+    """The EmployeeFieldValue filter kwargs for one <field>__<lookup>=raw_value param"""
+    column = value_column(field_type)
+
+    def convert(value):
+        try:
+            return to_column_value(field_type, value)
+        except (FieldError, ValueError, OverflowError):
+            raise ProjectionQueryError(f"Invalid value for {field_name}: {value}")
+
+    if lookup in ('exact', 'eq'):
+        return {column: convert(raw_value)}
+    if lookup == 'in':
+        values = [value for value in str(raw_value).split(',') if value != '']
+        if not values:
+            raise ProjectionQueryError(f"{field_name}__in needs comma-separated values")
+        return {f'{column}__in': [convert(value) for value in values]}
+    if lookup == 'range':
+        low, comma, high = str(raw_value).partition(',')
+        if not comma or (low == '' and high == ''):
+            raise ProjectionQueryError(f"{field_name}__range needs 'low,high' (either end may be empty)")
+        bounds = {}
+        if low != '':
+            bounds[f'{column}__gte'] = convert(low)
+        if high != '':
+            bounds[f'{column}__lte'] = convert(high)
+        return bounds
+    if lookup == 'prefix':
+        if column != 'text_value':
+            raise ProjectionQueryError(f"prefix only applies to text fields, not {field_name}")
+        prefix = convert(raw_value)
+        # A range instead of LIKE, so the (form, field_name, text_value) index serves it
+        return {f'{column}__gte': prefix, f'{column}__lt': prefix + PREFIX_UPPER_BOUND}
+    return {f'{column}__{lookup}': convert(raw_value)}
+
+
+def filter_queryset(queryset, form, params):
+    """
+    Apply <field>[__lookup]=value filters on the form's indexed fields and an
+    optional order=[-]<field>. Returns (queryset, ordering or None).
+    """
+    fields = indexed_fields(form)
+    for param, raw_value in params.items():
+        field_name, _, lookup = param.partition('__')
+        if field_name not in fields or field_name in RESERVED_PARAMS:
+            continue
+        lookup = lookup or 'exact'
+        if lookup not in FILTER_LOOKUPS:
+            raise ProjectionQueryError(f"Unsupported lookup '{lookup}' for {field_name}")
+        matches = EmployeeFieldValue.objects.filter(
+            form_id=form.id,
+            field_name=field_name,
+            **_lookup_filter(field_name, fields[field_name], lookup, raw_value),
+        )
+        queryset = queryset.filter(id__in=matches.values('employee_id'))
+
+    order = params.get('order')
+    if not order:
+        return queryset, None
+    field_name = order.lstrip('-')
+    if field_name not in fields:
+        raise ProjectionQueryError(f"order must name an indexed field of form '{form.name}'")
+    column = value_column(fields[field_name])
+    queryset = queryset.annotate(
+        sort_row=FilteredRelation('field_values', condition=Q(field_values__field_name=field_name)),
+    ).annotate(sort_value=F(f'sort_row__{column}')).filter(sort_value__isnull=False)
+    descending = order.startswith('-')
+    return queryset, ('-sort_value', '-id') if descending else ('sort_value', 'id')
@@ -0,0 +1,120 @@
+"""
+Aggregate queries behind the statistics dashboard.
+
+Each helper issues exactly one grouped query, so the number of queries a
+dashboard needs does not depend on how many forms or employees exist.
+Every helper has an a-prefixed async twin for the ASGI views; both share
+the queryset and row formatting.
+"""
+from django.db.models import Count
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from .models import DynamicForm, Employee
+
+PERIODS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def _active_employees():
+    return Employee.objects.filter(is_active=True)
+
+
+def employee_totals():
+    """Total active employees"""
+    return _active_employees().count()
+
+
+async def aemployee_totals():
+    return await _active_employees().acount()
+
+
+def _form_rows():
+    return DynamicForm.objects.filter(is_active=True).order_by('-created_at').values(
+        'id', 'name', 'employee_count'
+    )
+
+
+def _form_row(form):
+    return {
+        'form_id': form['id'],
+        'form_name': form['name'],
+        'employee_count': form['employee_count'],
+    }
+
+
+def form_breakdown():
+    """Active employee count for every active form, read from the counter column"""
+    return [_form_row(form) for form in _form_rows()]
+
+
+async def aform_breakdown():
+    return [_form_row(form) async for form in _form_rows()]
+
+
+def _creator_rows():
+    return _active_employees().values(
+        'created_by_id', 'created_by__username'
+    ).annotate(count=Count('id')).order_by('-count', 'created_by_id')
+
+
+def _creator_row(row):
+    return {
+        'user_id': row['created_by_id'],
+        'username': row['created_by__username'],
+        'employee_count': row['count'],
+    }
+
+
+def creator_breakdown():
+    """Active employee count per creating user"""
+    return [_creator_row(row) for row in _creator_rows()]
+
+
+async def acreator_breakdown():
+    return [_creator_row(row) async for row in _creator_rows()]
+
+
+def _period_rows(period, form_id=None):
+    trunc = PERIODS[period]
+    employees = _active_employees()
+    if form_id is not None:
+        employees = employees.filter(form_id=form_id)
+    return employees.annotate(period=trunc('created_at')).values('period').annotate(
+        count=Count('id')
+    ).order_by('period')
+
+
+def _period_row(row):
+    return {'period': row['period'].date().isoformat(), 'employee_count': row['count']}
+
+
+def period_breakdown(period, form_id=None):
+    """Active employees created per day/week/month"""
+    return [_period_row(row) for row in _period_rows(period, form_id)]
+
+
+async def aperiod_breakdown(period, form_id=None):
+    return [_period_row(row) async for row in _period_rows(period, form_id)]
+
+
+def _histogram_rows(form_id, field_name, limit):
+    return _active_employees().filter(form_id=form_id).annotate(
+        value=KeyTextTransform(field_name, 'employee_data')
+    ).values('value').annotate(count=Count('id')).order_by('-count', 'value')[:limit]
+
+
+def _histogram_row(row):
+    return {'value': row['value'], 'count': row['count']}
+
+
+def field_histogram(form_id, field_name, limit=50):
+    """Most common values of one fields_config field within a form"""
+    return [_histogram_row(row) for row in _histogram_rows(form_id, field_name, limit)]
+
+
+async def afield_histogram(form_id, field_name, limit=50):
+    return [_histogram_row(row) async for row in _histogram_rows(form_id, field_name, limit)]
@@ -0,0 +1,103 @@
+"""
+Field-level search index for Employee.employee_data.
+
+Every active employee gets one EmployeeSearchEntry row per (field, token).
+Searches become prefix range lookups on an indexed column instead of casting
+each JSON document to text, so latency stays flat as the table grows.
+"""
+import re
+
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .models import DynamicForm, EmployeeSearchEntry
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TOKEN_LENGTH = 255
+# Upper bound used to turn a prefix into a range that any B-tree index can serve
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+def tokenize(value):
+    """Split a value into lowercase word tokens"""
+    if value is None or isinstance(value, (dict, list, bool)):
+        return []
+    return [token[:MAX_TOKEN_LENGTH] for token in TOKEN_RE.findall(str(value).lower())]
+
+
+def build_entries(employee):
+    """Build unsaved index rows for one employee"""
+    entries = []
+    for field_name, value in (employee.employee_data or {}).items():
+        for token in set(tokenize(value)):
+            entries.append(EmployeeSearchEntry(
+                employee_id=employee.id,
+                form_id=employee.form_id,
+                field_name=field_name[:100],
+                normalized_value=token,
+            ))
+    return entries
+
+
+def index_employees(employees, batch_size=1000, replace=True):
+    """
+    (Re)index a batch of employees, dropping inactive ones from the index.
+    Pass replace=False for freshly inserted rows that have no entries yet.
+    """
+    employees = list(employees)
+    if not employees:
+        return
+    if replace:
+        EmployeeSearchEntry.objects.filter(employee_id__in=[e.id for e in employees]).delete()
+    entries = []
+    for employee in employees:
+        if employee.is_active:
+            entries.extend(build_entries(employee))
+    EmployeeSearchEntry.objects.bulk_create(entries, batch_size=batch_size)
+
+
+def unindex_employees(employee_ids):
+    EmployeeSearchEntry.objects.filter(employee_id__in=list(employee_ids)).delete()
+
+
+def search_employees(queryset, term, field=None):
+    """
+    Filter an Employee queryset to rows whose indexed tokens start with every
+    token of the search term. Without a field scope, form names still match.
+    """
+    tokens = tokenize(term)
+    if not tokens:
+        return queryset
+
+    condition = Q()
+    for token in tokens:
+        entries = EmployeeSearchEntry.objects.filter(
+            normalized_value__gte=token,
+            normalized_value__lt=token + PREFIX_UPPER_BOUND,
+        )
+        if field:
+            entries = entries.filter(field_name=field)
+        condition &= Q(id__in=entries.values('employee_id'))
+
+    if not field:
+        matching_forms = DynamicForm.objects.filter(name__icontains=term).values('id')
+        condition |= Q(form_id__in=matching_forms)
+    return queryset.filter(condition)
+
+
+def annotate_display_name_lower(queryset):
+    """Add display_name_lower, the expression covered by employee_name_lower_idx"""
+    if 'display_name_lower' in queryset.query.annotations:
+        return queryset
+    return queryset.annotate(display_name_lower=Lower('display_name'))
+
+
+def filter_display_name_prefix(queryset, prefix):
+    """Case-insensitive prefix match served by the Lower(display_name) index"""
+    prefix = (prefix or '').strip().lower()
+    if not prefix:
+        return queryset
+    return annotate_display_name_lower(queryset).filter(
+        display_name_lower__gte=prefix,
+        display_name_lower__lt=prefix + PREFIX_UPPER_BOUND,
+    )
@@ -0,0 +1,116 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import changes, projections, search, versions
+from .caching import bump_employee_generation, get_form_definition, get_form_version, invalidate_form
+from .models import DynamicForm, Employee, EmployeeChange, build_display_name
+
+
+@receiver(pre_save, sender=Employee)
+def set_employee_display_name(sender, instance, raw=False, **kwargs):
+    """
+    Pin new employees and employees moved to another form to the current form
+    version, then precompute display_name from that version's display fields
+    """
+    if raw:
+        return
+    moved = getattr(instance, '_loaded_form_id', None) not in (None, instance.form_id)
+    if instance.form_version_id is None or moved:
+        form = get_form_definition(instance.form_id, active_only=False)
+        instance.form_version_id = form.version_id if form is not None else None
+    version = get_form_version(instance.form_version_id)
+    if version is not None:
+        instance.display_name = build_display_name(version.get_display_fields(), instance.employee_data)
+
+
+@receiver(post_save, sender=Employee)
+def sync_employee_search_index(sender, instance, created=False, raw=False, **kwargs):
+    """Keep the search index in step with saves and soft-deletes"""
+    if raw:
+        return
+    search.index_employees([instance], replace=not created)
+
+
+@receiver(post_save, sender=Employee)
+def sync_employee_projections(sender, instance, created=False, raw=False, **kwargs):
+    """Keep typed projection rows of indexed fields in step with the JSON data"""
+    if raw:
+        return
+    projections.project_employees([instance], replace=not created)
+
+
+@receiver(pre_delete, sender=Employee)
+def release_employee_projections(sender, instance, **kwargs):
+    """Hard deletes: drop the rows while they can still be subtracted from the facet counts"""
+    projections.unproject_employees([instance.pk])
+
+
+# Registered before invalidate_form_definition, so re-read definitions see the new version
+@receiver(post_save, sender=DynamicForm)
+def snapshot_form_schema(sender, instance, raw=False, **kwargs):
+    """Record a new FormVersion when fields_config or display_fields changed"""
+    if raw:
+        return
+    versions.snapshot_form(instance)
+
+
+# Registered before sync_form_employee_count, which resets the loaded state
+@receiver(post_save, sender=Employee)
+def record_employee_change(sender, instance, created=False, raw=False, **kwargs):
+    """Append the save to the change feed"""
+    if raw:
+        return
+    action = changes.change_action(instance, created)
+    if action:
+        changes.record_changes([(instance.pk, instance.form_id)], action)
+
+
+@receiver(post_delete, sender=Employee)
+def record_employee_delete(sender, instance, **kwargs):
+    if instance.is_active:
+        changes.record_changes([(instance.pk, instance.form_id)], EmployeeChange.DELETED)
+
+
+@receiver(post_save, sender=Employee)
+def sync_form_employee_count(sender, instance, created=False, raw=False, **kwargs):
+    """Keep DynamicForm.employee_count in step with creates and soft-deletes"""
+    if raw:
+        return
+    if created:
+        if instance.is_active:
+            DynamicForm.objects.filter(pk=instance.form_id).update(employee_count=F('employee_count') + 1)
+    else:
+        was_active = getattr(instance, '_loaded_is_active', None)
+        old_form_id = getattr(instance, '_loaded_form_id', None)
+        if was_active is None or old_form_id != instance.form_id:
+            DynamicForm.refresh_employee_counts({old_form_id, instance.form_id} - {None})
+        elif was_active != instance.is_active:
+            count = F('employee_count') + 1 if instance.is_active else Greatest(F('employee_count') - 1, 0)
+            DynamicForm.objects.filter(pk=instance.form_id).update(employee_count=count)
+    instance._remember_loaded_state()
+
+
+@receiver(post_delete, sender=Employee)
+def release_form_employee_count(sender, instance, **kwargs):
+    if instance.is_active:
+        DynamicForm.objects.filter(pk=instance.form_id).update(
+            employee_count=Greatest(F('employee_count') - 1, 0)
+        )
+
+
+@receiver(post_save, sender=DynamicForm)
+@receiver(post_delete, sender=DynamicForm)
+def invalidate_form_definition(sender, instance, raw=False, **kwargs):
+    """Drop cached definitions on save and soft/hard delete"""
+    invalidate_form(instance.pk)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=DynamicForm)
+@receiver(post_delete, sender=DynamicForm)
+def expire_employee_responses(sender, instance, raw=False, **kwargs):
+    """Invalidate cached employee API responses and list ETags (rows include the form name)"""
+    bump_employee_generation()
@@ -0,0 +1,151 @@
+"""
+Background job kinds of the employees app (run by the jobs app's run_worker).
+
+Imports, exports and form version migrations report progress after every
+batch and stop there when cancelled; batches committed before that stay.
+The maintenance kinds wrap the management commands of the same name.
+"""
+import io
+import tempfile
+
+from django.core.files import File
+from django.core.management import call_command
+
+from jobs.registry import JobParamsError, register
+from jobs.runner import JobFailed
+
+from .caching import get_form_definition
+from .export import EXPORT_FORMATS, iter_export
+from .importer import IMPORT_FORMATS, guess_format, import_employees, open_text
+from .versions import migrate_employees
+
+# Rejected rows / failed employees kept in a job result
+JOB_ERROR_ROWS_LIMIT = 100
+# Export progress is reported every this many rows
+EXPORT_PROGRESS_ROWS = 5000
+
+
+def _clean_form_id(params):
+    form_id = params.get('form_id')
+    if get_form_definition(form_id) is None:
+        raise JobParamsError({'form_id': 'Form not found'})
+    return int(form_id)
+
+
+def _get_form(context):
+    form = get_form_definition(context.params['form_id'])
+    if form is None:
+        raise JobFailed('Form not found')
+    return form
+
+
+def clean_import(params, user):
+    file_format = params.get('file_format')
+    if file_format not in (None, '') and file_format not in IMPORT_FORMATS:
+        raise JobParamsError({'file_format': f"Must be one of: {', '.join(IMPORT_FORMATS)}"})
+    mapping = params.get('mapping') or {}
+    if not isinstance(mapping, dict):
+        raise JobParamsError({'mapping': 'Must be an object of {source column: form field}'})
+    return {
+        'form_id': _clean_form_id(params),
+        'file_format': file_format or None,
+        'mapping': mapping,
+        'batch_size': params.get('batch_size'),
+    }
+
+
+@register('import_employees', clean=clean_import, max_attempts=1, needs_file=True)
+def import_employees_job(context):
+    """Import the uploaded CSV/JSONL file; one attempt, as batches commit as they go"""
+    form = _get_form(context)
+    rejected_rows = []
+
+    def on_reject(line_number, record, errors):
+        if len(rejected_rows) < JOB_ERROR_ROWS_LIMIT:
+            rejected_rows.append({'line': line_number, 'errors': errors})
+
+    file_format = context.params['file_format'] or guess_format(context.job.input_file.name)
+    with context.open_input() as upload:
+        result = import_employees(
+            form, open_text(upload), file_format, context.user_id,
+            mapping=context.params['mapping'],
+            batch_size=context.params['batch_size'],
+            on_reject=on_reject,
+            on_progress=lambda result: context.progress(**result.as_dict()),
+        )
+    return dict(result.as_dict(), rejected_rows=rejected_rows)
+
+
+def clean_export(params, user):
+    export_format = params.get('export_format') or 'csv'
+    if export_format not in EXPORT_FORMATS:
+        raise JobParamsError({'export_format': f"Must be one of: {', '.join(EXPORT_FORMATS)}"})
+    return {'form_id': _clean_form_id(params), 'export_format': export_format}
+
+
+@register('export_employees', clean=clean_export)
+def export_employees_job(context):
+    """Write the form's active employees to a file served by the job download endpoint"""
+    form = _get_form(context)
+    export_format = context.params['export_format']
+    rows = 0
+    with tempfile.TemporaryFile('w+b') as output:
+        lines = iter_export(form, export_format)
+        if export_format == 'csv':
+            output.write(next(lines).encode())  # Header
+        for line in lines:
+            output.write(line.encode())
+            rows += 1
+            if rows % EXPORT_PROGRESS_ROWS == 0:
+                context.progress(rows=rows)
+        context.progress(rows=rows)
+        output.seek(0)
+        context.save_output(f'form-{form.id}-employees.{export_format}', File(output))
+    return {'rows': rows}
+
+
+def clean_migrate(params, user):
+    defaults = params.get('defaults') or {}
+    if not isinstance(defaults, dict):
+        raise JobParamsError({'defaults': 'Must be an object of {field: value}'})
+    return {'form_id': _clean_form_id(params), 'defaults': defaults, 'batch_size': params.get('batch_size')}
+
+
+@register('migrate_form_versions', clean=clean_migrate)
+def migrate_form_versions_job(context):
+    """Move the form's employees to its current version (employees.versions)"""
+    form = _get_form(context)
+    failed_rows = []
+
+    def on_failure(employee_id, errors):
+        if len(failed_rows) < JOB_ERROR_ROWS_LIMIT:
+            failed_rows.append({'id': employee_id, 'errors': errors})
+
+    result = migrate_employees(
+        form.id,
+        defaults=context.params['defaults'],
+        batch_size=context.params['batch_size'],
+        on_failure=on_failure,
+        on_progress=lambda result: context.progress(**result.as_dict()),
+    )
+    return dict(result.as_dict(), failed_rows=failed_rows)
+
+
+def clean_maintenance(params, user):
+    form_id = params.get('form_id')
+    return {'form_id': None if form_id in (None, '') else _clean_form_id(params)}
+
+
+def _command_job(name):
+    def handler(context):
+        output = io.StringIO()
+        options = {'form': context.params['form_id']} if context.params.get('form_id') else {}
+        call_command(name, stdout=output, **options)
+        return {'output': output.getvalue()}
+    handler.__name__ = f'{name}_job'
+    handler.__doc__ = f'Run the {name} management command'
+    return handler
+
+
+for command in ('rebuild_search_index', 'rebuild_projections', 'backfill_display_names'):
+    register(command, clean=clean_maintenance, staff_only=True)(_command_job(command))
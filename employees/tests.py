@@ -1,3 +1,688 @@
+import asyncio
+import datetime
+import importlib.util
+import io
+import json
+import os
+import re
+import unittest
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from employee_system import db_profiles
+from employees import events, projections
+from employees.models import (
+    DynamicForm, Employee, EmployeeFacetCount, EmployeeFieldValue, EmployeeSearchEntry,
+)
+from employees.validation import get_validator
+from employees.versions import migrate_employees
+
+# A plan step reading a whole table, e.g. "SCAN employee" (vs "SCAN employee USING INDEX ...")
+FULL_SCAN_RE = re.compile(r'^SCAN (?P<table>\w+)(?: AS \w+)?$')
+CHECKED_TABLES = {DynamicForm._meta.db_table, Employee._meta.db_table}
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Plans are read with SQLite EXPLAIN QUERY PLAN')
+class QueryPlanTests(TestCase):
+    """List, filter and statistics queries read employee/dynamic_form through indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by=cls.user,
+        )
+        for i in range(5):
+            Employee.objects.create(
+                form=cls.form, employee_data={'full_name': f'Employee {i}'}, created_by=cls.user
+            )
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+        self.client.force_login(self.user)
+
+    def full_scans(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            steps = [row[-1] for row in cursor.fetchall()]
+        return [
+            step for step in steps
+            if (match := FULL_SCAN_RE.match(step)) and match['table'] in CHECKED_TABLES
+        ]
+
+    def assertUsesIndexes(self, get, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = get(url)
+        self.assertEqual(response.status_code, 200, url)
+        checked = 0
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or not any(f'"{table}"' in sql for table in CHECKED_TABLES):
+                continue
+            checked += 1
+            self.assertEqual(self.full_scans(sql), [], f'{url}: {sql}')
+        self.assertGreater(checked, 0, url)
+
+    def test_api_list_and_filter(self):
+        self.assertUsesIndexes(self.api.get, '/api/employees/')
+        self.assertUsesIndexes(self.api.get, f'/api/employees/?form_id={self.form.id}')
+        self.assertUsesIndexes(self.api.get, '/api/employees/?order=display_name')
+        self.assertUsesIndexes(self.api.get, '/api/forms/')
+
+    def test_api_statistics(self):
+        self.assertUsesIndexes(
+            self.api.get,
+            f'/api/employees/statistics/?by_creator=true&period=month&form_id={self.form.id}&field=full_name',
+        )
+
+    def test_html_list_and_filter(self):
+        self.assertUsesIndexes(self.client.get, '/employees/')
+        self.assertUsesIndexes(self.client.get, f'/employees/?form={self.form.id}')
+        self.assertUsesIndexes(self.client.get, '/employees/forms/')
+
+
+class SearchIndexTests(TestCase):
+    """employee_data tokens are indexed on write and searched by prefix"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        self.form = DynamicForm.objects.create(
+            name='Engineering',
+            fields_config=[
+                {'name': 'full_name', 'label': 'Full Name', 'type': 'text'},
+                {'name': 'city', 'label': 'City', 'type': 'text'},
+            ],
+            created_by=self.user,
+        )
+        self.ada = Employee.objects.create(
+            form=self.form, employee_data={'full_name': 'Ada Lovelace', 'city': 'London'}, created_by=self.user
+        )
+        self.grace = Employee.objects.create(
+            form=self.form, employee_data={'full_name': 'Grace Hopper', 'city': 'New York'}, created_by=self.user
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def entries(self, employee):
+        entries = EmployeeSearchEntry.objects.filter(employee=employee)
+        return set(entries.values_list('field_name', 'normalized_value'))
+
+    def search(self, query):
+        response = self.api.get(f'/api/employees/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.json()['results']}
+
+    def test_entries_follow_writes(self):
+        self.assertEqual(
+            self.entries(self.ada),
+            {('full_name', 'ada'), ('full_name', 'lovelace'), ('city', 'london')},
+        )
+        self.ada.employee_data = {'full_name': 'Ada King', 'city': 'London'}
+        self.ada.save()
+        self.assertEqual(
+            self.entries(self.ada), {('full_name', 'ada'), ('full_name', 'king'), ('city', 'london')}
+        )
+        self.ada.is_active = False
+        self.ada.save()
+        self.assertEqual(self.entries(self.ada), set())
+
+    def test_search(self):
+        self.assertEqual(self.search('search=lov'), {self.ada.id})
+        self.assertEqual(self.search('search=NEW+yo'), {self.grace.id})
+        self.assertEqual(self.search('search=ada+york'), set())
+        self.assertEqual(self.search('search=london&field=full_name'), set())
+        self.assertEqual(self.search('search=london&field=city'), {self.ada.id})
+        # Form names match too when the search is not scoped to a field
+        self.assertEqual(self.search('search=engineering'), {self.ada.id, self.grace.id})
+
+        self.grace.is_active = False
+        self.grace.save()
+        self.assertEqual(self.search('search=grace'), set())
+
+
+class FormValidatorTests(TestCase):
+    """Compiled validators coerce values, enforce required fields and reject unknown keys"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        self.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[
+                {'name': 'full_name', 'label': 'Full Name', 'type': 'text', 'required': True, 'max_length': 10},
+                {'name': 'age', 'label': 'Age', 'type': 'number'},
+                {'name': 'email', 'label': 'Email', 'type': 'email'},
+                {'name': 'joined', 'label': 'Joined', 'type': 'date'},
+            ],
+            created_by=self.user,
+        )
+
+    def test_coercion(self):
+        validator = get_validator(self.form)
+        cleaned, errors = validator.clean({
+            'full_name': '  Ada  ', 'age': '36', 'email': 'Ada@Example.COM', 'joined': '2024-01-05',
+        })
+        self.assertEqual(errors, {})
+        self.assertEqual(
+            cleaned, {'full_name': 'Ada', 'age': 36, 'email': 'Ada@example.com', 'joined': '2024-01-05'}
+        )
+        self.assertEqual(validator.clean({'full_name': 'Ada', 'age': '1.5'})[0]['age'], 1.5)
+
+        _cleaned, errors = validator.clean({
+            'full_name': 'Ada', 'age': True, 'email': 'nope', 'joined': '05/01/2024',
+        })
+        self.assertEqual(set(errors), {'age', 'email', 'joined'})
+        self.assertEqual(validator.validate({'full_name': 'Ada', 'age': 'NaN'}), {'age': 'Enter a number'})
+
+    def test_number_bounds(self):
+        validator = get_validator(self.form)
+
+        def age_error(age):
+            return validator.validate({'full_name': 'Ada', 'age': age}).get('age')
+
+        # Huge exponents are rejected before they are expanded into an int
+        for age in ('1e1000000', '-1e2000000', '1e20', 2 ** 63, -2 ** 63 - 1, 10 ** 400):
+            self.assertEqual(age_error(age), 'Ensure this number fits in a 64-bit integer', age)
+        self.assertEqual(age_error('1' * 31), 'Ensure this number has at most 30 digits')
+        for age in (float('nan'), float('inf'), float('-inf'), 'Infinity'):
+            self.assertEqual(age_error(age), 'Enter a number', age)
+        cleaned, errors = validator.clean({'full_name': 'Ada', 'age': str(2 ** 63 - 1)})
+        self.assertEqual((cleaned['age'], errors), (2 ** 63 - 1, {}))
+        self.assertEqual(validator.clean({'full_name': 'Ada', 'age': '-1.5e-3'})[0]['age'], -0.0015)
+        self.assertEqual(validator.clean({'full_name': 'Ada', 'age': 1.5e300})[0]['age'], 1.5e300)
+
+    def test_required_and_max_length(self):
+        validator = get_validator(self.form)
+        self.assertEqual(validator.validate({'age': 3}), {'full_name': 'This field is required'})
+        self.assertEqual(validator.validate({'full_name': '   '}), {'full_name': 'This field is required'})
+        self.assertIn('at most 10', validator.validate({'full_name': 'Ada Lovelace King'})['full_name'])
+        cleaned, errors = validator.clean({'full_name': 'Ada', 'age': None})
+        self.assertEqual((cleaned, errors), ({'full_name': 'Ada', 'age': ''}, {}))
+
+    def test_api_rejects_unknown_fields(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        response = api.post('/api/employees/', {
+            'form_id': self.form.id, 'employee_data': {'full_name': 'Ada', 'nickname': 'Countess'},
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'employee_data': {'nickname': 'Unknown field for this form'}})
+        self.assertFalse(Employee.objects.exists())
+
+    def test_cached_per_version(self):
+        validator = get_validator(self.form)
+        self.assertIs(get_validator(self.form), validator)
+        first_version = self.form.version
+
+        self.form.fields_config = self.form.fields_config + [{'name': 'city', 'label': 'City', 'type': 'text'}]
+        self.form.save()
+        self.form.refresh_from_db()
+        self.assertNotEqual(self.form.version_id, first_version.id)
+        self.assertIsNot(get_validator(self.form), validator)
+        self.assertIn('city', get_validator(self.form).field_names)
+        # The old version keeps its own validator
+        self.assertIs(get_validator(first_version), validator)
+        self.assertNotIn('city', validator.field_names)
+
+
+class ProjectionTests(TestCase):
+    """Indexed fields are materialized into typed rows that back list filters and ordering"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        self.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[
+                {'name': 'full_name', 'label': 'Full Name', 'type': 'text'},
+                {'name': 'salary', 'label': 'Salary', 'type': 'number', 'indexed': True},
+                {'name': 'joined', 'label': 'Joined', 'type': 'date', 'indexed': True},
+                {'name': 'notes', 'label': 'Notes', 'type': 'text'},
+            ],
+            created_by=self.user,
+        )
+        rows = [('Ada', 100, '2020-05-01'), ('Grace', 250.5, '2019-01-15'), ('Linus', None, '2021-07-30')]
+        self.employees = [
+            Employee.objects.create(
+                form=self.form, created_by=self.user,
+                employee_data={'full_name': name, 'salary': salary, 'joined': joined, 'notes': 'x'},
+            )
+            for name, salary, joined in rows
+        ]
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def names(self, query):
+        response = self.api.get(f'/api/employees/?form_id={self.form.id}&{query}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['display_name'] for row in response.json()['results']]
+
+    def test_typed_rows_follow_writes(self):
+        ada = self.employees[0]
+        rows = EmployeeFieldValue.objects.filter(employee=ada).order_by('field_name')
+        self.assertEqual(
+            list(rows.values_list('field_name', 'number_value', 'date_value', 'text_value')),
+            [('joined', None, datetime.date(2020, 5, 1), None), ('salary', 100.0, None, None)],
+        )
+        ada.employee_data = dict(ada.employee_data, salary=120)
+        ada.save()
+        self.assertEqual(rows.get(field_name='salary').number_value, 120.0)
+        ada.is_active = False
+        ada.save()
+        self.assertFalse(rows.exists())
+
+    def test_out_of_range_numbers(self):
+        response = self.api.post('/api/employees/', {
+            'form_id': self.form.id, 'employee_data': {'full_name': 'Big', 'salary': '1e400'},
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.api.get(f'/api/employees/?form_id={self.form.id}&salary__gte=1e400')
+        self.assertEqual(response.status_code, 400)
+        # Stored before numbers were bounded: saved without a typed row
+        big = Employee.objects.create(
+            form=self.form, created_by=self.user, employee_data={'full_name': 'Big', 'salary': 10 ** 400},
+        )
+        self.assertFalse(EmployeeFieldValue.objects.filter(employee=big, field_name='salary').exists())
+        self.assertEqual(projections.build_values(big, {'salary': 'number'}), [])
+
+    def test_filters_and_ordering(self):
+        self.assertEqual(self.names('salary__gte=100&order=-salary'), ['Grace', 'Ada'])
+        self.assertEqual(self.names('salary=100'), ['Ada'])
+        self.assertEqual(self.names('joined__lt=2021-01-01&order=joined'), ['Grace', 'Ada'])
+        # Sorting lists only employees with a value; unindexed fields are not filters
+        self.assertEqual(self.names('order=salary'), ['Ada', 'Grace'])
+        self.assertEqual(len(self.names('notes=y')), 3)
+
+        for query in ('salary__like=1', 'salary=abc', 'joined__gt=yesterday', 'order=notes'):
+            response = self.api.get(f'/api/employees/?form_id={self.form.id}&{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+    def test_reserved_field_names(self):
+        response = self.api.post('/api/forms/', {'name': 'Reserved', 'fields_config': [
+            {'name': 'name', 'label': 'Name', 'type': 'text', 'indexed': True},
+            {'name': 'a__b', 'label': 'AB', 'type': 'text', 'indexed': True},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name, a__b', response.json()['fields_config'][0])
+        response = self.api.post('/api/forms/', {'name': 'Unindexed', 'fields_config': [
+            {'name': 'name', 'label': 'Name', 'type': 'text'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        # Forms saved before the check: ?name= is not read as a field filter
+        legacy = DynamicForm(id=self.form.id, name='Staff', fields_config=[
+            {'name': 'name', 'label': 'Name', 'type': 'text', 'indexed': True},
+        ])
+        queryset, _ordering = projections.filter_queryset(Employee.objects.all(), legacy, {'name': 'gra'})
+        self.assertEqual(queryset.count(), 3)
+
+
+class EmployeeListPageTests(TestCase):
+    """The HTML employee list pages with the same keyset cursors as the API"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        cls.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by=cls.user,
+        )
+        for i in range(5):
+            Employee.objects.create(form=cls.form, employee_data={'full_name': f'Employee {i}'}, created_by=cls.user)
+        Employee.objects.update(created_at=timezone.now())
+        cls.expected = list(Employee.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def page(self, **params):
+        response = self.client.get(reverse('employee_list'), dict(params, page_size=2))
+        self.assertEqual(response.status_code, 200)
+        return response.context['page']
+
+    def test_cursors(self):
+        pages = [self.page()]
+        while pages[-1].has_next:
+            pages.append(self.page(cursor=pages[-1].next_cursor))
+        self.assertEqual(
+            [[e.id for e in page] for page in pages], [self.expected[:2], self.expected[2:4], self.expected[4:]]
+        )
+        previous = self.page(cursor=pages[-1].previous_cursor)
+        self.assertEqual([e.id for e in previous], self.expected[2:4])
+        self.assertContains(
+            self.client.get(reverse('employee_list'), {'cursor': pages[1].next_cursor, 'page_size': 2}),
+            f'?cursor={pages[2].previous_cursor}&',
+        )
+        # A broken cursor starts over at the first page
+        self.assertEqual([e.id for e in self.page(cursor='bogus')], self.expected[:2])
+
+    def test_form_filter(self):
+        self.assertEqual([e.id for e in self.page(form=self.form.id)], self.expected[:2])
+        for form in ('abc', '\u00b2'):
+            self.assertEqual(list(self.page(form=form)), [])
+
+
+class DisplayNameTests(TestCase):
+    """display_name is precomputed from the form's display fields and backs name filters"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        self.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[
+                {'name': 'first_name', 'label': 'First Name', 'type': 'text'},
+                {'name': 'last_name', 'label': 'Last Name', 'type': 'text'},
+            ],
+            display_fields=['first_name', 'last_name'],
+            created_by=self.user,
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def create(self, **data):
+        return Employee.objects.create(form=self.form, employee_data=data, created_by=self.user)
+
+    def test_built_from_display_fields(self):
+        self.assertEqual(self.create(first_name=' Ada ', last_name='Lovelace').display_name, 'Ada Lovelace')
+        self.assertEqual(self.create(last_name='Hopper').display_name, 'Hopper')
+        nameless = self.create()
+        self.assertEqual((nameless.display_name, nameless.get_display_name()), ('', f'Employee #{nameless.id}'))
+
+        # Without display_fields the first field named like a name is used
+        form = DynamicForm.objects.create(
+            name='Contractors',
+            fields_config=[
+                {'name': 'city', 'label': 'City', 'type': 'text'},
+                {'name': 'full_name', 'label': 'Full Name', 'type': 'text'},
+            ],
+            created_by=self.user,
+        )
+        employee = Employee.objects.create(
+            form=form, employee_data={'city': 'Pune', 'full_name': 'Linus'}, created_by=self.user
+        )
+        self.assertEqual(employee.display_name, 'Linus')
+
+    def test_prefix_filter_and_ordering(self):
+        for first_name in ('bob', 'Alice', 'alan', 'Carol'):
+            self.create(first_name=first_name)
+
+        def names(query):
+            return [row['display_name'] for row in self.api.get(f'/api/employees/?{query}').json()['results']]
+
+        self.assertEqual(names('order=display_name'), ['alan', 'Alice', 'bob', 'Carol'])
+        self.assertEqual(names('order=-display_name'), ['Carol', 'bob', 'Alice', 'alan'])
+        self.assertEqual(names('name=AL&order=display_name'), ['alan', 'Alice'])
+
+    def test_html_views_validate_display_fields(self):
+        self.client.force_login(self.user)
+        fields_config = json.dumps(self.form.fields_config)
+        for display_fields, error in (
+            ('5', 'Display fields must be a list'),
+            ('"abc"', 'Display fields must be a list'),
+            ('["nickname", 3]', 'Unknown fields: nickname, 3'),
+        ):
+            response = self.client.post(reverse('form_create'), {
+                'name': 'Contractors', 'fields_config': fields_config, 'display_fields': display_fields,
+            })
+            self.assertEqual(response.json(), {'success': False, 'error': error}, display_fields)
+            response = self.client.post(reverse('form_edit', args=[self.form.id]), {'display_fields': display_fields})
+            self.assertEqual(response.json(), {'success': False, 'error': error}, display_fields)
+        self.assertFalse(DynamicForm.objects.filter(name='Contractors').exists())
+        self.form.refresh_from_db()
+        self.assertEqual(self.form.display_fields, ['first_name', 'last_name'])
+
+        # Dropping a display field from fields_config needs display_fields updated too
+        response = self.client.post(reverse('form_edit', args=[self.form.id]), {
+            'fields_config': json.dumps(self.form.fields_config[:1]),
+        })
+        self.assertEqual(response.json(), {'success': False, 'error': 'Unknown fields: last_name'})
+        response = self.client.post(reverse('form_edit', args=[self.form.id]), {
+            'fields_config': json.dumps(self.form.fields_config[:1]), 'display_fields': '["first_name"]',
+        }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(self.create(first_name='Ada').display_name, 'Ada')
+
+    def test_backfill_command(self):
+        employee = self.create(first_name='Ada', last_name='Lovelace')
+        Employee.objects.filter(id=employee.id).update(display_name='')
+        call_command('backfill_display_names', form=self.form.id, stdout=io.StringIO())
+        employee.refresh_from_db()
+        self.assertEqual(employee.display_name, 'Ada Lovelace')
+
+
+class FormVersionTests(TestCase):
+    """Schema edits add immutable versions; employees move to them explicitly"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        self.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[{'name': 'full_name', 'label': 'Full Name', 'type': 'text'}],
+            created_by=self.user,
+        )
+        self.employee = Employee.objects.create(
+            form=self.form, employee_data={'full_name': 'Ada Lovelace'}, created_by=self.user
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def change_schema(self):
+        response = self.api.patch(f'/api/forms/{self.form.id}/', {'fields_config': [
+            {'name': 'full_name', 'label': 'Full Name', 'type': 'text'},
+            {'name': 'salary', 'label': 'Salary', 'type': 'number', 'required': True, 'indexed': True},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.form.refresh_from_db()
+        return response.json()['version']
+
+    def test_only_schema_changes_add_versions(self):
+        first = self.form.version
+        self.assertEqual(first.number, 1)
+        self.assertEqual(self.employee.form_version_id, first.id)
+
+        self.form.name = 'Staff 2024'
+        self.form.save()
+        self.assertEqual(self.form.versions.count(), 1)
+
+        self.assertNotEqual(self.change_schema(), first.id)
+        self.assertEqual(self.form.version.number, 2)
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.form_version_id, first.id)
+
+    def test_edit_moves_employee_to_current_version(self):
+        version_id = self.change_schema()
+        response = self.api.patch(
+            f'/api/employees/{self.employee.id}/',
+            {'employee_data': {'full_name': 'Ada Lovelace', 'salary': 100}}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['form_version'], version_id)
+        self.assertEqual(
+            list(EmployeeFieldValue.objects.values_list('employee_id', 'number_value')),
+            [(self.employee.id, 100.0)],
+        )
+
+    def test_migrate_employees_keeps_invalid_rows(self):
+        other = Employee.objects.create(
+            form=self.form, employee_data={'full_name': 'Grace Hopper'}, created_by=self.user
+        )
+        version_id = self.change_schema()
+        failures = []
+        result = migrate_employees(self.form.id, on_failure=lambda employee_id, errors: failures.append(employee_id))
+        self.assertEqual((result.migrated, result.failed), (0, 2))
+        self.assertEqual(sorted(failures), sorted([self.employee.id, other.id]))
+
+        result = migrate_employees(self.form.id, defaults={'salary': '50', 'unknown': 'x'}, batch_size=1)
+        self.assertEqual((result.migrated, result.failed), (2, 0))
+        self.assertEqual(
+            set(Employee.objects.values_list('form_version_id', flat=True)), {version_id}
+        )
+        self.assertEqual(EmployeeFieldValue.objects.filter(number_value=50).count(), 2)
+
+
+class FacetTests(TestCase):
+    """Facet counts follow employee writes; the list API filters and facets on indexed fields"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        self.form = DynamicForm.objects.create(
+            name='Staff',
+            fields_config=[
+                {'name': 'full_name', 'label': 'Full Name', 'type': 'text', 'indexed': True},
+                {'name': 'city', 'label': 'City', 'type': 'text', 'indexed': True},
+                {'name': 'salary', 'label': 'Salary', 'type': 'number', 'indexed': True},
+            ],
+            created_by=self.user,
+        )
+        people = [('Ada', 'Pune', 100), ('Alan', 'Pune', 200), ('Grace', 'Delhi', 300), ('Linus', 'Goa', 150)]
+        self.employees = [
+            Employee.objects.create(
+                form=self.form, employee_data={'full_name': name, 'city': city, 'salary': salary},
+                created_by=self.user,
+            )
+            for name, city, salary in people
+        ]
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def counts(self, field_name):
+        return dict(EmployeeFacetCount.objects.filter(
+            form=self.form, field_name=field_name
+        ).values_list('value', 'count'))
+
+    def test_counts_follow_writes(self):
+        self.assertEqual(self.counts('city'), {'Pune': 2, 'Delhi': 1, 'Goa': 1})
+        self.assertEqual(self.counts('salary')['150'], 1)
+
+        ada, alan, grace, linus = self.employees
+        ada.employee_data = dict(ada.employee_data, city='Delhi')
+        ada.save()
+        alan.is_active = False
+        alan.save()
+        linus.delete()
+        self.assertEqual(self.counts('city'), {'Delhi': 2})
+
+        call_command('rebuild_projections', form=self.form.id, stdout=io.StringIO())
+        self.assertEqual(self.counts('city'), {'Delhi': 2})
+
+    def test_list_facets(self):
+        url = f'/api/employees/?form_id={self.form.id}&facets=city'
+        response = self.api.get(url)
+        self.assertEqual(response.json()['facets'], {'city': [
+            {'value': 'Pune', 'count': 2}, {'value': 'Delhi', 'count': 1}, {'value': 'Goa', 'count': 1},
+        ]})
+        response = self.api.get(url + '&salary__range=150,&facet_limit=1')
+        self.assertEqual(len(response.json()['results']), 3)
+        self.assertEqual(response.json()['facets'], {'city': [{'value': 'Delhi', 'count': 1}]})
+
+        self.assertEqual(self.api.get('/api/employees/?facets=city').status_code, 400)
+        self.assertEqual(self.api.get(f'/api/employees/?form_id={self.form.id}&facets=nope').status_code, 400)
+
+    def test_field_lookups(self):
+        def names(query):
+            response = self.api.get(f'/api/employees/?form_id={self.form.id}&order=full_name&{query}')
+            self.assertEqual(response.status_code, 200, response.content)
+            return [row['display_name'] for row in response.json()['results']]
+
+        self.assertEqual(names('city__in=Goa,Delhi'), ['Grace', 'Linus'])
+        self.assertEqual(names('salary__range=100,200'), ['Ada', 'Alan', 'Linus'])
+        self.assertEqual(names('full_name__prefix=Al'), ['Alan'])
+        self.assertEqual(names('city__eq=Pune'), ['Ada', 'Alan'])
+        self.assertEqual(self.api.get(f'/api/employees/?form_id={self.form.id}&salary__prefix=1').status_code, 400)
+
+
+# A plain TestCase: the command only writes to its own scratch database
+# (and Django's TestCase refuses connections to aliases created at runtime)
+class EventBrokerTests(unittest.TestCase):
+    """LocalBroker fans events out to the matching subscriptions"""
+
+    def event(self, change_id, form_id=1):
+        return {'change_id': change_id, 'action': 'created', 'employee_id': change_id, 'form_id': form_id}
+
+    def test_fan_out(self):
+        broker = events.LocalBroker()
+
+        async def run():
+            async with broker.subscribe() as everything, broker.subscribe(form_id=2) as one_form:
+                broker.publish([self.event(1), self.event(2, form_id=2)])
+                await asyncio.sleep(0)
+                received = await everything.get(1), await one_form.get(1)
+                # Nothing pending: wait out the timeout
+                return received + (await one_form.get(0.01),)
+
+        everything, one_form, timed_out = asyncio.run(run())
+        self.assertEqual([event['change_id'] for event in everything], [1, 2])
+        self.assertEqual([event['change_id'] for event in one_form], [2])
+        self.assertEqual(timed_out, [])
+        # Closed subscriptions are detached
+        self.assertEqual(broker._subscriptions, set())
+
+    def test_overflow(self):
+        broker = events.LocalBroker()
+
+        async def run():
+            async with broker.subscribe() as subscription:
+                subscription._queue = asyncio.Queue(2)
+                broker.publish([self.event(change_id) for change_id in range(1, 4)])
+                await asyncio.sleep(0)
+                overflowed = subscription.overflowed
+                subscription.reset()
+                return overflowed, subscription.overflowed, await subscription.get(0.01)
+
+        self.assertEqual(asyncio.run(run()), (True, False, []))
+
+
+class DatabaseProfileTests(unittest.TestCase):
+    """DJANGO_DB_PROFILE picks the DATABASES['default'] settings"""
+
+    def load_settings(self, **env):
+        spec = importlib.util.find_spec('employee_system.settings')
+        module = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(os.environ, env):
+            spec.loader.exec_module(module)
+        return module
+
+    def test_selected_from_settings(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('DJANGO_DB_PROFILE', None)
+            default = self.load_settings()
+        self.assertEqual(default.DATABASE_PROFILE, 'sqlite')
+        self.assertEqual(default.DATABASES['default']['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        basic = self.load_settings(DJANGO_DB_PROFILE='sqlite-basic')
+        self.assertNotIn('OPTIONS', basic.DATABASES['default'])
+        postgres = self.load_settings(DJANGO_DB_PROFILE='postgres', DB_POOL='0', DB_NAME='staff')
+        self.assertEqual(postgres.DATABASES['default']['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(postgres.DATABASES['default']['NAME'], 'staff')
+        self.assertEqual(postgres.EMPLOYEE_CHANGE_FEED_DELAY, 2)
+        with self.assertRaisesRegex(ImproperlyConfigured, 'Unknown DJANGO_DB_PROFILE'):
+            self.load_settings(DJANGO_DB_PROFILE='mysql')
+
+    def test_postgres_pool(self):
+        with mock.patch('importlib.util.find_spec', return_value=object()):
+            database = db_profiles.database_settings('postgres', None, {'DB_POOL_MAX_SIZE': '4'})
+        self.assertEqual(database['OPTIONS']['pool']['max_size'], 4)
+        self.assertNotIn('CONN_MAX_AGE', database)
+        with mock.patch('importlib.util.find_spec', return_value=None):
+            with self.assertRaisesRegex(ImproperlyConfigured, 'requirements-postgres.txt'):
+                db_profiles.database_settings('postgres', None, {})
+        database = db_profiles.database_settings('postgres', None, {'DB_POOL': 'off'})
+        self.assertEqual((database['OPTIONS'], database['CONN_MAX_AGE']), ({}, 60))
+
 
-# Create your tests here.
+class BenchmarkCommandTests(unittest.TestCase):
+    def test_benchmark_db_writes_runs(self):
+        output = io.StringIO()
+        call_command('benchmark_db_writes', profiles='sqlite', threads=2, writes=3, stdout=output)
+        header, row = output.getvalue().splitlines()
+        self.assertTrue(row.startswith('sqlite '), row)
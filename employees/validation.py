@@ -0,0 +1,204 @@
+"""
+Validation and normalization of employee_data against a DynamicForm.
+
+A form's fields_config is compiled once into a FormValidator holding one
+coercer per field. The compiled object is cached per FormVersion: versions
+are immutable, so every request, bulk call or import row validating against
+the same version reuses it and nothing ever has to be invalidated.
+"""
+import datetime
+import math
+import re
+import threading
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator, validate_email
+
+PHONE_RE = re.compile(r'^\+?[0-9\s\-().]{5,20}$')
+VALIDATOR_CACHE_SIZE = 256
+MAX_NUMBER_DIGITS = 30
+MIN_INT, MAX_INT = -2 ** 63, 2 ** 63 - 1
+_validate_url = URLValidator()
+
+
+class FieldError(Exception):
+    pass
+
+
+def _coerce_text(value):
+    return value.strip() if isinstance(value, str) else str(value)
+
+
+def _check_int(value):
+    if not MIN_INT <= value <= MAX_INT:
+        raise FieldError('Ensure this number fits in a 64-bit integer')
+    return value
+
+
+def _coerce_number(value):
+    if isinstance(value, bool):
+        raise FieldError('Enter a number')
+    if isinstance(value, int):
+        return _check_int(value)
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise FieldError('Enter a number')
+        return value
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise FieldError('Enter a number')
+    if not number.is_finite():
+        raise FieldError('Enter a number')
+    # Bounded before anything converts the number, which costs time quadratic in its exponent
+    if len(number.as_tuple().digits) > MAX_NUMBER_DIGITS:
+        raise FieldError(f'Ensure this number has at most {MAX_NUMBER_DIGITS} digits')
+    if number.adjusted() >= MAX_NUMBER_DIGITS:
+        # With at most MAX_NUMBER_DIGITS digits this is a whole number
+        raise FieldError('Ensure this number fits in a 64-bit integer')
+    if number == number.to_integral_value():
+        return _check_int(int(number))
+    return float(number)
+
+
+def _coerce_email(value):
+    value = _coerce_text(value)
+    try:
+        validate_email(value)
+    except ValidationError:
+        raise FieldError('Enter a valid email address')
+    local, _, domain = value.rpartition('@')
+    return f'{local}@{domain.lower()}'
+
+
+def _coerce_date(value):
+    try:
+        return datetime.date.fromisoformat(_coerce_text(value)).isoformat()
+    except ValueError:
+        raise FieldError('Enter a valid date (YYYY-MM-DD)')
+
+
+def _coerce_tel(value):
+    value = _coerce_text(value)
+    if not PHONE_RE.match(value):
+        raise FieldError('Enter a valid phone number')
+    return value
+
+
+def _coerce_url(value):
+    value = _coerce_text(value)
+    try:
+        _validate_url(value)
+    except ValidationError:
+        raise FieldError('Enter a valid URL')
+    return value
+
+
+COERCERS = {
+    'text': _coerce_text,
+    'textarea': _coerce_text,
+    'password': _coerce_text,
+    'number': _coerce_number,
+    'email': _coerce_email,
+    'date': _coerce_date,
+    'tel': _coerce_tel,
+    'url': _coerce_url,
+}
+
+
+class CompiledField:
+    __slots__ = ('name', 'required', 'max_length', 'coerce')
+
+    def __init__(self, config):
+        self.name = config.get('name')
+        self.required = bool(config.get('required'))
+        max_length = config.get('max_length')
+        self.max_length = int(max_length) if max_length not in (None, '') else None
+        self.coerce = COERCERS.get(config.get('type'), _coerce_text)
+
+
+class FormValidator:
+    """
+    Compiled fields_config. clean() type-checks and normalizes one record in
+    a single pass and returns (cleaned_data, errors).
+    """
+    def __init__(self, fields_config):
+        self.fields = [CompiledField(config) for config in fields_config if isinstance(config, dict)]
+        self.field_names = frozenset(field.name for field in self.fields)
+
+    def clean(self, data):
+        if not isinstance(data, dict):
+            return None, {'employee_data': 'Employee data must be a dictionary'}
+
+        cleaned = {}
+        errors = {}
+        for field in self.fields:
+            if field.name not in data:
+                if field.required:
+                    errors[field.name] = 'This field is required'
+                continue
+            value = data[field.name]
+            if value is None or (isinstance(value, str) and value.strip() == ''):
+                if field.required:
+                    errors[field.name] = 'This field is required'
+                else:
+                    cleaned[field.name] = ''
+                continue
+            try:
+                value = field.coerce(value)
+            except FieldError as e:
+                errors[field.name] = str(e)
+                continue
+            if field.max_length is not None and len(str(value)) > field.max_length:
+                errors[field.name] = f'Ensure this value has at most {field.max_length} characters'
+                continue
+            cleaned[field.name] = value
+
+        for field_name in data:
+            if field_name not in self.field_names:
+                errors[field_name] = 'Unknown field for this form'
+        return cleaned, errors
+
+    def validate(self, data):
+        return self.clean(data)[1]
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_validator(schema):
+    """
+    Return the compiled validator for a FormVersion, or for the current
+    version of a DynamicForm / FormDefinition
+    """
+    key = schema.version_id
+    if key is None:
+        # Not versioned yet (unsaved form)
+        return FormValidator(schema.fields_config)
+    with _cache_lock:
+        validator = _cache.get(key)
+        if validator is not None:
+            _cache.move_to_end(key)
+            return validator
+
+    validator = FormValidator(schema.fields_config)
+    with _cache_lock:
+        _cache[key] = validator
+        _cache.move_to_end(key)
+        while len(_cache) > VALIDATOR_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return validator
+
+
+def forget_validator(version_id):
+    """Drop a compiled validator, for version ids handed out again after a rollback"""
+    with _cache_lock:
+        _cache.pop(version_id, None)
+
+
+def format_errors(errors):
+    """Flatten a {field: message} dict into one human readable string"""
+    return '; '.join(f'{field}: {message}' for field, message in errors.items())
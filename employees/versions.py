@@ -0,0 +1,129 @@
+"""
+Immutable schema versions of DynamicForms.
+
+Saving a form whose fields_config or display_fields changed snapshots them
+into a new FormVersion (signals.snapshot_form_schema) instead of changing
+what existing employees were validated against. Every employee keeps
+pointing at the version its data was captured with, and its display name
+and typed projections follow that version. Employees move to the current
+version either lazily, when their data is next validated and saved through
+the API, the HTML views or a bulk update, or explicitly in batches with
+migrate_employees() (the migrate_form_versions command).
+"""
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .bulk import bulk_update_employees, get_batch_size
+from .caching import get_form_definition, get_form_version, remember_form_version
+from .models import DynamicForm, Employee, FormVersion
+from .validation import get_validator
+
+
+def schema_changed(form):
+    """Whether form's fields_config/display_fields differ from its current version"""
+    current = get_form_version(form.version_id)
+    return (
+        current is None
+        or current.fields_config != form.fields_config
+        or current.display_fields != form.display_fields
+    )
+
+
+def snapshot_form(form):
+    """Give form a new current FormVersion if its schema changed; returns it or None"""
+    if not schema_changed(form):
+        return None
+    with transaction.atomic():
+        # Serializes concurrent edits of the same form
+        list(DynamicForm.objects.select_for_update().filter(pk=form.pk).values_list('pk', flat=True))
+        number = FormVersion.objects.filter(form_id=form.pk).aggregate(number=Max('number'))['number'] or 0
+        version = FormVersion.objects.create(
+            form_id=form.pk,
+            number=number + 1,
+            fields_config=form.fields_config,
+            display_fields=form.display_fields,
+        )
+        DynamicForm.objects.filter(pk=form.pk).update(version=version)
+    form.version = version
+    remember_form_version(version)
+    return version
+
+
+def version_counts(form_id):
+    """{version id: active employees} for one form"""
+    return dict(
+        Employee.objects.filter(form_id=form_id, is_active=True)
+        .order_by().values('form_version_id').annotate(count=Count('id'))
+        .values_list('form_version_id', 'count')
+    )
+
+
+class MigrationResult:
+    def __init__(self, version):
+        self.version = version
+        self.processed = 0
+        self.migrated = 0
+        self.failed = 0
+
+    def as_dict(self):
+        return {
+            'version': self.version,
+            'processed': self.processed,
+            'migrated': self.migrated,
+            'failed': self.failed,
+        }
+
+
+def migrate_employees(form_id, defaults=None, batch_size=None, on_failure=None, on_progress=None):
+    """
+    Move the active employees of a form that are on an older version to the
+    current one, one bulk_update_employees() transaction per batch.
+
+    Fields the current version no longer has are dropped and empty ones are
+    filled from defaults (ignored for other fields) before the data is
+    validated again. Employees that still do not validate stay on their
+    version and are reported with on_failure(employee_id, errors);
+    on_progress(result) runs after each batch.
+    """
+    form = get_form_definition(form_id, active_only=False)
+    if form is None:
+        raise DynamicForm.DoesNotExist(f'Form {form_id} does not exist')
+    version = get_form_version(form.version_id)
+    if version is None:
+        raise ValueError(f'Form {form_id} has no schema version yet; save it first')
+    batch_size = get_batch_size(batch_size)
+    validator = get_validator(version)
+    defaults = {name: value for name, value in (defaults or {}).items() if name in validator.field_names}
+    result = MigrationResult(version.number)
+
+    pending = Employee.objects.filter(form_id=form.id, is_active=True).exclude(
+        form_version_id=form.version_id
+    ).only('id', 'employee_data').order_by('id')
+    last_id = 0
+    while True:
+        batch = list(pending.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        records = []
+        for employee in batch:
+            result.processed += 1
+            data = dict(defaults)
+            data.update(
+                (name, value) for name, value in (employee.employee_data or {}).items()
+                if name in validator.field_names and value not in (None, '')
+            )
+            cleaned, errors = validator.clean(data)
+            if errors:
+                result.failed += 1
+                if on_failure:
+                    on_failure(employee.id, errors)
+                continue
+            records.append({'id': employee.id, 'employee_data': cleaned})
+        if records:
+            with transaction.atomic():
+                bulk_update_employees(records, batch_size)
+            result.migrated += len(records)
+        if on_progress:
+            on_progress(result)
+    return result
@@ -2,36 +2,60 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
 from django.views.decorators.http import require_http_methods
-from django.db.models import Q
 import json
 
-from .models import DynamicForm, Employee
+from .caching import aget_form_definition, get_form_definition
+from .models import DynamicForm, Employee, display_fields_error
+from .search import filter_display_name_prefix, search_employees
+from .validation import format_errors, get_validator
+from .pagination import InvalidCursor, KeysetPaginator
+from .projections import invalid_indexed_names, reserved_names_error
 
 @login_required
 def employee_list(request):
     """List all employees with search and filter functionality"""
-    employees = Employee.objects.filter(is_active=True).select_related('form', 'created_by')
+    employees = Employee.objects.filter(is_active=True).select_related('form', 'created_by').defer('employee_data')
     forms = DynamicForm.objects.filter(is_active=True)
     
     # Search functionality
     search_query = request.GET.get('search', '')
+    search_field = request.GET.get('field', '')
     form_filter = request.GET.get('form', '')
     
     if search_query:
-        # Search in JSON field
-        employees = employees.filter(
-            Q(employee_data__icontains=search_query) |
-            Q(form__name__icontains=search_query)
-        )
+        # Indexed lookup on employee_data tokens (and form names)
+        employees = search_employees(employees, search_query, field=search_field or None)
+    
+    name_prefix = request.GET.get('name', '')
+    if name_prefix:
+        employees = filter_display_name_prefix(employees, name_prefix)
     
     if form_filter:
-        employees = employees.filter(form_id=form_filter)
+        try:
+            employees = employees.filter(form_id=int(form_filter))
+        except ValueError:
+            employees = employees.none()
+    
+    # Keyset pagination on (created_at, id)
+    paginator = KeysetPaginator()
+    try:
+        page = paginator.paginate(
+            employees,
+            cursor=request.GET.get('cursor'),
+            page_size=request.GET.get('page_size'),
+        )
+    except InvalidCursor:
+        page = paginator.paginate(employees, page_size=request.GET.get('page_size'))
     
     context = {
-        'employees': employees,
+        'employees': page,
+        'page': page,
         'forms': forms,
         'search_query': search_query,
+        'search_field': search_field,
+        'name_prefix': name_prefix,
         'form_filter': form_filter,
     }
     return render(request, 'employees/employee_list.html', context)
@@ -48,18 +72,22 @@ def employee_create(request):
             return JsonResponse({'success': False, 'error': 'Form selection required'})
         
         try:
-            dynamic_form = DynamicForm.objects.get(id=form_id, is_active=True)
+            dynamic_form = get_form_definition(form_id)
+            if dynamic_form is None:
+                raise DynamicForm.DoesNotExist
             
-            # Extract employee data from POST
-            employee_data = {}
-            for field in dynamic_form.fields_config:
-                field_name = field.get('name')
-                field_value = request.POST.get(field_name, '')
-                employee_data[field_name] = field_value
+            # Extract and validate employee data from POST
+            validator = get_validator(dynamic_form)
+            employee_data, errors = validator.clean(
+                {name: request.POST.get(name, '') for name in validator.field_names}
+            )
+            if errors:
+                return JsonResponse({'success': False, 'error': format_errors(errors), 'errors': errors})
             
             # Create employee
             employee = Employee.objects.create(
-                form=dynamic_form,
+                form_id=dynamic_form.id,
+                form_version_id=dynamic_form.version_id,
                 employee_data=employee_data,
                 created_by=request.user
             )
@@ -85,18 +113,20 @@ def employee_create(request):
 @login_required
 def employee_edit(request, pk):
     """Edit existing employee"""
-    employee = get_object_or_404(Employee, pk=pk, is_active=True)
+    employee = get_object_or_404(Employee.objects.select_related('form'), pk=pk, is_active=True)
     
     if request.method == 'POST':
         try:
-            # Extract updated employee data
-            employee_data = {}
-            for field in employee.form.fields_config:
-                field_name = field.get('name')
-                field_value = request.POST.get(field_name, '')
-                employee_data[field_name] = field_value
+            # Extract and validate updated employee data
+            validator = get_validator(employee.form)
+            employee_data, errors = validator.clean(
+                {name: request.POST.get(name, '') for name in validator.field_names}
+            )
+            if errors:
+                return JsonResponse({'success': False, 'error': format_errors(errors), 'errors': errors})
             
             employee.employee_data = employee_data
+            employee.form_version_id = employee.form.version_id
             employee.save()
             
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -157,12 +187,21 @@ def form_create(request):
             
             # Parse fields configuration
             fields_config = json.loads(fields_json) if fields_json else []
+            reserved = invalid_indexed_names(fields_config)
+            if reserved:
+                return JsonResponse({'success': False, 'error': reserved_names_error(reserved)})
+            display_json = request.POST.get('display_fields')
+            display_fields = json.loads(display_json) if display_json else []
+            display_error = display_fields_error(display_fields, fields_config)
+            if display_error:
+                return JsonResponse({'success': False, 'error': display_error})
             
             # Create form
             form = DynamicForm.objects.create(
                 name=name,
                 description=description,
                 fields_config=fields_config,
+                display_fields=display_fields,
                 created_by=request.user
             )
             
@@ -196,6 +235,16 @@ def form_edit(request, pk):
             fields_json = request.POST.get('fields_config')
             if fields_json:
                 form.fields_config = json.loads(fields_json)
+                reserved = invalid_indexed_names(form.fields_config)
+                if reserved:
+                    return JsonResponse({'success': False, 'error': reserved_names_error(reserved)})
+            
+            display_json = request.POST.get('display_fields')
+            if display_json:
+                form.display_fields = json.loads(display_json)
+            display_error = display_fields_error(form.display_fields, form.fields_config)
+            if display_error:
+                return JsonResponse({'success': False, 'error': display_error})
             
             form.save()
             
@@ -235,14 +284,22 @@ def form_delete(request, pk):
 
 @login_required
 @require_http_methods(["GET"])
-def get_form_fields(request, form_id):
-    """AJAX endpoint to get form fields configuration"""
-    try:
-        form = DynamicForm.objects.get(id=form_id, is_active=True)
-        return JsonResponse({
-            'success': True,
-            'fields': form.fields_config,
-            'form_name': form.name
-        })
-    except DynamicForm.DoesNotExist:
-        return JsonResponse({'success': False, 'error': 'Form not found'})
\ No newline at end of file
+async def get_form_fields(request, form_id):
+    """AJAX endpoint to get form fields configuration (async, honours If-None-Match/If-Modified-Since)"""
+    form = await aget_form_definition(form_id)
+    if form is None:
+        return JsonResponse({'success': False, 'error': 'Form not found'})
+    not_modified = get_conditional_response(
+        request, etag=form.etag, last_modified=int(form.updated_at.timestamp())
+    )
+    if not_modified is not None:
+        return not_modified
+    response = JsonResponse({
+        'success': True,
+        'fields': form.fields_config,
+        'form_name': form.name
+    })
+    response['ETag'] = form.etag
+    response['Last-Modified'] = form.last_modified
+    response['Cache-Control'] = 'private, no-cache'
+    return response
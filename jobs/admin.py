@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'attempts', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
+    list_select_related = ['created_by']
+    readonly_fields = ['progress', 'result', 'error', 'attempts', 'worker', 'started_at', 'heartbeat_at', 'finished_at']
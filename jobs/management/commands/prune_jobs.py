@@ -0,0 +1,18 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.runner import prune_jobs
+
+
+class Command(BaseCommand):
+    help = 'Delete jobs that finished more than --days ago, with their input and output files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        deleted = prune_jobs(cutoff)
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} jobs'))
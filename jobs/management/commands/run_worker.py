@@ -0,0 +1,41 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.worker import MODES, Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Run queued background jobs (imports, exports, version migrations, '
+        'reindexing) with a thread or process pool. Ctrl+C or SIGTERM stops '
+        'claiming new jobs and waits for the running ones.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Jobs run at the same time')
+        parser.add_argument('--mode', choices=MODES, default='thread',
+                            help='Processes suit CPU-bound jobs; threads start faster')
+        parser.add_argument('--name', default=None, help='Worker name stored on claimed jobs')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            mode=options['mode'],
+            name=options['name'],
+            on_event=self.stdout.write,
+        )
+
+        def stop(signum, frame):
+            self.stdout.write('Stopping after the running jobs; interrupt again to abort')
+            worker.stop()
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        self.stdout.write(
+            f"Worker {worker.name} running up to {worker.concurrency} jobs ({options['mode']} pool)"
+        )
+        worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS('Worker stopped'))
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils import timezone
+
+User = get_user_model()
+
+
+class Job(models.Model):
+    """
+    Background work item run by the run_worker command. The table is the
+    queue: workers claim queued rows with a conditional UPDATE, which both
+    SQLite and PostgreSQL serialize without an external broker.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    STATUSES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+        (CANCELLED, 'Cancelled'),
+    ]
+    FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    progress = models.JSONField(default=dict, blank=True)  # Reported by the handler while it runs
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True, default='')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    cancel_requested = models.BooleanField(default=False)
+    input_file = models.FileField(upload_to='jobs/input/', blank=True)
+    output_file = models.FileField(upload_to='jobs/output/', blank=True)
+    worker = models.CharField(max_length=100, blank=True, default='')  # Name of the claiming worker
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    run_after = models.DateTimeField(default=timezone.now)  # Pushed back between retries
+    started_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)  # Refreshed by the worker while running
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.kind} job #{self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED
+
+    class Meta:
+        db_table = 'job'
+        ordering = ['-id']
+        indexes = [
+            # Claim order of queued jobs
+            models.Index(fields=['run_after', 'id'], name='job_queued_idx', condition=models.Q(status='queued')),
+            # Stale running jobs
+            models.Index(fields=['heartbeat_at'], name='job_running_idx', condition=models.Q(status='running')),
+            models.Index(fields=['created_by', '-id'], name='job_creator_idx'),
+        ]
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
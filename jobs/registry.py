@@ -0,0 +1,58 @@
+"""
+Registry of job kinds.
+
+Apps register handlers in a tasks.py module, which the jobs app imports at
+startup the way the admin imports admin.py modules:
+
+    @register('export_employees', clean=clean_export_params)
+    def export_employees(context):
+        ...
+        return {'rows': count}
+
+A handler receives a jobs.runner.JobContext and returns a JSON-serializable
+result. clean(params, user) validates submitted params, returns the params
+to store and raises JobParamsError for bad input. Kinds whose handlers are
+not safe to run twice (e.g. imports that commit batches as they go) should
+register with max_attempts=1.
+"""
+
+
+class JobParamsError(ValueError):
+    """Raised by clean() with {param: message} errors"""
+    def __init__(self, errors):
+        super().__init__('Invalid job parameters')
+        self.errors = errors
+
+
+class JobKind:
+    def __init__(self, name, handler, clean=None, staff_only=False, max_attempts=None, needs_file=False):
+        self.name = name
+        self.handler = handler
+        self.clean = clean
+        self.staff_only = staff_only
+        self.max_attempts = max_attempts
+        self.needs_file = needs_file
+
+    def clean_params(self, params, user):
+        if not isinstance(params, dict):
+            raise JobParamsError({'params': 'params must be an object'})
+        return self.clean(params, user) if self.clean else params
+
+
+_kinds = {}
+
+
+def register(name, clean=None, staff_only=False, max_attempts=None, needs_file=False):
+    """Decorator registering a handler function as job kind name"""
+    def decorator(handler):
+        _kinds[name] = JobKind(name, handler, clean, staff_only, max_attempts, needs_file)
+        return handler
+    return decorator
+
+
+def get_kind(name):
+    return _kinds.get(name)
+
+
+def kinds():
+    return dict(_kinds)
@@ -0,0 +1,191 @@
+"""
+Submitting, claiming and running jobs.
+
+A job is claimed by flipping its row from queued to running with a
+conditional UPDATE; whichever worker's UPDATE matches wins, so several
+workers can share one SQLite or PostgreSQL database. Each claim increments
+attempts, which doubles as a fencing token: a worker only finishes the job
+if the row is still running under the attempt it claimed.
+
+While a job runs its worker refreshes heartbeat_at. Jobs whose heartbeat
+is older than JOB_STALE_AFTER seconds (their worker died) are requeued,
+or failed once they are out of attempts. Failed attempts are retried after
+JOB_RETRY_DELAY seconds, doubling each time, up to the job's max_attempts.
+"""
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .registry import JobParamsError, get_kind
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler once cancellation was requested"""
+
+
+class JobFailed(Exception):
+    """Raised by handlers for errors that a retry cannot fix"""
+
+
+class JobContext:
+    """What a handler gets: the job's params plus progress, cancellation and file helpers"""
+
+    def __init__(self, job):
+        self.job = job
+        self.params = job.params
+
+    @property
+    def user_id(self):
+        return self.job.created_by_id
+
+    def progress(self, **values):
+        """Merge values into the job's progress, then stop if cancellation was requested"""
+        self.job.progress.update(values)
+        Job.objects.filter(id=self.job.id).update(progress=self.job.progress)
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        if Job.objects.filter(id=self.job.id, cancel_requested=True).exists():
+            raise JobCancelled()
+
+    def open_input(self):
+        """The uploaded input file, opened in binary mode"""
+        if not self.job.input_file:
+            raise JobFailed('This job has no input file')
+        return self.job.input_file.open('rb')
+
+    def save_output(self, name, content):
+        """Store a django File as the job's downloadable output"""
+        self.job.output_file.save(name, content, save=False)
+        Job.objects.filter(id=self.job.id).update(output_file=self.job.output_file.name)
+
+
+def submit(kind_name, params=None, user=None, input_file=None):
+    """Validate params for kind_name and queue a job; raises JobParamsError"""
+    kind = get_kind(kind_name)
+    if kind is None:
+        raise JobParamsError({'kind': f"Unknown job kind '{kind_name}'"})
+    params = kind.clean_params(params or {}, user)
+    if kind.needs_file and input_file is None:
+        raise JobParamsError({'file': 'This job kind needs an uploaded file'})
+    job = Job(
+        kind=kind_name,
+        params=params,
+        max_attempts=kind.max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', 3),
+        created_by_id=user.id if user is not None else None,
+    )
+    if input_file is not None:
+        job.input_file.save(input_file.name, input_file, save=False)
+    job.save()
+    return job
+
+
+def claim(worker_name):
+    """Claim the next due queued job for worker_name, or return None"""
+    now = timezone.now()
+    candidates = Job.objects.filter(status=Job.QUEUED, run_after__lte=now).order_by('run_after', 'id')
+    for job_id in candidates.values_list('id', flat=True)[:10]:
+        claimed = Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            worker=worker_name,
+            attempts=F('attempts') + 1,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def _finish(job, **fields):
+    """Update the job row if it is still running under this attempt"""
+    return Job.objects.filter(id=job.id, status=Job.RUNNING, attempts=job.attempts).update(**fields)
+
+
+def run(job):
+    """Run a claimed job to completion; returns the status it ended with"""
+    kind = get_kind(job.kind)
+    context = JobContext(job)
+    try:
+        if kind is None:
+            raise JobFailed(f"Unknown job kind '{job.kind}'")
+        context.check_cancelled()
+        result = kind.handler(context)
+    except JobCancelled:
+        status = Job.CANCELLED
+        _finish(job, status=status, finished_at=timezone.now())
+    except Exception as e:
+        error = str(e) if isinstance(e, JobFailed) else f'{type(e).__name__}: {e}'
+        if isinstance(e, JobFailed) or job.attempts >= job.max_attempts:
+            status = Job.FAILED
+            _finish(job, status=status, error=error, finished_at=timezone.now())
+        else:
+            status = Job.QUEUED
+            delay = getattr(settings, 'JOB_RETRY_DELAY', 30) * 2 ** (job.attempts - 1)
+            _finish(
+                job, status=status, error=error, worker='',
+                run_after=timezone.now() + datetime.timedelta(seconds=delay),
+            )
+        if not isinstance(e, JobFailed):
+            logger.exception('Job %s (%s) failed on attempt %s', job.id, job.kind, job.attempts)
+    else:
+        status = Job.SUCCEEDED
+        _finish(job, status=status, result=result, error='', finished_at=timezone.now())
+    return status
+
+
+def execute(job_id):
+    """Entry point of worker threads and processes for a claimed job"""
+    try:
+        return run(Job.objects.get(id=job_id))
+    finally:
+        connections.close_all()
+
+
+def cancel(job):
+    """
+    Cancel a queued job right away or ask a running handler to stop at its
+    next progress report. Returns False if the job had already finished.
+    """
+    now = timezone.now()
+    if Job.objects.filter(id=job.id, status=Job.QUEUED).update(status=Job.CANCELLED, finished_at=now):
+        return True
+    return bool(Job.objects.filter(id=job.id, status=Job.RUNNING).update(cancel_requested=True))
+
+
+def heartbeat(job_ids):
+    job_ids = list(job_ids)
+    if job_ids:
+        Job.objects.filter(id__in=job_ids, status=Job.RUNNING).update(heartbeat_at=timezone.now())
+
+
+def requeue_stale():
+    """Requeue (or fail, when out of attempts) running jobs whose worker stopped heartbeating"""
+    cutoff = timezone.now() - datetime.timedelta(seconds=getattr(settings, 'JOB_STALE_AFTER', 300))
+    stale = Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=cutoff)
+    error = 'The worker running this job stopped responding'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, error=error, finished_at=timezone.now()
+    )
+    requeued = stale.update(status=Job.QUEUED, error=error, worker='', run_after=timezone.now())
+    return requeued, failed
+
+
+def prune_jobs(cutoff):
+    """Delete jobs that finished before cutoff together with their files"""
+    jobs = Job.objects.filter(status__in=Job.FINISHED, finished_at__lt=cutoff)
+    deleted = 0
+    for job in jobs.iterator():
+        for field in (job.input_file, job.output_file):
+            if field:
+                field.delete(save=False)
+        job.delete()
+        deleted += 1
+    return deleted
@@ -0,0 +1,108 @@
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from jobs import runner
+from jobs.models import Job
+from jobs.registry import register
+
+calls = []
+
+
+@register('test_echo')
+def echo(context):
+    calls.append(context.params)
+    context.progress(step=1)
+    return {'echo': context.params}
+
+
+@register('test_flaky', max_attempts=2)
+def flaky(context):
+    raise RuntimeError('boom')
+
+
+@register('test_staff', staff_only=True)
+def staff_only(context):
+    return None
+
+
+class JobRunnerTests(TestCase):
+    """Claiming, retries, cancellation and stale job recovery"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+
+    def claim_and_run(self):
+        job = runner.claim('test-worker')
+        self.assertIsNotNone(job)
+        return runner.run(job), Job.objects.get(id=job.id)
+
+    def test_success(self):
+        runner.submit('test_echo', {'a': 1}, user=self.user)
+        status, job = self.claim_and_run()
+        self.assertEqual(status, Job.SUCCEEDED)
+        self.assertEqual((job.result, job.progress, job.attempts), ({'echo': {'a': 1}}, {'step': 1}, 1))
+        self.assertIsNone(runner.claim('test-worker'))
+
+    @override_settings(JOB_RETRY_DELAY=0)
+    def test_retries_then_fails(self):
+        runner.submit('test_flaky')
+        with self.assertLogs('jobs.runner', 'ERROR') as logs:
+            status, job = self.claim_and_run()
+        self.assertEqual(status, Job.QUEUED)
+        self.assertEqual(job.error, 'RuntimeError: boom')
+        self.assertEqual(logs.records[0].getMessage(), f'Job {job.id} (test_flaky) failed on attempt 1')
+        self.assertEqual(logs.records[0].exc_info[0], RuntimeError)
+        with self.assertLogs('jobs.runner', 'ERROR'):
+            status, job = self.claim_and_run()
+        self.assertEqual((status, job.attempts), (Job.FAILED, 2))
+
+    def test_cancel(self):
+        queued = runner.submit('test_echo')
+        self.assertTrue(runner.cancel(queued))
+        self.assertEqual(Job.objects.get(id=queued.id).status, Job.CANCELLED)
+        self.assertFalse(runner.cancel(queued))
+
+        runner.submit('test_echo')
+        job = runner.claim('test-worker')
+        self.assertTrue(runner.cancel(job))
+        self.assertEqual(runner.run(job), Job.CANCELLED)
+
+    def test_requeue_stale(self):
+        runner.submit('test_echo')
+        job = runner.claim('test-worker')
+        Job.objects.filter(id=job.id).update(heartbeat_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(runner.requeue_stale(), (1, 0))
+        # The abandoned attempt can no longer finish the job
+        self.assertEqual(runner.run(job), Job.SUCCEEDED)
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.QUEUED)
+
+
+class JobApiTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hr', password='secret123')
+        self.other = CustomUser.objects.create_user(username='ops', password='secret123')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_submit_and_poll(self):
+        response = self.api.post('/api/jobs/', {'kind': 'test_echo', 'params': {'a': 1}}, format='json')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+        self.assertEqual(self.api.get(f'/api/jobs/{job_id}/').json()['status'], Job.QUEUED)
+
+        other = APIClient()
+        other.force_authenticate(self.other)
+        self.assertEqual(other.get(f'/api/jobs/{job_id}/').status_code, 404)
+        self.assertEqual(other.get('/api/jobs/').json()['results'], [])
+
+    def test_rejects_unknown_and_staff_only_kinds(self):
+        self.assertEqual(self.api.post('/api/jobs/', {'kind': 'missing'}, format='json').status_code, 400)
+        self.assertEqual(self.api.post('/api/jobs/', {'kind': 'test_staff'}, format='json').status_code, 403)
+        response = self.api.post(
+            '/api/jobs/', {'kind': 'export_employees', 'params': {'form_id': 0}}, format='json'
+        )
+        self.assertEqual(response.json(), {'errors': {'form_id': 'Form not found'}})
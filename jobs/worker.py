@@ -0,0 +1,97 @@
+"""
+The run_worker loop.
+
+A Worker claims due jobs while it has free slots and hands them to a
+thread or process pool. Between polls it refreshes the heartbeat of its
+running jobs and requeues jobs abandoned by dead workers. stop() lets the
+running jobs finish but claims nothing new.
+
+Process pools start fresh interpreters (spawn), so this module must stay
+importable before Django is set up: it only imports jobs.runner lazily.
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+MODES = ('thread', 'process')
+
+
+def _setup_process():
+    # The parent handles Ctrl+C and lets running jobs finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import django
+    django.setup()
+
+
+def _execute(job_id):
+    from .runner import execute
+    return execute(job_id)
+
+
+class Worker:
+    def __init__(self, concurrency=2, mode='thread', name=None, poll_interval=None, on_event=None):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of: {', '.join(MODES)}")
+        self.concurrency = max(1, concurrency)
+        self.mode = mode
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = poll_interval or getattr(settings, 'JOB_POLL_INTERVAL', 1)
+        self.heartbeat_interval = getattr(settings, 'JOB_HEARTBEAT_INTERVAL', 30)
+        self.on_event = on_event or (lambda message: None)
+        self._stopping = False
+
+    def stop(self):
+        self._stopping = True
+
+    def _executor(self):
+        if self.mode == 'process':
+            return ProcessPoolExecutor(
+                self.concurrency, mp_context=multiprocessing.get_context('spawn'), initializer=_setup_process
+            )
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix='job')
+
+    def run(self, burst=False):
+        """Process jobs until stop(); with burst, return once the queue is empty"""
+        from . import runner
+
+        running = {}
+        last_heartbeat = 0
+        executor = self._executor()
+        try:
+            while True:
+                for future in [future for future in running if future.done()]:
+                    job_id = running.pop(future)
+                    try:
+                        self.on_event(f'Job #{job_id} {future.result()}')
+                    except Exception as e:
+                        self.on_event(f'Job #{job_id} crashed the worker: {e!r}')
+
+                if time.monotonic() - last_heartbeat >= self.heartbeat_interval:
+                    runner.heartbeat(running.values())
+                    requeued, failed = runner.requeue_stale()
+                    if requeued or failed:
+                        self.on_event(f'Requeued {requeued} and failed {failed} abandoned jobs')
+                    last_heartbeat = time.monotonic()
+
+                claimed = False
+                while not self._stopping and len(running) < self.concurrency:
+                    job = runner.claim(self.name)
+                    if job is None:
+                        break
+                    claimed = True
+                    self.on_event(f'Job #{job.id} {job.kind} started (attempt {job.attempts})')
+                    running[executor.submit(_execute, job.id)] = job.id
+
+                if not running and (self._stopping or (burst and not claimed)):
+                    break
+                if running:
+                    wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                elif not claimed:
+                    time.sleep(self.poll_interval)
+        finally:
+            executor.shutdown(wait=True)